@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.metrics_middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,6 +70,55 @@ DATABASES = {
     }
 }
 
+# Shared by every worker, the default per process LocMem cache would give each worker its own cache
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/{os.getenv('REDIS_DB', '0')}",
+        "KEY_PREFIX": "cache",
+    }
+}
+
+# Rate limiter algorithm: sliding_window_log (exact), sliding_window_counter (two counters per key)
+# or token_bucket (allows bursts), see core.helpers.rate_limit
+RATE_LIMIT_ALGORITHM = os.getenv("RATE_LIMIT_ALGORITHM", "sliding_window_log")
+
+# Directory shared by the workers of a deployment, each writes its metrics there so /metrics reports all of them.
+# Without it /metrics only reports the worker serving the scrape. Clear it when the deployment restarts.
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+# Share API key lookups between workers through Redis, with deactivations broadcast over pub/sub
+API_KEY_SHARED_REGISTRY = os.getenv("API_KEY_SHARED_REGISTRY", "false").lower() == "true"
+API_KEY_SHARED_REGISTRY_TTL = int(os.getenv("API_KEY_SHARED_REGISTRY_TTL", "3600"))
+
+# "database" writes a row per request (in batches), "redis" counts usage in per-minute Redis buckets
+# that the rollup_usage_counters command copies into hourly ApiKeyUsageRollup rows
+API_KEY_USAGE_BACKEND = os.getenv("API_KEY_USAGE_BACKEND", "database")
+API_KEY_USAGE_COUNTER_TTL = int(os.getenv("API_KEY_USAGE_COUNTER_TTL", str(25 * 3600)))
+# Seconds a minute must have been closed before it is rolled up, covering in-flight requests and clock skew
+API_KEY_USAGE_ROLLUP_DELAY = int(os.getenv("API_KEY_USAGE_ROLLUP_DELAY", "120"))
+
+# Monthly usage partitions created ahead by create_usage_partitions, and complete months of usage records
+# kept by compact_usage before they are rolled up and dropped
+API_KEY_USAGE_PARTITIONS_AHEAD = int(os.getenv("API_KEY_USAGE_PARTITIONS_AHEAD", "3"))
+API_KEY_USAGE_RETENTION_MONTHS = int(os.getenv("API_KEY_USAGE_RETENTION_MONTHS", "6"))
+
+# Per request profiling: requests sending X-Profile-Token with this value are profiled,
+# as is a random PROFILING_SAMPLE_RATE share of all requests (0 disables sampling).
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / "profiles"))
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "200"))
+
+# Registry file of revoked national IDs, written by the build_revoked_registry command.
+# Rewriting the file is picked up by running workers without a restart.
+NATIONAL_ID_REVOKED_REGISTRY_PATH = os.getenv("NATIONAL_ID_REVOKED_REGISTRY_PATH")
+NATIONAL_ID_REVOKED_REGISTRY_RELOAD_INTERVAL = float(os.getenv("NATIONAL_ID_REVOKED_REGISTRY_RELOAD_INTERVAL", "5"))
+
+# Drops the API key usage buffered by the tests before the test database is destroyed
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
 ROOT_URLCONF = 'Egyptian_National_ID_Validator.urls'
 
 TEMPLATES = [
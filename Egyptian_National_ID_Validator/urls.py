@@ -18,8 +18,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views.metrics_views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/national-id/', include('national_id.urls')),
     path('api/api-keys/', include('api_keys.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from api_keys.models import ApiKey, ApiKeyUsage
+from api_keys.models import ApiKey, ApiKeyUsage, ApiKeyUsageRollup
 
 admin.site.register(ApiKey)
-admin.site.register(ApiKeyUsage)
\ No newline at end of file
+admin.site.register(ApiKeyUsage)
+admin.site.register(ApiKeyUsageRollup)
@@ -3,4 +3,27 @@ from django.apps import AppConfig
 
 class ApiKeysConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'api_keys'
\ No newline at end of file
+    name = 'api_keys'
+
+    def ready(self):
+        import api_keys.signals  # noqa: F401
+        from api_keys.services.api_key_service import ApiKeyService
+        from core.helpers.metrics import registry
+
+        cache = ApiKeyService.key_cache
+        hits = registry.counter("api_key_cache_hits_total", "API key lookups answered by the cache")
+        misses = registry.counter("api_key_cache_misses_total", "API key lookups that went to the database")
+        expirations = registry.counter("api_key_cache_expirations_total", "Cached API keys dropped after their TTL")
+        entries = registry.gauge("api_key_cache_entries", "API keys held by the cache")
+
+        def collect_api_key_cache():
+            stats = cache.stats()
+            hits.set(stats["hits"])
+            misses.set(stats["misses"])
+            expirations.set(stats["expirations"])
+            entries.set(stats["entries"])
+
+        registry.add_collector(collect_api_key_cache)
+
+        usage_queue_depth = registry.gauge("api_key_usage_queue_depth", "API key usage records waiting to be written")
+        registry.add_collector(lambda: usage_queue_depth.set(ApiKeyService.usage_recorder.queue_depth()))
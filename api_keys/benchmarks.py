@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api_keys.helpers.key_generator import hash_api_key
+from api_keys.helpers.usage_rollups import write_usage
+from api_keys.models import ApiKey, ApiKeyUsage
+
+from api_keys.services.api_key_service import ApiKeyService
+from core.helpers.benchmark import MACRO, benchmark
+
+
+def _request_benchmark(url: str):
+    client = APIClient()
+    api_key = ApiKeyService.generate_api_key()["api_key"]
+
+    def run():
+        response = client.post(url, {"api_key": api_key}, format="json")
+        assert response.status_code == 200, response.status_code
+
+    return run
+
+
+@benchmark("api_keys.service.track_usage", requires_db=True)
+def track_usage():
+    api_key = ApiKeyService.generate_api_key()["api_key"]
+    return lambda: ApiKeyService.track_usage(api_key, "benchmark")
+
+
+@benchmark("api_keys.service.get_usage_stats.busy_key", requires_db=True)
+def usage_stats_busy_key():
+    # A week of usage, one request every 10 seconds over three endpoints
+    api_key = ApiKeyService.generate_api_key()["api_key"]
+    api_key_id = ApiKey.objects.get(key_hash=hash_api_key(api_key)).id
+    now = timezone.now()
+    endpoints = ("validate_national_id", "extract_data", "validate_national_ids_batch")
+    records = [
+        ApiKeyUsage(api_key_id=api_key_id, endpoint=endpoints[i % 3], time_of_usage=now - timedelta(seconds=10 * i))
+        for i in range(60_480)
+    ]
+    for start in range(0, len(records), 5_000):
+        write_usage(records[start:start + 5_000])
+    return lambda: ApiKeyService.get_usage_stats(api_key)
+
+
+@benchmark("api_keys.request.verify", kind=MACRO)
+def verify_request():
+    return _request_benchmark("/api/api-keys/verify")
+
+
+@benchmark("api_keys.request.usage_stats", kind=MACRO)
+def usage_stats_request():
+    return _request_benchmark("/api/api-keys/usage-stats")
@@ -1 +1,18 @@
 
+# In-process cache of API key lookups, see ApiKeyCache.
+# Deactivating a key through the ORM invalidates it right away, other changes show up within the TTL.
+API_KEY_CACHE_MAX_ENTRIES = 10_000
+API_KEY_CACHE_TTL = 60.0
+# Unknown keys are cached for a shorter time
+API_KEY_CACHE_NEGATIVE_TTL = 10.0
+
+# Seconds between writes of buffered ApiKey.last_usage timestamps, see LastUsageBuffer.
+# This also bounds how far last_usage in the database lags behind the latest request.
+API_KEY_LAST_USAGE_FLUSH_INTERVAL = 5.0
+
+# ApiKeyUsage records are queued and written in batches by a background thread, see UsageRecorder.
+# A batch is written at API_KEY_USAGE_BATCH_SIZE records or API_KEY_USAGE_FLUSH_INTERVAL seconds,
+# and at most API_KEY_USAGE_MAX_QUEUE records wait in memory, newer ones are dropped while the database is down.
+API_KEY_USAGE_BATCH_SIZE = 500
+API_KEY_USAGE_FLUSH_INTERVAL = 0.2
+API_KEY_USAGE_MAX_QUEUE = 50_000
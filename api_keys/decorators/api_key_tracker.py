@@ -1,13 +1,18 @@
 from functools import wraps
 from django.http import JsonResponse
 from api_keys.services.api_key_service import ApiKeyService
+from core.helpers.metrics import time_stage
 
-def track_api_key_usage(endpoint_name):
+def track_api_key_usage(endpoint_name, item_count=None, streamed=False):
     """
     Decorator to track API key usage for a specific endpoint.
     
     Args:
         endpoint_name (str): The name of the endpoint being accessed
+        item_count (callable, optional): Called with the request to get the number of
+            items the request carries (e.g. IDs in a batch). Defaults to 1 per request.
+        streamed (bool): For views returning a StreamingHttpResponse. The key is verified before the view runs,
+            and the use is tracked once the response is consumed, with one item per line streamed.
         
     Usage:
         @track_api_key_usage("validate_national_id")
@@ -30,9 +35,19 @@ def track_api_key_usage(endpoint_name):
 
             api_key = request.headers.get("X-API-Key") or request.META.get("HTTP_X_API_KEY")
 
+            if api_key and streamed:
+                if not ApiKeyService.verify_api_key(api_key)["valid"]:
+                    return JsonResponse({"error": "API key not found"}, status=401)
+                response = view_func(*args, **kwargs)
+                if response.streaming:
+                    response.streaming_content = _track_streamed_lines(response.streaming_content, api_key, endpoint_name)
+                return response
+
             if api_key:
                 try:
-                    result = ApiKeyService.track_usage(api_key, endpoint_name)
+                    count = item_count(request) if item_count else 1
+                    with time_stage("track_usage"):
+                        result = ApiKeyService.track_usage(api_key, endpoint_name, count)
                     if not result['success']:
                         return JsonResponse(
                             {"error": result['error']}, 
@@ -45,4 +60,17 @@ def track_api_key_usage(endpoint_name):
             return view_func(*args, **kwargs)
 
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+def _track_streamed_lines(content, api_key, endpoint_name):
+    """Passes a streaming response through, then tracks its use with the number of lines sent, even if the client left early."""
+    lines = 0
+    try:
+        for chunk in content:
+            lines += chunk.count(b"\n")
+            yield chunk
+    finally:
+        try:
+            ApiKeyService.track_usage(api_key, endpoint_name, lines)
+        except Exception as e:
+            print(f"Failed to track API key usage: {str(e)}")
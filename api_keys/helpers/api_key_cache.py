@@ -0,0 +1,82 @@
+import threading
+
+from core.helpers.lru_cache import TTLLRUCache
+
+# Returned by ApiKeyCache.get when the key is not cached at all
+MISSING = object()
+
+
+class ApiKeyCache:
+    """
+    Caches API key lookups by raw key, so repeated requests skip hashing and the database.
+
+    Known keys map to (key id, is_active) and unknown keys to None, for a shorter time,
+    so a client retrying with a bad key cannot force a query per request.
+
+    Every invalidation bumps a generation. A lookup reads it before querying and passes it to set,
+    which skips the result if an invalidation happened in between, since the result may predate it.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float):
+        """
+        Args:
+            max_entries (int): Maximum number of keys cached.
+            ttl (float): Seconds a known key stays cached.
+            negative_ttl (float): Seconds an unknown key stays cached.
+        """
+        self.negative_ttl = negative_ttl
+        self._cache = TTLLRUCache(max_entries, ttl=ttl)
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+
+    def get(self, api_key: str):
+        """
+        Returns the cached lookup of a raw key.
+
+        Returns:
+            tuple[int, bool] | None: (key id, is_active), None for a key known not to exist,
+            or MISSING if the key is not cached.
+        """
+        return self._cache.get(api_key, MISSING)
+
+    def generation(self) -> int:
+        """Returns the current generation, read before a lookup whose result is passed to set."""
+        return self._generation
+
+    def set(self, api_key: str, key: tuple[int, bool] | None, generation: int | None = None):
+        """
+        Caches a lookup result, None for a key that does not exist.
+
+        Args:
+            api_key (str): The raw key.
+            key (tuple[int, bool] | None): The lookup result.
+            generation (int, optional): What generation returned before the lookup, the result is
+                not cached if a key was invalidated since.
+        """
+        with self._generation_lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._cache.set(api_key, key, ttl=self.negative_ttl if key is None else None)
+
+    def invalidate(self, api_key: str):
+        """Removes a raw key, e.g. right after it was created."""
+        self._cache.invalidate(api_key)
+
+    def invalidate_key_id(self, key_id: int) -> int:
+        """
+        Removes every cached raw key resolving to a key id, e.g. when the key is deactivated.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._generation_lock:
+            self._generation += 1
+            return self._cache.invalidate_matching(lambda _, key: key is not None and key[0] == key_id)
+
+    def clear(self):
+        with self._generation_lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
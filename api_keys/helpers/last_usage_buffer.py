@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+from datetime import datetime
+
+from django.db.models import Case, F, Q, Value, When
+
+logger = logging.getLogger(__name__)
+
+
+class LastUsageBuffer:
+    """
+    Coalesces ApiKey.last_usage writes in process memory.
+
+    Requests only record the latest timestamp of each key, and a background thread writes every pending key
+    in a single UPDATE once every flush_interval seconds, and when stopped. A hot key then costs one row update per
+    interval per worker instead of one per request. The UPDATE never moves last_usage backwards, so workers
+    flushing out of order do not overwrite a newer timestamp.
+
+    The database value lags the latest request by at most flush_interval seconds, plus the time a flush takes.
+    """
+
+    def __init__(self, flush_interval: float):
+        """
+        Args:
+            flush_interval (float): Seconds between flushes to the database.
+        """
+        self.flush_interval = flush_interval
+        self._pending: dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher_pid = None
+
+    def record(self, key_id: int, used_at: datetime):
+        """Records a use of a key, written to the database by the next flush."""
+        self._start_flusher()
+        with self._lock:
+            previous = self._pending.get(key_id)
+            if previous is None or used_at > previous:
+                self._pending[key_id] = used_at
+
+    def pending(self, key_id: int) -> datetime | None:
+        """Returns the latest use of a key not yet written to the database."""
+        with self._lock:
+            return self._pending.get(key_id)
+
+    def flush(self) -> int:
+        """
+        Writes every pending timestamp in one UPDATE.
+
+        Returns:
+            int: The number of keys written.
+        """
+        from api_keys.models import ApiKey
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            try:
+                ApiKey.objects.filter(id__in=pending).update(
+                    last_usage=Case(
+                        *[
+                            When(Q(id=key_id) & (Q(last_usage__isnull=True) | Q(last_usage__lt=used_at)), then=Value(used_at))
+                            for key_id, used_at in pending.items()
+                        ],
+                        default=F("last_usage"),
+                    )
+                )
+            except Exception as e:
+                # Put the timestamps back for the next flush, unless newer ones were recorded meanwhile
+                with self._lock:
+                    for key_id, used_at in pending.items():
+                        if key_id not in self._pending or used_at > self._pending[key_id]:
+                            self._pending[key_id] = used_at
+                logger.error(f"[LastUsageBuffer] Failed to write last usage of {len(pending)} keys: {e}")
+                return 0
+            return len(pending)
+
+    def stop(self):
+        """Stops the background thread after a final flush, called when the worker shuts down."""
+        self._stopped.set()
+        self.flush()
+
+    def clear(self):
+        """Discards every pending timestamp, e.g. before the test database is destroyed."""
+        with self._lock:
+            self._pending = {}
+
+    def _start_flusher(self):
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            # Threads do not survive a fork, each worker process starts its own
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            self._stopped.clear()
+            threading.Thread(target=self._run, name="api-key-last-usage", daemon=True).start()
+
+    def _run(self):
+        from django.db import connection
+
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            finally:
+                # The thread keeps its own connection, close it rather than hold it between flushes
+                connection.close()
@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS = metadata hash, version; ARGV = version read before the database lookup, id, is_active, ttl.
+# Stores the metadata only if the key was not invalidated since, so a lookup racing an invalidation
+# cannot write the stale row back.
+SET_IF_VERSION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'id', ARGV[2], 'is_active', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class SharedKeyRegistry:
+    """
+    API key metadata shared by every worker through Redis, keyed by the key hash.
+
+    It is the second tier behind each worker's ApiKeyCache: a worker that misses locally reads the key here
+    before falling back to the database. Changes to a key are broadcast on a pub/sub channel by key id and hash,
+    never the raw key, and every worker drops the key from its local cache when the message arrives.
+
+    Each invalidation also bumps a version of the key hash. Workers read it before querying the database
+    and only store the row if it is unchanged, see set.
+
+    Redis errors are logged and treated as misses, and Redis is then skipped for retry_interval seconds
+    so an outage costs one failed call per worker rather than one per request. Invalidations that fail are kept
+    and resent every retry_interval seconds, by the listener thread or the next call, until Redis accepts them.
+    Until then the worker ignores the registry entries of those keys and reads them from the database.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        prefix: str = "api_key:",
+        channel: str = "api_keys:invalidate",
+        ttl: int = 3600,
+        retry_interval: float = 5.0,
+    ):
+        """
+        Args:
+            client (redis.Redis): The Redis client, with decode_responses enabled.
+            prefix (str): Prefix of the Redis keys holding key metadata.
+            channel (str): The pub/sub channel invalidations are broadcast on.
+            ttl (int): Seconds a key stays in Redis after it was last loaded from the database.
+            retry_interval (float): Seconds Redis is skipped after an error.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.channel = channel
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._retry_at = 0.0
+        self._subscriber = None
+        self._subscriber_pid = None
+        self._subscriber_lock = threading.Lock()
+        self._set_if_version = client.register_script(SET_IF_VERSION_SCRIPT)
+        # Key hash -> key id of the invalidations Redis has not accepted yet
+        self._pending_invalidations: dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+
+    def _version_key(self, key_hash: str) -> str:
+        return f"{self.prefix}{key_hash}:version"
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _failed(self, operation: str, error: Exception):
+        self._retry_at = time.monotonic() + self.retry_interval
+        logger.warning(f"[SharedKeyRegistry] {operation} failed, skipping Redis for {self.retry_interval}s: {error}")
+
+    def get(self, key_hash: str) -> tuple[int, bool] | None:
+        """
+        Returns the (key id, is_active) of a key hash, or None if it is not in the registry or Redis is unavailable.
+        """
+        if not self._available() or not self._send_invalidations() or key_hash in self._pending_invalidations:
+            return None
+        try:
+            metadata = self.client.hgetall(self.prefix + key_hash)
+        except redis.RedisError as e:
+            self._failed("get", e)
+            return None
+
+        if not metadata:
+            return None
+        return int(metadata["id"]), metadata["is_active"] == "1"
+
+    def get_version(self, key_hash: str) -> str | None:
+        """
+        Returns the invalidation version of a key hash, read before the key is looked up in the database.
+
+        Returns:
+            str | None: The version, or None if Redis is unavailable.
+        """
+        if not self._available():
+            return None
+        try:
+            return self.client.get(self._version_key(key_hash)) or "0"
+        except redis.RedisError as e:
+            self._failed("get_version", e)
+            return None
+
+    def set(self, key_hash: str, key: tuple[int, bool], version: str | None) -> bool:
+        """
+        Stores the (key id, is_active) of a key hash, unless it was invalidated since version was read.
+
+        Args:
+            key_hash (str): The key hash.
+            key (tuple[int, bool]): The key id and is_active, as read from the database.
+            version (str | None): What get_version returned before the database lookup.
+
+        Returns:
+            bool: Whether the key was stored.
+        """
+        if version is None or not self._available() or not self._send_invalidations():
+            return False
+        try:
+            return bool(self._set_if_version(
+                keys=[self.prefix + key_hash, self._version_key(key_hash)],
+                args=[version, key[0], int(key[1]), self.ttl],
+            ))
+        except redis.RedisError as e:
+            self._failed("set", e)
+            return False
+
+    def invalidate(self, key_id: int, key_hash: str):
+        """
+        Removes a key from the registry, bumps its version and tells every worker to drop it from its local cache.
+        Always attempted, even while Redis is being skipped, since a missed invalidation keeps a stale key alive.
+        If Redis fails, the invalidation is kept and resent until it succeeds.
+        """
+        with self._pending_lock:
+            self._pending_invalidations[key_hash] = key_id
+        self._send_invalidations()
+
+    def _send_invalidations(self) -> bool:
+        """
+        Sends the pending invalidations in one pipeline.
+
+        Returns:
+            bool: False if some are still pending because Redis failed.
+        """
+        with self._pending_lock:
+            pending = dict(self._pending_invalidations)
+        if not pending:
+            return True
+
+        try:
+            pipeline = self.client.pipeline()
+            for key_hash, key_id in pending.items():
+                pipeline.delete(self.prefix + key_hash)
+                # Kept as long as the metadata, far longer than a lookup takes between get_version and set
+                pipeline.incr(self._version_key(key_hash))
+                pipeline.expire(self._version_key(key_hash), self.ttl)
+                pipeline.publish(self.channel, json.dumps({"id": key_id, "hash": key_hash}))
+            pipeline.execute()
+        except redis.RedisError as e:
+            self._failed(f"invalidate ({len(pending)} pending)", e)
+            return False
+
+        with self._pending_lock:
+            for key_hash, key_id in pending.items():
+                if self._pending_invalidations.get(key_hash) == key_id:
+                    del self._pending_invalidations[key_hash]
+        return True
+
+    def start_listener(self, on_invalidate, on_reconnect):
+        """
+        Starts the background thread applying broadcast invalidations, once per process.
+
+        Args:
+            on_invalidate (callable): Called with the key id of each invalidation message.
+            on_reconnect (callable): Called once the subscription is restored after an error,
+                since messages sent in between were missed.
+        """
+        if self._subscriber_pid == os.getpid():
+            return
+        with self._subscriber_lock:
+            # Threads do not survive a fork, each worker process starts its own
+            if self._subscriber_pid == os.getpid():
+                return
+            self._subscriber_pid = os.getpid()
+            self._subscriber = threading.Thread(
+                target=self._listen, args=(on_invalidate, on_reconnect), name="api-key-invalidations", daemon=True
+            )
+            self._subscriber.start()
+
+    def _listen(self, on_invalidate, on_reconnect):
+        missed_messages = False
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                if missed_messages:
+                    on_reconnect()
+                    missed_messages = False
+
+                while True:
+                    # Wakes up every retry_interval seconds to resend failed invalidations
+                    message = pubsub.get_message(timeout=self.retry_interval)
+                    if self._pending_invalidations and self._available():
+                        self._send_invalidations()
+                    if message is None or message.get("type") != "message":
+                        continue
+                    try:
+                        on_invalidate(int(json.loads(message["data"])["id"]))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning(f"[SharedKeyRegistry] Ignoring malformed invalidation {message['data']!r}: {e}")
+            except Exception as e:
+                # The thread is never restarted, so whatever goes wrong it resubscribes
+                missed_messages = True
+                logger.warning(f"[SharedKeyRegistry] Invalidation subscription lost, retrying: {e!r}")
+                time.sleep(self.retry_interval)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+_registry: SharedKeyRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_shared_key_registry() -> SharedKeyRegistry | None:
+    """
+    Returns the process wide registry when settings.API_KEY_SHARED_REGISTRY is enabled.
+
+    Returns:
+        SharedKeyRegistry | None: The registry, or None when disabled.
+    """
+    global _registry
+
+    if _registry is None:
+        from django.conf import settings
+
+        if not getattr(settings, "API_KEY_SHARED_REGISTRY", False):
+            return None
+
+        from core.helpers.redis_client import redis_client
+
+        with _registry_lock:
+            if _registry is None:
+                _registry = SharedKeyRegistry(redis_client, ttl=getattr(settings, "API_KEY_SHARED_REGISTRY_TTL", 3600))
+    return _registry
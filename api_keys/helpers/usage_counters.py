@@ -0,0 +1,194 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import redis
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_of(moment: datetime) -> int:
+    """Returns the minutes since the epoch of a timezone aware datetime, the id of its counter bucket."""
+    return int(moment.timestamp()) // 60
+
+
+def hour_start(minute: int) -> datetime:
+    """Returns the start of the hour holding a minute bucket."""
+    return datetime.fromtimestamp(minute // 60 * 3600, tz=timezone.utc)
+
+
+class UsageCounterStore:
+    """
+    Per-minute API key usage counters in Redis.
+
+    Each use increments, in one pipelined round-trip:
+        <prefix><key id>:m:<minute>   a hash of requests:<endpoint> and items:<endpoint>, expiring after ttl seconds
+        <prefix><key id>:h:<hour>     the same fields for the hour, also expiring after ttl seconds
+        <prefix><key id>:total        the same fields counted since the key was first used, never expiring
+        <prefix>pending               a sorted set of "<key id>:<minute>" buckets not yet rolled up, scored by minute
+
+    Stats are read in a single pipeline from the totals, the hour buckets of the whole hours of the last 24 hours
+    and the minute buckets of the partial hours at both ends, about 85 reads instead of one per minute.
+    rollup collects closed minutes into hourly counts for long-term storage in Postgres.
+    """
+
+    def __init__(self, client: redis.Redis, prefix: str = "usage:", ttl: int = 25 * 3600, rollup_delay: int = 120):
+        """
+        Args:
+            client (redis.Redis): The Redis client, with decode_responses enabled.
+            prefix (str): Prefix of the Redis keys holding the counters.
+            ttl (int): Seconds a minute or hour bucket is kept. Must exceed 24 hours, the stats window,
+                and the longest gap between rollups.
+            rollup_delay (int): Seconds a minute must have been closed before it is rolled up. Must exceed the time
+                a request takes to count its use and the clock skew between workers, since a use counted in a minute
+                after its rollup is acknowledged is never rolled up.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.rollup_delay = rollup_delay
+
+    def _bucket(self, key_id: int, minute: int) -> str:
+        return f"{self.prefix}{key_id}:m:{minute}"
+
+    def _hour_bucket(self, key_id: int, hour: int) -> str:
+        return f"{self.prefix}{key_id}:h:{hour}"
+
+    def _total(self, key_id: int) -> str:
+        return f"{self.prefix}{key_id}:total"
+
+    @property
+    def _pending(self) -> str:
+        return f"{self.prefix}pending"
+
+    def increment(self, key_id: int, endpoint: str, item_count: int, used_at: datetime):
+        """
+        Counts a use of a key.
+
+        Raises:
+            redis.RedisError: If Redis is unavailable.
+        """
+        minute = minute_of(used_at)
+
+        pipeline = self.client.pipeline(transaction=False)
+        for bucket in (self._bucket(key_id, minute), self._hour_bucket(key_id, minute // 60)):
+            pipeline.hincrby(bucket, f"requests:{endpoint}", 1)
+            pipeline.hincrby(bucket, f"items:{endpoint}", item_count)
+            pipeline.expire(bucket, self.ttl)
+        pipeline.hincrby(self._total(key_id), f"requests:{endpoint}", 1)
+        pipeline.hincrby(self._total(key_id), f"items:{endpoint}", item_count)
+        pipeline.zadd(self._pending, {f"{key_id}:{minute}": minute})
+        pipeline.execute()
+
+    def read_stats(self, key_id: int, now: datetime) -> dict:
+        """
+        Reads the usage of a key in one round-trip.
+
+        Returns:
+            dict: total_usage, total_items, recent_usage_24h and endpoint_breakdown, as in ApiKeyService.get_usage_stats.
+        """
+        current_minute = minute_of(now)
+        first_minute = current_minute - MINUTES_PER_DAY + 1
+        # The window is [first_minute, current_minute], its whole hours are [first_hour, end_hour)
+        first_hour = -(-first_minute // 60)
+        end_hour = (current_minute + 1) // 60
+
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.hgetall(self._total(key_id))
+        for minute in range(first_minute, first_hour * 60):
+            pipeline.hgetall(self._bucket(key_id, minute))
+        for hour in range(first_hour, end_hour):
+            pipeline.hgetall(self._hour_bucket(key_id, hour))
+        for minute in range(end_hour * 60, current_minute + 1):
+            pipeline.hgetall(self._bucket(key_id, minute))
+        totals, *buckets = pipeline.execute()
+
+        endpoint_breakdown = {}
+        total_items = 0
+        for field, value in totals.items():
+            kind, endpoint = field.split(":", 1)
+            if kind == "requests":
+                endpoint_breakdown[endpoint] = int(value)
+            else:
+                total_items += int(value)
+
+        recent_usage = sum(
+            int(value) for bucket in buckets for field, value in bucket.items() if field.startswith("requests:")
+        )
+
+        return {
+            "total_usage": sum(endpoint_breakdown.values()),
+            "total_items": total_items,
+            "recent_usage_24h": recent_usage,
+            "endpoint_breakdown": endpoint_breakdown,
+        }
+
+    def rollup(self, now: datetime) -> tuple[dict, list[str]]:
+        """
+        Collects the hourly usage of every hour with a minute bucket closed, for at least rollup_delay seconds,
+        since the last rollup.
+
+        An hour is always recomputed from all of its minute buckets, so writing the result replaces what earlier
+        rollups of the hour wrote and running rollup twice, e.g. after a crash before acknowledge, counts nothing twice.
+
+        Returns:
+            tuple[dict, list[str]]: {(key id, hour start, endpoint): (requests, items)}, and the pending
+            buckets to pass to acknowledge once the counts are stored.
+        """
+        members = self.client.zrangebyscore(self._pending, "-inf", minute_of(now - timedelta(seconds=self.rollup_delay)) - 1)
+        hours = sorted({(int(key_id), int(minute) // 60) for key_id, minute in (member.split(":") for member in members)})
+
+        pipeline = self.client.pipeline(transaction=False)
+        for key_id, hour in hours:
+            for minute in range(hour * 60, hour * 60 + 60):
+                pipeline.hgetall(self._bucket(key_id, minute))
+        buckets = pipeline.execute() if hours else []
+
+        counts = {}
+        for index, (key_id, hour) in enumerate(hours):
+            started_at = hour_start(hour * 60)
+            for bucket in buckets[index * 60:(index + 1) * 60]:
+                for field, value in bucket.items():
+                    kind, endpoint = field.split(":", 1)
+                    requests, items = counts.get((key_id, started_at, endpoint), (0, 0))
+                    if kind == "requests":
+                        requests += int(value)
+                    else:
+                        items += int(value)
+                    counts[(key_id, started_at, endpoint)] = (requests, items)
+        return counts, members
+
+    def acknowledge(self, members: list[str]):
+        """Removes rolled up buckets from the pending set. The buckets themselves expire after ttl."""
+        if members:
+            self.client.zrem(self._pending, *members)
+
+
+_store: UsageCounterStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_usage_counter_store() -> UsageCounterStore | None:
+    """
+    Returns the process wide counter store when settings.API_KEY_USAGE_BACKEND is "redis".
+
+    Returns:
+        UsageCounterStore | None: The store, or None when usage is recorded in the database.
+    """
+    global _store
+
+    if _store is None:
+        from django.conf import settings
+
+        if getattr(settings, "API_KEY_USAGE_BACKEND", "database") != "redis":
+            return None
+
+        from core.helpers.redis_client import redis_client
+
+        with _store_lock:
+            if _store is None:
+                _store = UsageCounterStore(
+                    redis_client,
+                    ttl=getattr(settings, "API_KEY_USAGE_COUNTER_TTL", 25 * 3600),
+                    rollup_delay=getattr(settings, "API_KEY_USAGE_ROLLUP_DELAY", 120),
+                )
+    return _store
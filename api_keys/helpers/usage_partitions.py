@@ -0,0 +1,134 @@
+import re
+from datetime import datetime, timezone
+
+from django.db import connection, transaction
+
+from api_keys.helpers.usage_rollups import rebuild_rollups
+
+USAGE_TABLE = "api_keys_apikeyusage"
+DEFAULT_PARTITION = f"{USAGE_TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{USAGE_TABLE}_(\d{{4}})_(\d{{2}})$")
+
+
+def month_start(moment: datetime) -> datetime:
+    """Returns the start of the UTC month of a timezone aware datetime."""
+    return moment.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{USAGE_TABLE}_{month:%Y_%m}"
+
+
+def is_partitioned() -> bool:
+    """Returns whether ApiKeyUsage is stored in a Postgres table partitioned by month, see migration 0007."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [USAGE_TABLE])
+        return cursor.fetchone() is not None
+
+
+def monthly_partitions() -> list[datetime]:
+    """Returns the months with a partition, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [USAGE_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc))
+    return sorted(months)
+
+
+def create_partition(month: datetime) -> bool:
+    """
+    Creates the partition of a month, moving its rows out of the default partition if any landed there.
+
+    Returns:
+        bool: False if the partition already existed.
+    """
+    if month in monthly_partitions():
+        return False
+
+    name = connection.ops.quote_name(partition_name(month))
+    parent = connection.ops.quote_name(USAGE_TABLE)
+    default = connection.ops.quote_name(DEFAULT_PARTITION)
+    bounds = [month, add_months(month, 1)]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        # Postgres refuses to attach a partition while the default partition holds rows of its range
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default} WHERE time_of_usage >= %s AND time_of_usage < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            bounds,
+        )
+        # DDL takes no parameters, the bounds are formatted from datetimes
+        cursor.execute(
+            f"ALTER TABLE {parent} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds[0].isoformat()}') TO ('{bounds[1].isoformat()}')"
+        )
+    return True
+
+
+def drop_partition(month: datetime):
+    name = connection.ops.quote_name(partition_name(month))
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Postgres refuses to drop a table with deferred foreign key checks pending, e.g. rows inserted earlier
+        # in the same transaction, so they are run now
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"ALTER TABLE {connection.ops.quote_name(USAGE_TABLE)} DETACH PARTITION {name}")
+        cursor.execute(f"DROP TABLE {name}")
+
+
+def compact_usage(before: datetime) -> dict:
+    """
+    Rolls up the usage records older than a month boundary into ApiKeyUsageRollup, then removes them.
+
+    Each month is compacted in its own transaction: its rollups are recomputed from its records, then its
+    partition is dropped, which is instant and leaves no dead rows to vacuum. Without a partitioned table,
+    and for records that landed in the default partition, the records of the month are deleted instead.
+    A month is never left with some of its records deleted, so an interrupted run can simply be repeated.
+
+    Args:
+        before (datetime): The first month kept, the start of a UTC month.
+
+    Returns:
+        dict: rollups written, partitions dropped and rows deleted.
+    """
+    from api_keys.models import ApiKeyUsage
+
+    result = {"rollups": 0, "partitions_dropped": [], "rows_deleted": 0}
+
+    if is_partitioned():
+        for month in monthly_partitions():
+            if add_months(month, 1) > before:
+                continue
+            with transaction.atomic():
+                result["rollups"] += rebuild_rollups(month, add_months(month, 1))
+                drop_partition(month)
+            result["partitions_dropped"].append(partition_name(month))
+
+    oldest = ApiKeyUsage.objects.filter(time_of_usage__lt=before).order_by("time_of_usage").values_list(
+        "time_of_usage", flat=True
+    ).first()
+    month = month_start(oldest) if oldest else before
+    while month < before:
+        end = add_months(month, 1)
+        with transaction.atomic():
+            result["rollups"] += rebuild_rollups(month, end)
+            result["rows_deleted"] += ApiKeyUsage.objects.filter(time_of_usage__gte=month, time_of_usage__lt=end).delete()[0]
+        month = end
+    return result
@@ -0,0 +1,183 @@
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from django.db import IntegrityError
+
+from api_keys.helpers.usage_rollups import write_usage
+
+from core.helpers.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+FLUSH_DURATION = registry.histogram("api_key_usage_flush_duration_seconds", "Time to write a batch of API key usage records")
+USAGE_RECORDS = registry.counter(
+    "api_key_usage_records_total", "API key usage records by outcome: written, or dropped when the queue is full or a batch fails", ("outcome",)
+)
+
+
+class UsageRecorder:
+    """
+    Queues ApiKeyUsage records in process memory and writes them, with their hourly rollups,
+    in batches from a background thread.
+
+    A batch is written once it holds batch_size records, or flush_interval seconds after its first record.
+    The queue holds at most max_queue records, so when the database is down memory stays bounded and new
+    records are dropped (and counted) instead. A failing batch is retried max_retries times before it is dropped.
+    Queued records are written by close, called when the worker shuts down.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int, max_retries: int = 3):
+        """
+        Args:
+            batch_size (int): Maximum number of records written by one INSERT.
+            flush_interval (float): Seconds a record waits at most before its batch is written.
+            max_queue (int): Maximum number of records waiting to be written.
+            max_retries (int): Times a failing batch is retried before it is dropped.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._write_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._writer = None
+        self._writer_pid = None
+        self._writer_lock = threading.Lock()
+
+    def record(self, api_key_id: int, endpoint: str, item_count: int, time_of_usage: datetime) -> bool:
+        """
+        Queues a usage record without waiting for the database.
+
+        Returns:
+            bool: False if the queue is full and the record was dropped.
+        """
+        self._start_writer()
+        try:
+            self._queue.put_nowait((api_key_id, endpoint, item_count, time_of_usage))
+        except queue.Full:
+            USAGE_RECORDS.inc("dropped")
+            return False
+        return True
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> int:
+        """
+        Writes every queued record from the calling thread, e.g. in tests.
+
+        Returns:
+            int: The number of records written.
+        """
+        written = 0
+        while True:
+            batch = self._take(self.batch_size)
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def close(self, timeout: float = 5.0):
+        """Stops the background thread and writes the records still queued, called when the worker shuts down."""
+        self._stopped.set()
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._writer.join(timeout)
+        self.flush()
+
+    def discard(self) -> int:
+        """
+        Drops every queued record without writing it, e.g. before the test database is destroyed.
+
+        Returns:
+            int: The number of records dropped.
+        """
+        discarded = 0
+        while batch := self._take(self.batch_size):
+            discarded += len(batch)
+        return discarded
+
+    def _take(self, limit: int) -> list[tuple]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[tuple]) -> int:
+        from django.db import connection
+
+        from api_keys.models import ApiKeyUsage
+
+        records = [
+            ApiKeyUsage(api_key_id=api_key_id, endpoint=endpoint, item_count=item_count, time_of_usage=time_of_usage)
+            for api_key_id, endpoint, item_count, time_of_usage in batch
+        ]
+        for attempt in range(self.max_retries + 1):
+            started_at = time.perf_counter()
+            try:
+                with self._write_lock:
+                    write_usage(records)
+            except IntegrityError as e:
+                # e.g. a key deleted while its records were queued, retrying cannot help
+                logger.error(f"[UsageRecorder] Dropping {len(records)} usage records: {e}")
+                break
+            except Exception as e:
+                logger.warning(f"[UsageRecorder] Failed to write {len(records)} usage records (attempt {attempt + 1}): {e}")
+                if not connection.in_atomic_block:
+                    # Reconnect for the next attempt rather than reuse a broken connection
+                    connection.close_if_unusable_or_obsolete()
+                if attempt < self.max_retries:
+                    self._stopped.wait(0.5 * 2 ** attempt)
+                continue
+            FLUSH_DURATION.observe(time.perf_counter() - started_at)
+            USAGE_RECORDS.inc("written", amount=len(records))
+            return len(records)
+
+        USAGE_RECORDS.inc("dropped", amount=len(records))
+        return 0
+
+    def _start_writer(self):
+        if self._writer_pid == os.getpid() or self._stopped.is_set():
+            return
+        with self._writer_lock:
+            # Threads do not survive a fork, each worker process starts its own
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+            self._writer = threading.Thread(target=self._run, name="api-key-usage", daemon=True)
+            self._writer.start()
+
+    def _run(self):
+        from django.db import connection
+
+        try:
+            while not self._stopped.is_set():
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+
+                batch = [first]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                try:
+                    self._write(batch)
+                except Exception:
+                    # The thread is never restarted, so whatever goes wrong only costs this batch
+                    logger.exception(f"[UsageRecorder] Dropping {len(batch)} usage records")
+                    USAGE_RECORDS.inc("dropped", amount=len(batch))
+        finally:
+            connection.close()
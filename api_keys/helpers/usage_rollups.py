@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection, transaction
+from django.db.models import Sum
+
+
+def truncate_to_hour(moment: datetime) -> datetime:
+    """Returns the start of the UTC hour of a timezone aware datetime, the hour of its rollup row."""
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def write_usage(records: list) -> None:
+    """
+    Inserts ApiKeyUsage records and adds them to the hourly ApiKeyUsageRollup rows, in one transaction.
+
+    The rollup rows are upserted adding to the stored counts, so concurrent writers never lose an increment.
+
+    Args:
+        records (list[ApiKeyUsage]): Unsaved usage records with time_of_usage set.
+    """
+    from api_keys.models import ApiKeyUsage
+
+    counts = {}
+    for record in records:
+        group = (record.api_key_id, record.endpoint, truncate_to_hour(record.time_of_usage))
+        requests, items = counts.get(group, (0, 0))
+        counts[group] = (requests + 1, items + record.item_count)
+
+    with transaction.atomic(savepoint=False):
+        ApiKeyUsage.objects.bulk_create(records)
+        _upsert_rollups(
+            ["request_count", "item_count"],
+            [(*group, requests, items) for group, (requests, items) in counts.items()],
+            {
+                "request_count": "rollup.request_count + excluded.request_count",
+                "item_count": "rollup.item_count + excluded.item_count",
+            },
+        )
+
+
+def write_counter_rollups(counts: dict) -> int:
+    """
+    Stores the hourly counts rolled up from the Redis usage counters.
+
+    They replace the counter_* part of each rollup row, and request_count and item_count change by the same
+    difference, so counts added by write_usage for the same hour are kept and writing the same counts twice
+    changes nothing.
+
+    Args:
+        counts (dict): {(key id, hour start, endpoint): (requests, items)}, the full counts of each hour.
+
+    Returns:
+        int: The number of hourly rollup rows written.
+    """
+    rows = [
+        (key_id, endpoint, hour, requests, items, requests, items)
+        for (key_id, hour, endpoint), (requests, items) in counts.items()
+    ]
+    with transaction.atomic():
+        _upsert_rollups(
+            ["request_count", "item_count", "counter_request_count", "counter_item_count"],
+            rows,
+            {
+                "request_count": "rollup.request_count - rollup.counter_request_count + excluded.counter_request_count",
+                "item_count": "rollup.item_count - rollup.counter_item_count + excluded.counter_item_count",
+                "counter_request_count": "excluded.counter_request_count",
+                "counter_item_count": "excluded.counter_item_count",
+            },
+        )
+    return len(rows)
+
+
+def count_requests_since(api_key_id: int, since: datetime) -> int:
+    """
+    Counts the requests of a key since a moment, from the rollups of the whole hours after it
+    and the usage records of the partial hour it falls in, read through the (api_key, time_of_usage) index.
+    """
+    from api_keys.models import ApiKeyUsage, ApiKeyUsageRollup
+
+    next_hour = truncate_to_hour(since) + timedelta(hours=1)
+    partial_hour = ApiKeyUsage.objects.filter(
+        api_key_id=api_key_id, time_of_usage__gte=since, time_of_usage__lt=next_hour
+    ).count()
+    whole_hours = ApiKeyUsageRollup.objects.filter(api_key_id=api_key_id, hour__gte=next_hour).aggregate(
+        total=Sum("request_count")
+    )["total"] or 0
+    return partial_hour + whole_hours
+
+
+def rebuild_rollups(start: datetime, end: datetime, batch_size: int = 2000) -> int:
+    """
+    Recomputes the rollups of every hour with usage records between two hour boundaries,
+    replacing the counts added by usage records. Run before records are deleted, it also rolls up records written
+    without write_usage (e.g. through the admin).
+
+    Returns:
+        int: The number of hourly rollup rows written.
+    """
+    from django.db.models import Count
+    from django.db.models.functions import TruncHour
+
+    from api_keys.models import ApiKeyUsage
+
+    hours = (
+        ApiKeyUsage.objects.filter(time_of_usage__gte=start, time_of_usage__lt=end)
+        .annotate(hour=TruncHour("time_of_usage", tzinfo=timezone.utc))
+        .values("api_key_id", "endpoint", "hour")
+        .annotate(request_count=Count("id"), item_count=Sum("item_count"))
+        .order_by()
+    )
+
+    written = 0
+    batch = []
+    for hour in hours.iterator(chunk_size=batch_size):
+        batch.append(hour)
+        if len(batch) == batch_size:
+            written += _replace_rollups(batch)
+            batch = []
+    return written + _replace_rollups(batch)
+
+
+def _replace_rollups(rollups: list[dict]) -> int:
+    # The counter_* part was rolled up from Redis and has no usage records, it stays on top of the recomputed counts
+    _upsert_rollups(
+        ["request_count", "item_count"],
+        [(row["api_key_id"], row["endpoint"], row["hour"], row["request_count"], row["item_count"]) for row in rollups],
+        {
+            "request_count": "excluded.request_count + rollup.counter_request_count",
+            "item_count": "excluded.item_count + rollup.counter_item_count",
+        },
+    )
+    return len(rollups)
+
+
+def _upsert_rollups(count_columns: list[str], rows: list[tuple], updates: dict, batch_size: int = 1000):
+    """
+    Inserts rollup rows, or updates the existing row of their key, endpoint and hour, in a single
+    INSERT ... ON CONFLICT DO UPDATE per batch, supported by Postgres and SQLite.
+
+    Args:
+        count_columns (list[str]): The columns inserted after api_key_id, endpoint and hour.
+        rows (list[tuple]): (key id, endpoint, hour start, *counts) in the order of count_columns.
+        updates (dict): Column -> SQL expression on conflict, the stored row is "rollup" and the new one "excluded".
+    """
+    from api_keys.models import ApiKeyUsageRollup
+
+    table = connection.ops.quote_name(ApiKeyUsageRollup._meta.db_table)
+    columns = ["api_key_id", "endpoint", "hour", *count_columns]
+    placeholders = f"({', '.join(['%s'] * len(columns))})"
+    assignments = ", ".join(f"{column} = {expression}" for column, expression in updates.items())
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = []
+            for api_key_id, endpoint, hour, *counts in batch:
+                params.extend([api_key_id, endpoint, connection.ops.adapt_datetimefield_value(hour), *counts])
+            cursor.execute(
+                f"INSERT INTO {table} AS rollup ({', '.join(columns)}) "
+                f"VALUES {', '.join([placeholders] * len(batch))} "
+                f"ON CONFLICT (api_key_id, endpoint, hour) DO UPDATE SET {assignments}",
+                params,
+            )
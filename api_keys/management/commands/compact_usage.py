@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api_keys.helpers.usage_partitions import add_months, compact_usage, month_start
+
+
+class Command(BaseCommand):
+    help = (
+        "Compacts API key usage records older than the retention period into hourly rollups, then removes them. "
+        "Monthly partitions are dropped whole. Usage stats keep counting compacted months from the rollups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=getattr(settings, "API_KEY_USAGE_RETENTION_MONTHS", 6),
+            help="Complete months of usage records kept besides the current one",
+        )
+
+    def handle(self, *args, **options):
+        if options["retention_months"] < 0:
+            raise CommandError("--retention-months must not be negative")
+
+        started_at = time.perf_counter()
+        before = add_months(month_start(timezone.now()), -options["retention_months"])
+        result = compact_usage(before)
+
+        dropped = ", ".join(result["partitions_dropped"]) or "none"
+        self.stdout.write(
+            f"Compacted usage before {before:%Y-%m} in {time.perf_counter() - started_at:.2f}s: "
+            f"{result['rollups']} hourly rollups written, {result['rows_deleted']} rows deleted, partitions dropped: {dropped}"
+        )
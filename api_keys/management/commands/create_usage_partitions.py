@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api_keys.helpers.usage_partitions import add_months, create_partition, is_partitioned, month_start, partition_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the monthly partitions of the API key usage table ahead of time. Run it daily from cron, "
+        "rows of a month without a partition land in the default partition until it is created."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=getattr(settings, "API_KEY_USAGE_PARTITIONS_AHEAD", 3),
+            help="Months after the current one to create partitions for",
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError("The usage table is not partitioned, partitioning requires PostgreSQL")
+
+        current = month_start(timezone.now())
+        for months in range(options["months_ahead"] + 1):
+            month = add_months(current, months)
+            if create_partition(month):
+                self.stdout.write(f"Created {partition_name(month)}")
+            else:
+                self.stdout.write(f"{partition_name(month)} already exists")
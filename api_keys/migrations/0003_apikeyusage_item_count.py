@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_keys', '0002_apikeyusage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apikeyusage',
+            name='item_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:57
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_keys', '0003_apikeyusage_item_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apikeyusage',
+            name='time_of_usage',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
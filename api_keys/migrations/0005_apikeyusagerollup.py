@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_keys', '0004_apikeyusage_time_of_usage_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiKeyUsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=200)),
+                ('hour', models.DateTimeField()),
+                ('request_count', models.PositiveBigIntegerField(default=0)),
+                ('item_count', models.PositiveBigIntegerField(default=0)),
+                ('api_key', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_rollups', to='api_keys.apikey')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('api_key', 'endpoint', 'hour'), name='unique_usage_rollup_hour')],
+            },
+        ),
+    ]
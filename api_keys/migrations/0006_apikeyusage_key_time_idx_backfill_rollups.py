@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:00
+
+from datetime import timezone
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncHour
+
+
+def backfill_usage_rollups(apps, schema_editor):
+    """Rolls up the usage records written before rollups were maintained with every batch."""
+    ApiKeyUsage = apps.get_model('api_keys', 'ApiKeyUsage')
+    ApiKeyUsageRollup = apps.get_model('api_keys', 'ApiKeyUsageRollup')
+
+    hours = (
+        ApiKeyUsage.objects
+        .annotate(hour=TruncHour('time_of_usage', tzinfo=timezone.utc))
+        .values('api_key_id', 'endpoint', 'hour')
+        .annotate(request_count=Count('id'), item_count=Sum('item_count'))
+        .order_by()
+    )
+    batch = []
+    for hour in hours.iterator(chunk_size=2000):
+        batch.append(ApiKeyUsageRollup(**hour))
+        if len(batch) == 2000:
+            _save_rollups(ApiKeyUsageRollup, batch)
+            batch = []
+    _save_rollups(ApiKeyUsageRollup, batch)
+
+
+def _save_rollups(ApiKeyUsageRollup, rollups):
+    ApiKeyUsageRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=['api_key', 'endpoint', 'hour'],
+        update_fields=['request_count', 'item_count'],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_keys', '0005_apikeyusagerollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apikeyusage',
+            index=models.Index(fields=['api_key', 'time_of_usage'], name='apikeyusage_key_time_idx'),
+        ),
+        migrations.RunPython(backfill_usage_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+# Partitions created ahead of the current month, later months are created by create_usage_partitions
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_usage_table(apps, schema_editor):
+    """
+    Moves api_keys_apikeyusage into a table partitioned by month of time_of_usage, on Postgres only.
+
+    Postgres requires the partition key in the primary key, so the primary key becomes (id, time_of_usage).
+    The ORM still addresses rows by id, which stays unique since it comes from a single identity sequence.
+    Rows outside every monthly partition land in api_keys_apikeyusage_default.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT MIN(time_of_usage) FROM api_keys_apikeyusage")
+        oldest = cursor.fetchone()[0]
+
+    current = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month = current
+    if oldest is not None:
+        month = min(current, oldest.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0))
+
+    schema_editor.execute("ALTER TABLE api_keys_apikeyusage RENAME TO api_keys_apikeyusage_unpartitioned")
+    schema_editor.execute(
+        "CREATE TABLE api_keys_apikeyusage ("
+        "id bigint GENERATED BY DEFAULT AS IDENTITY, "
+        "endpoint varchar(200) NOT NULL, "
+        "time_of_usage timestamp with time zone NOT NULL, "
+        "api_key_id bigint NOT NULL, "
+        "item_count integer NOT NULL CHECK (item_count >= 0)"
+        ") PARTITION BY RANGE (time_of_usage)"
+    )
+    schema_editor.execute("CREATE TABLE api_keys_apikeyusage_default PARTITION OF api_keys_apikeyusage DEFAULT")
+    while month <= _add_months(current, MONTHS_AHEAD):
+        schema_editor.execute(
+            f"CREATE TABLE api_keys_apikeyusage_{month:%Y_%m} PARTITION OF api_keys_apikeyusage "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    schema_editor.execute(
+        "INSERT INTO api_keys_apikeyusage (id, endpoint, time_of_usage, api_key_id, item_count) "
+        "SELECT id, endpoint, time_of_usage, api_key_id, item_count FROM api_keys_apikeyusage_unpartitioned"
+    )
+    schema_editor.execute("DROP TABLE api_keys_apikeyusage_unpartitioned")
+
+    schema_editor.execute("ALTER TABLE api_keys_apikeyusage ADD PRIMARY KEY (id, time_of_usage)")
+    schema_editor.execute(
+        "ALTER TABLE api_keys_apikeyusage ADD CONSTRAINT api_keys_apikeyusage_api_key_id_fk "
+        "FOREIGN KEY (api_key_id) REFERENCES api_keys_apikey (id) DEFERRABLE INITIALLY DEFERRED"
+    )
+    # Also serves lookups by api_key alone, in place of the foreign key index of the old table
+    schema_editor.execute("CREATE INDEX apikeyusage_key_time_idx ON api_keys_apikeyusage (api_key_id, time_of_usage)")
+    schema_editor.execute(
+        "SELECT setval(pg_get_serial_sequence('api_keys_apikeyusage', 'id'), "
+        "(SELECT COALESCE(MAX(id), 0) + 1 FROM api_keys_apikeyusage), false)"
+    )
+
+
+def unpartition_usage_table(apps, schema_editor):
+    """Copies api_keys_apikeyusage back into a plain table with the layout of migration 0006, on Postgres only."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(
+        "CREATE TABLE api_keys_apikeyusage_unpartitioned ("
+        "id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, "
+        "endpoint varchar(200) NOT NULL, "
+        "time_of_usage timestamp with time zone NOT NULL, "
+        "api_key_id bigint NOT NULL, "
+        "item_count integer NOT NULL CHECK (item_count >= 0)"
+        ")"
+    )
+    schema_editor.execute(
+        "INSERT INTO api_keys_apikeyusage_unpartitioned (id, endpoint, time_of_usage, api_key_id, item_count) "
+        "SELECT id, endpoint, time_of_usage, api_key_id, item_count FROM api_keys_apikeyusage"
+    )
+    # Drops every partition with it
+    schema_editor.execute("DROP TABLE api_keys_apikeyusage")
+    schema_editor.execute("ALTER TABLE api_keys_apikeyusage_unpartitioned RENAME TO api_keys_apikeyusage")
+    schema_editor.execute(
+        "ALTER TABLE api_keys_apikeyusage ADD CONSTRAINT api_keys_apikeyusage_api_key_id_fk "
+        "FOREIGN KEY (api_key_id) REFERENCES api_keys_apikey (id) DEFERRABLE INITIALLY DEFERRED"
+    )
+    schema_editor.execute("CREATE INDEX api_keys_apikeyusage_api_key_id_idx ON api_keys_apikeyusage (api_key_id)")
+    schema_editor.execute("CREATE INDEX apikeyusage_key_time_idx ON api_keys_apikeyusage (api_key_id, time_of_usage)")
+    schema_editor.execute(
+        "SELECT setval(pg_get_serial_sequence('api_keys_apikeyusage', 'id'), "
+        "(SELECT COALESCE(MAX(id), 0) + 1 FROM api_keys_apikeyusage), false)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_keys', '0006_apikeyusage_key_time_idx_backfill_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_usage_table, unpartition_usage_table),
+    ]
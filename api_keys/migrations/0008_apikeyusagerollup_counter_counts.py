@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:15
+
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_counter_rollups(apps, schema_editor):
+    """
+    With the Redis usage backend, marks the rollups of hours still held by the counters as rolled up from them,
+    so the next rollup of those hours replaces their counts instead of adding to them.
+    """
+    if getattr(settings, "API_KEY_USAGE_BACKEND", "database") != "redis":
+        return
+
+    ttl = getattr(settings, "API_KEY_USAGE_COUNTER_TTL", 25 * 3600)
+    since = datetime.now(timezone.utc) - timedelta(seconds=ttl + 3600)
+    apps.get_model("api_keys", "ApiKeyUsageRollup").objects.filter(hour__gte=since).update(
+        counter_request_count=F("request_count"), counter_item_count=F("item_count")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_keys', '0007_partition_apikeyusage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apikeyusagerollup',
+            name='counter_item_count',
+            field=models.PositiveBigIntegerField(db_default=0, default=0),
+        ),
+        migrations.AddField(
+            model_name='apikeyusagerollup',
+            name='counter_request_count',
+            field=models.PositiveBigIntegerField(db_default=0, default=0),
+        ),
+        migrations.RunPython(mark_counter_rollups, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class ApiKey(models.Model):
     key_hash = models.CharField(max_length=128, unique=True)
@@ -11,7 +12,40 @@ class ApiKey(models.Model):
 class ApiKeyUsage(models.Model):
     api_key = models.ForeignKey(ApiKey, on_delete=models.CASCADE, related_name='usage_logs')
     endpoint = models.CharField(max_length=200)
-    time_of_usage = models.DateTimeField(auto_now_add=True)
+    item_count = models.PositiveIntegerField(default=1)
+    # Set when the request is tracked, not when the buffered record is written
+    time_of_usage = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Serves the per-key time range reads of get_usage_stats
+            models.Index(fields=['api_key', 'time_of_usage'], name='apikeyusage_key_time_idx'),
+        ]
     
     def __str__(self):
-        return f"Usage of {self.api_key.key_hash[:8]}... at {self.endpoint}"
\ No newline at end of file
+        return f"Usage of {self.api_key.key_hash[:8]}... at {self.endpoint}"
+
+class ApiKeyUsageRollup(models.Model):
+    """
+    Usage of a key per endpoint and UTC hour. Kept up to date with every batch of ApiKeyUsage records,
+    or rolled up from the Redis usage counters when those are the usage backend.
+
+    request_count and item_count include the counter_* part rolled up from Redis, which is kept apart
+    so a rollup replaces its own earlier counts without touching those added by usage records.
+    """
+    api_key = models.ForeignKey(ApiKey, on_delete=models.CASCADE, related_name='usage_rollups')
+    endpoint = models.CharField(max_length=200)
+    hour = models.DateTimeField()
+    request_count = models.PositiveBigIntegerField(default=0)
+    item_count = models.PositiveBigIntegerField(default=0)
+    # Defaulted by the database too, the raw upserts of usage_rollups.write_usage leave them out
+    counter_request_count = models.PositiveBigIntegerField(default=0, db_default=0)
+    counter_item_count = models.PositiveBigIntegerField(default=0, db_default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['api_key', 'endpoint', 'hour'], name='unique_usage_rollup_hour'),
+        ]
+
+    def __str__(self):
+        return f"Usage of {self.api_key.key_hash[:8]}... at {self.endpoint} during {self.hour:%Y-%m-%d %H:00}"
@@ -1,11 +1,74 @@
-from api_keys.models import ApiKey, ApiKeyUsage
+from api_keys.constants.constants import (
+    API_KEY_CACHE_MAX_ENTRIES,
+    API_KEY_CACHE_NEGATIVE_TTL,
+    API_KEY_CACHE_TTL,
+    API_KEY_LAST_USAGE_FLUSH_INTERVAL,
+    API_KEY_USAGE_BATCH_SIZE,
+    API_KEY_USAGE_FLUSH_INTERVAL,
+    API_KEY_USAGE_MAX_QUEUE,
+)
+from api_keys.models import ApiKey, ApiKeyUsage, ApiKeyUsageRollup
+from api_keys.helpers.api_key_cache import MISSING, ApiKeyCache
 from api_keys.helpers.key_generator import generate_api_key, hash_api_key
-from datetime import datetime
+from api_keys.helpers.last_usage_buffer import LastUsageBuffer
+from api_keys.helpers.shared_key_registry import get_shared_key_registry
+from api_keys.helpers.usage_counters import get_usage_counter_store
+from api_keys.helpers.usage_recorder import UsageRecorder
+from api_keys.helpers.usage_rollups import count_requests_since, write_counter_rollups, write_usage
+import logging
+from datetime import timedelta
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+import redis
+
+logger = logging.getLogger(__name__)
 
 class ApiKeyService:
     """
     Service class for API key operations.
     """
+    # Raw key -> (key id, is_active). Invalidated by id when an ApiKey is saved, in every worker
+    # when the shared registry is enabled, see api_keys.signals.
+    key_cache = ApiKeyCache(API_KEY_CACHE_MAX_ENTRIES, API_KEY_CACHE_TTL, API_KEY_CACHE_NEGATIVE_TTL)
+    # Key id -> latest use not yet written to ApiKey.last_usage, flushed every API_KEY_LAST_USAGE_FLUSH_INTERVAL seconds
+    last_usage_buffer = LastUsageBuffer(API_KEY_LAST_USAGE_FLUSH_INTERVAL)
+    # ApiKeyUsage records waiting to be written in bulk by a background thread
+    usage_recorder = UsageRecorder(API_KEY_USAGE_BATCH_SIZE, API_KEY_USAGE_FLUSH_INTERVAL, API_KEY_USAGE_MAX_QUEUE)
+
+    @staticmethod
+    def resolve_api_key(api_key: str) -> tuple[int, bool] | None:
+        """
+        Looks up an API key in key_cache, then in the shared Redis registry when enabled, then in the database.
+
+        Args:
+            api_key (str): The raw API key
+
+        Returns:
+            tuple[int, bool] | None: The key id and whether the key is active, or None if the key does not exist
+        """
+        key = ApiKeyService.key_cache.get(api_key)
+        if key is not MISSING:
+            return key
+
+        # Read before any lookup, so a result racing an invalidation is not cached, see ApiKeyCache and SharedKeyRegistry
+        generation = ApiKeyService.key_cache.generation()
+        key_hash = hash_api_key(api_key)
+        shared_registry = get_shared_key_registry()
+        version = None
+        if shared_registry is not None:
+            shared_registry.start_listener(ApiKeyService.key_cache.invalidate_key_id, ApiKeyService.key_cache.clear)
+            key = shared_registry.get(key_hash)
+            if key is not None:
+                ApiKeyService.key_cache.set(api_key, key, generation)
+                return key
+            version = shared_registry.get_version(key_hash)
+
+        key = ApiKey.objects.filter(key_hash=key_hash).values_list("id", "is_active").first()
+        if key is not None and shared_registry is not None:
+            shared_registry.set(key_hash, key, version)
+        ApiKeyService.key_cache.set(api_key, key, generation)
+        return key
     
     @staticmethod
     def generate_api_key() -> dict:
@@ -27,6 +90,7 @@ class ApiKeyService:
             
             # Create and save the API key record
             api_key_obj = ApiKey.objects.create(key_hash=key_hash)
+            ApiKeyService.key_cache.invalidate(api_key)
             
             return {
                 "success": True,
@@ -52,24 +116,23 @@ class ApiKeyService:
             dict: Verification result
         """
         try:
-            key_hash = hash_api_key(api_key)
-            api_key_obj = ApiKey.objects.get(key_hash=key_hash, is_active=True)
-            
-            # Update last usage
-            api_key_obj.last_usage = datetime.now()
-            api_key_obj.save(update_fields=['last_usage'])
+            key = ApiKeyService.resolve_api_key(api_key)
+            if key is None or not key[1]:
+                return {
+                    "valid": False,
+                    "error": "Invalid API key"
+                }
+
+            # Update last usage, written to the database by the next flush of last_usage_buffer
+            last_usage = timezone.now()
+            ApiKeyService.last_usage_buffer.record(key[0], last_usage)
             
             return {
                 "valid": True,
-                "id": api_key_obj.id,
-                "last_usage": api_key_obj.last_usage
+                "id": key[0],
+                "last_usage": last_usage
             }
             
-        except ApiKey.DoesNotExist:
-            return {
-                "valid": False,
-                "error": "Invalid API key"
-            }
         except Exception as e:
             return {
                 "valid": False,
@@ -77,43 +140,59 @@ class ApiKeyService:
             }
     
     @staticmethod
-    def track_usage(api_key: str, endpoint: str) -> dict:
+    def track_usage(api_key: str, endpoint: str, item_count: int = 1) -> dict:
         """
         Track API key usage for analytics and monitoring.
+
+        With settings.API_KEY_USAGE_BACKEND set to "redis" the use is counted in the Redis usage counters.
+        Otherwise the usage record is queued on usage_recorder and written within API_KEY_USAGE_FLUSH_INTERVAL
+        seconds, so the request does not wait for the insert. Inside a transaction it is written right away instead,
+        since the recorder's own connection cannot see rows the transaction has not committed.
         
         Args:
             api_key (str): The API key that was used
             endpoint (str): The endpoint that was accessed
+            item_count (int): Number of items processed by the request (IDs in a batch)
             
         Returns:
             dict: Tracking result
         """
         try:
-            ApiKeyService.verify_api_key(api_key)
+            key = ApiKeyService.resolve_api_key(api_key)
+            if key is None or not key[1]:
+                return {
+                    "success": False,
+                    "error": "API key not found"
+                }
+
+            time_of_usage = timezone.now()
 
-            key_hash = hash_api_key(api_key)
-            api_key_obj = ApiKey.objects.get(key_hash=key_hash, is_active=True)
-            
             # Create usage log
-            ApiKeyUsage.objects.create(
-                api_key=api_key_obj,
-                endpoint=endpoint
-            )
+            counter_store = get_usage_counter_store()
+            if counter_store is not None:
+                try:
+                    counter_store.increment(key[0], endpoint, item_count, time_of_usage)
+                except redis.RedisError as e:
+                    # Losing a count is preferred over failing the request
+                    logger.warning(f"[ApiKeyService] Failed to count usage of key {key[0]}: {e}")
+            elif connection.in_atomic_block:
+                write_usage([ApiKeyUsage(
+                    api_key_id=key[0],
+                    endpoint=endpoint,
+                    item_count=item_count,
+                    time_of_usage=time_of_usage
+                )])
+            else:
+                ApiKeyService.usage_recorder.record(key[0], endpoint, item_count, time_of_usage)
             
-            # Update last usage timestamp
-            api_key_obj.last_usage = datetime.now()
-            api_key_obj.save(update_fields=['last_usage'])
+            # Update last usage timestamp, written to the database by the next flush of last_usage_buffer
+            ApiKeyService.last_usage_buffer.record(key[0], time_of_usage)
             
             return {
                 "success": True,
                 "message": "Usage tracked successfully"
             }
             
-        except ApiKey.DoesNotExist:
-            return {
-                "success": False,
-                "error": "API key not found"
-            }
         except Exception as e:
             return {
                 "success": False,
@@ -124,6 +203,14 @@ class ApiKeyService:
     def get_usage_stats(api_key: str) -> dict:
         """
         Get usage statistics for an API key.
+
+        With settings.API_KEY_USAGE_BACKEND set to "redis" the counts are read from the Redis usage counters
+        in one round-trip, otherwise from the hourly ApiKeyUsageRollup rows kept with the usage records.
+        Either way the cost does not grow with the number of requests made with the key.
+
+        last_usage includes uses buffered by this worker. Uses served by other workers are written to the
+        database by their last_usage_buffer, so last_usage lags the latest request by at most
+        API_KEY_LAST_USAGE_FLUSH_INTERVAL seconds, plus the time a flush takes.
         
         Args:
             api_key (str): The API key to get stats for
@@ -134,31 +221,38 @@ class ApiKeyService:
         try:
             key_hash = hash_api_key(api_key)
             api_key_obj = ApiKey.objects.get(key_hash=key_hash)
-            
-            # Get usage logs
-            usage_logs = ApiKeyUsage.objects.filter(api_key=api_key_obj).order_by('-time_of_usage')
-            
-            # Count total usage
-            total_usage = usage_logs.count()
-            
-            # Get recent usage (last 24 hours)
-            from datetime import timedelta
-            recent_cutoff = datetime.now() - timedelta(hours=24)
-            recent_usage = usage_logs.filter(time_of_usage__gte=recent_cutoff).count()
-            
-            # Get endpoint breakdown
-            endpoint_stats = {}
-            for log in usage_logs:
-                endpoint = log.endpoint
-                endpoint_stats[endpoint] = endpoint_stats.get(endpoint, 0) + 1
+
+            counter_store = get_usage_counter_store()
+            if counter_store is not None:
+                usage = counter_store.read_stats(api_key_obj.id, timezone.now())
+            else:
+                # Get endpoint breakdown, and the totals from it
+                rollups = ApiKeyUsageRollup.objects.filter(api_key=api_key_obj)
+                endpoint_totals = list(rollups.values('endpoint').annotate(
+                    requests=Sum('request_count'), items=Sum('item_count')
+                ).order_by())
+                endpoint_stats = {row['endpoint']: row['requests'] for row in endpoint_totals}
+
+                # Get recent usage (last 24 hours)
+                recent_usage = count_requests_since(api_key_obj.id, timezone.now() - timedelta(hours=24))
+
+                usage = {
+                    "total_usage": sum(endpoint_stats.values()),
+                    "total_items": sum(row['items'] for row in endpoint_totals),
+                    "recent_usage_24h": recent_usage,
+                    "endpoint_breakdown": endpoint_stats,
+                }
+
+            last_usage = api_key_obj.last_usage
+            pending_usage = ApiKeyService.last_usage_buffer.pending(api_key_obj.id)
+            if pending_usage is not None and (last_usage is None or pending_usage > last_usage):
+                last_usage = pending_usage
             
             return {
                 "success": True,
                 "api_key_id": api_key_obj.id,
-                "total_usage": total_usage,
-                "recent_usage_24h": recent_usage,
-                "endpoint_breakdown": endpoint_stats,
-                "last_usage": api_key_obj.last_usage,
+                **usage,
+                "last_usage": last_usage,
             }
             
         except ApiKey.DoesNotExist:
@@ -170,4 +264,48 @@ class ApiKeyService:
             return {
                 "success": False,
                 "error": f"Failed to get usage stats: {str(e)}"
-            }
\ No newline at end of file
+            }
+
+    @staticmethod
+    def rollup_usage_counters() -> int:
+        """
+        Copies the Redis usage counters of every hour with newly closed minutes into ApiKeyUsageRollup.
+
+        Hours are recomputed from all of their minute buckets and replace what earlier rollups of the hour added,
+        so running this again, e.g. after a failure, never counts a use twice. Usage written to the database for
+        the same hours, e.g. while switching backends, is kept, see write_counter_rollups.
+
+        Returns:
+            int: The number of hourly rollup rows written.
+
+        Raises:
+            RuntimeError: If settings.API_KEY_USAGE_BACKEND is not "redis".
+        """
+        counter_store = get_usage_counter_store()
+        if counter_store is None:
+            raise RuntimeError('Usage counters are only kept with API_KEY_USAGE_BACKEND set to "redis"')
+
+        counts, members = counter_store.rollup(timezone.now())
+        # Keys deleted since their use have nothing to roll up into
+        existing_ids = set(ApiKey.objects.filter(id__in={key_id for key_id, _, _ in counts}).values_list("id", flat=True))
+        written = write_counter_rollups({group: count for group, count in counts.items() if group[0] in existing_ids})
+        counter_store.acknowledge(members)
+        return written
+
+    @staticmethod
+    def stop_usage_writers():
+        """
+        Writes the buffered last usage timestamps and queued usage records, and stops their background threads.
+
+        Call it from the server's worker shutdown hook, e.g. gunicorn's worker_exit, while the worker's
+        database settings are still in effect. Nothing is written at interpreter exit.
+        """
+        ApiKeyService.last_usage_buffer.stop()
+        ApiKeyService.usage_recorder.close()
+
+    @staticmethod
+    def discard_usage_writers():
+        """Drops the buffered usage without writing it and stops the background threads, e.g. at the end of a test run."""
+        ApiKeyService.last_usage_buffer.clear()
+        ApiKeyService.usage_recorder.discard()
+        ApiKeyService.stop_usage_writers()
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api_keys.helpers.shared_key_registry import get_shared_key_registry
+from api_keys.models import ApiKey
+from api_keys.services.api_key_service import ApiKeyService
+
+
+@receiver(post_save, sender=ApiKey)
+@receiver(post_delete, sender=ApiKey)
+def invalidate_cached_api_key(sender, instance, **kwargs):
+    """
+    Drops cached lookups of a key that was saved (e.g. deactivated) or deleted, and with the shared registry
+    enabled removes it from Redis and broadcasts the invalidation to every other worker.
+    QuerySet.update does not send signals, callers changing is_active that way must invalidate themselves.
+
+    Invalidation waits for the transaction to commit: before that, a concurrent lookup still reads the old row
+    and would cache it again right after it was dropped.
+    """
+    # The id is read now, Django clears it once a deleted instance is gone
+    key_id, key_hash = instance.id, instance.key_hash
+
+    def invalidate():
+        ApiKeyService.key_cache.invalidate_key_id(key_id)
+
+        shared_registry = get_shared_key_registry()
+        if shared_registry is not None:
+            shared_registry.invalidate(key_id, key_hash)
+
+    transaction.on_commit(invalidate)
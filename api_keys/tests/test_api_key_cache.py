@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from api_keys.helpers.api_key_cache import MISSING
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.models import ApiKey, ApiKeyUsage
+from api_keys.services.api_key_service import ApiKeyService
+
+class ApiKeyCacheTests(APITestCase):
+    def setUp(self):
+        ApiKeyService.key_cache.clear()
+        self.api_key = generate_api_key()
+        self.api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(self.api_key))
+
+    def test_tracking_a_cached_key_skips_the_lookup(self):
+        """
+        Ensure only the usage insert and its rollup hit the database once the key is cached, last usage is buffered.
+        """
+        ApiKeyService.track_usage(self.api_key, "validate_national_id")
+
+        with CaptureQueriesContext(connection) as queries:
+            result = ApiKeyService.track_usage(self.api_key, "validate_national_id")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(ApiKeyUsage.objects.filter(api_key=self.api_key_obj).count(), 2)
+        self.assertGreaterEqual(ApiKeyService.key_cache.stats()["hits"], 1)
+
+    def test_unknown_keys_are_cached(self):
+        """
+        Ensure an unknown key is only looked up once.
+        """
+        unknown_key = generate_api_key()
+        self.assertFalse(ApiKeyService.verify_api_key(unknown_key)["valid"])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(ApiKeyService.verify_api_key(unknown_key)["valid"])
+
+        self.assertEqual(len(queries), 0)
+
+    def test_deactivating_a_key_invalidates_it(self):
+        """
+        Ensure a key deactivated through the ORM is rejected right away.
+        """
+        self.assertTrue(ApiKeyService.verify_api_key(self.api_key)["valid"])
+
+        self.api_key_obj.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key_obj.save()
+
+        self.assertFalse(ApiKeyService.verify_api_key(self.api_key)["valid"])
+        self.assertFalse(ApiKeyService.track_usage(self.api_key, "validate_national_id")["success"])
+
+    def test_keys_are_invalidated_once_the_transaction_commits(self):
+        """
+        Ensure a key changed inside a transaction stays cached until the transaction commits.
+        """
+        self.assertTrue(ApiKeyService.verify_api_key(self.api_key)["valid"])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                self.api_key_obj.is_active = False
+                self.api_key_obj.save()
+                self.assertIsNot(ApiKeyService.key_cache.get(self.api_key), MISSING)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertIs(ApiKeyService.key_cache.get(self.api_key), MISSING)
+
+    def test_lookups_racing_an_invalidation_are_not_cached(self):
+        """
+        Ensure a lookup result read before an invalidation is not cached after it.
+        """
+        generation = ApiKeyService.key_cache.generation()
+        ApiKeyService.key_cache.invalidate_key_id(self.api_key_obj.id)
+
+        ApiKeyService.key_cache.set(self.api_key, (self.api_key_obj.id, True), generation)
+
+        self.assertIs(ApiKeyService.key_cache.get(self.api_key), MISSING)
+
+    def test_deleting_a_key_invalidates_it(self):
+        """
+        Ensure a deleted key is rejected once the deletion commits.
+        """
+        self.assertTrue(ApiKeyService.verify_api_key(self.api_key)["valid"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key_obj.delete()
+
+        self.assertFalse(ApiKeyService.verify_api_key(self.api_key)["valid"])
+
+    def test_generated_key_replaces_a_cached_miss(self):
+        """
+        Ensure a key is usable right after generation even if it was looked up before.
+        """
+        api_key = generate_api_key()
+        self.assertFalse(ApiKeyService.verify_api_key(api_key)["valid"])
+
+        with mock.patch("api_keys.services.api_key_service.generate_api_key", return_value=api_key):
+            self.assertEqual(ApiKeyService.generate_api_key()["api_key"], api_key)
+
+        self.assertTrue(ApiKeyService.verify_api_key(api_key)["valid"])
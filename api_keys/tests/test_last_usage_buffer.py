@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.helpers.last_usage_buffer import LastUsageBuffer
+from api_keys.models import ApiKey
+from api_keys.services.api_key_service import ApiKeyService
+
+class LastUsageBufferTests(APITestCase):
+    def setUp(self):
+        ApiKeyService.key_cache.clear()
+        # A long interval so only the explicit flushes below write to the database
+        self.buffer = LastUsageBuffer(flush_interval=3600)
+        patcher = mock.patch.object(ApiKeyService, "last_usage_buffer", self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.buffer.stop)
+
+        self.api_key = generate_api_key()
+        self.api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(self.api_key))
+
+    def test_uses_are_coalesced_into_one_update(self):
+        """
+        Ensure repeated uses of a cached key do not write last usage until the buffer is flushed.
+        """
+        other_key = generate_api_key()
+        other_key_obj = ApiKey.objects.create(key_hash=hash_api_key(other_key))
+        ApiKeyService.verify_api_key(self.api_key)
+        ApiKeyService.verify_api_key(other_key)
+
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(5):
+                self.assertTrue(ApiKeyService.verify_api_key(self.api_key)["valid"])
+                self.assertTrue(ApiKeyService.verify_api_key(other_key)["valid"])
+        self.assertEqual(len(queries), 0)
+        self.assertIsNone(ApiKey.objects.get(id=self.api_key_obj.id).last_usage)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(len(queries), 1)
+        self.assertIsNotNone(ApiKey.objects.get(id=self.api_key_obj.id).last_usage)
+        self.assertIsNotNone(ApiKey.objects.get(id=other_key_obj.id).last_usage)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_flush_never_moves_last_usage_backwards(self):
+        """
+        Ensure a worker flushing an older timestamp does not overwrite a newer one.
+        """
+        newer = timezone.now()
+        ApiKey.objects.filter(id=self.api_key_obj.id).update(last_usage=newer)
+
+        self.buffer.record(self.api_key_obj.id, newer - timedelta(minutes=1))
+        self.buffer.flush()
+
+        self.assertEqual(ApiKey.objects.get(id=self.api_key_obj.id).last_usage, newer)
+
+    def test_usage_stats_include_buffered_uses(self):
+        """
+        Ensure stats report the latest use of this worker before it is flushed.
+        """
+        ApiKeyService.verify_api_key(self.api_key)
+
+        stats = ApiKeyService.get_usage_stats(self.api_key)
+
+        self.assertEqual(stats["last_usage"], self.buffer.pending(self.api_key_obj.id))
@@ -0,0 +1,115 @@
+import time
+
+import fakeredis
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from api_keys.helpers import shared_key_registry
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.helpers.shared_key_registry import SharedKeyRegistry
+from api_keys.models import ApiKey
+from api_keys.services.api_key_service import ApiKeyService
+
+@override_settings(API_KEY_SHARED_REGISTRY=True)
+class SharedKeyRegistryTests(APITestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.registry = SharedKeyRegistry(fakeredis.FakeRedis(server=self.server, decode_responses=True))
+        shared_key_registry._registry = self.registry
+        self.addCleanup(setattr, shared_key_registry, "_registry", None)
+        ApiKeyService.key_cache.clear()
+
+        self.api_key = generate_api_key()
+        self.api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(self.api_key))
+
+    def test_other_workers_resolve_from_redis(self):
+        """
+        Ensure a key loaded by one worker is resolved from Redis by a worker with a cold local cache.
+        """
+        self.assertEqual(ApiKeyService.resolve_api_key(self.api_key), (self.api_key_obj.id, True))
+        ApiKeyService.key_cache.clear()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(ApiKeyService.resolve_api_key(self.api_key), (self.api_key_obj.id, True))
+
+    def test_deactivation_is_broadcast(self):
+        """
+        Ensure deactivating a key removes it from Redis and from the local caches of listening workers.
+        """
+        other_worker_invalidations = []
+        other_worker = SharedKeyRegistry(fakeredis.FakeRedis(server=self.server, decode_responses=True))
+        other_worker.start_listener(other_worker_invalidations.append, lambda: None)
+        ApiKeyService.resolve_api_key(self.api_key)
+        time.sleep(0.1)
+
+        self.api_key_obj.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_key_obj.save()
+
+        deadline = time.monotonic() + 2
+        while not other_worker_invalidations and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(other_worker_invalidations, [self.api_key_obj.id])
+        self.assertIsNone(self.registry.get(self.api_key_obj.key_hash))
+        self.assertFalse(ApiKeyService.verify_api_key(self.api_key)["valid"])
+
+    def test_lookups_racing_an_invalidation_are_not_stored(self):
+        """
+        Ensure a row read from the database before an invalidation is not written back to Redis after it.
+        """
+        key_hash = self.api_key_obj.key_hash
+        version = self.registry.get_version(key_hash)
+        self.registry.invalidate(self.api_key_obj.id, key_hash)
+
+        self.assertFalse(self.registry.set(key_hash, (self.api_key_obj.id, True), version))
+        self.assertIsNone(self.registry.get(key_hash))
+
+        self.assertTrue(self.registry.set(key_hash, (self.api_key_obj.id, False), self.registry.get_version(key_hash)))
+        self.assertEqual(self.registry.get(key_hash), (self.api_key_obj.id, False))
+
+    def test_failed_invalidations_are_resent(self):
+        """
+        Ensure an invalidation Redis rejected is resent once Redis is back, and the stale entry is ignored until then.
+        """
+        registry = SharedKeyRegistry(fakeredis.FakeRedis(server=self.server, decode_responses=True), retry_interval=0)
+        key_hash = self.api_key_obj.key_hash
+        registry.set(key_hash, (self.api_key_obj.id, True), registry.get_version(key_hash))
+
+        self.server.connected = False
+        registry.invalidate(self.api_key_obj.id, key_hash)
+        self.server.connected = True
+
+        self.assertIsNone(registry.get(key_hash))
+        self.assertEqual(registry.client.hgetall(registry.prefix + key_hash), {})
+        self.assertEqual(registry._pending_invalidations, {})
+
+    def test_listener_survives_unexpected_errors(self):
+        """
+        Ensure an error raised while applying an invalidation does not stop the listener.
+        """
+        registry = SharedKeyRegistry(fakeredis.FakeRedis(server=self.server, decode_responses=True), retry_interval=0.05)
+        invalidations = []
+
+        def on_invalidate(key_id):
+            if not invalidations:
+                invalidations.append(None)
+                raise RuntimeError("boom")
+            invalidations.append(key_id)
+
+        registry.start_listener(on_invalidate, lambda: None)
+        time.sleep(0.1)
+        self.registry.invalidate(1, "first")
+
+        deadline = time.monotonic() + 2
+        while len(invalidations) < 2 and time.monotonic() < deadline:
+            self.registry.invalidate(2, "second")
+            time.sleep(0.1)
+        self.assertEqual(invalidations[:2], [None, 2])
+
+    def test_redis_errors_fall_back_to_the_database(self):
+        """
+        Ensure keys still resolve from the database while Redis is down.
+        """
+        self.server.connected = False
+
+        self.assertEqual(ApiKeyService.resolve_api_key(self.api_key), (self.api_key_obj.id, True))
@@ -0,0 +1,110 @@
+from datetime import timedelta
+from unittest import mock
+
+import fakeredis
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api_keys.helpers import usage_counters
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.helpers.usage_counters import MINUTES_PER_DAY, UsageCounterStore, hour_start, minute_of
+from api_keys.helpers.usage_rollups import rebuild_rollups, write_usage
+from api_keys.models import ApiKey, ApiKeyUsage, ApiKeyUsageRollup
+from api_keys.services.api_key_service import ApiKeyService
+
+@override_settings(API_KEY_USAGE_BACKEND="redis")
+class UsageCounterTests(APITestCase):
+    def setUp(self):
+        self.store = UsageCounterStore(fakeredis.FakeRedis(decode_responses=True))
+        usage_counters._store = self.store
+        self.addCleanup(setattr, usage_counters, "_store", None)
+        ApiKeyService.key_cache.clear()
+
+        self.api_key = generate_api_key()
+        self.api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(self.api_key))
+
+    def test_usage_stats_are_read_from_the_counters(self):
+        """
+        Ensure tracked usage is counted in Redis, not the database, and read back in one round-trip.
+        """
+        ApiKeyService.track_usage(self.api_key, "validate_national_id")
+        ApiKeyService.track_usage(self.api_key, "validate_national_ids_batch", 20)
+        self.store.increment(self.api_key_obj.id, "validate_national_id", 1, timezone.now() - timedelta(days=2))
+
+        with mock.patch.object(self.store.client, "pipeline", wraps=self.store.client.pipeline) as pipeline:
+            stats = ApiKeyService.get_usage_stats(self.api_key)
+
+        self.assertEqual(pipeline.call_count, 1)
+        self.assertEqual(ApiKeyUsage.objects.count(), 0)
+        self.assertEqual(stats["total_usage"], 3)
+        self.assertEqual(stats["total_items"], 22)
+        self.assertEqual(stats["recent_usage_24h"], 2)
+        self.assertEqual(stats["endpoint_breakdown"], {"validate_national_id": 2, "validate_national_ids_batch": 1})
+
+    def test_recent_usage_covers_exactly_the_last_24_hours(self):
+        """
+        Ensure recent usage counts the minute 24 hours back and every hour since, but nothing older.
+        """
+        now = timezone.now()
+        for minutes_ago in (MINUTES_PER_DAY, MINUTES_PER_DAY - 1, 12 * 60, 0):
+            self.store.increment(self.api_key_obj.id, "validate_national_id", 1, now - timedelta(minutes=minutes_ago))
+
+        pipeline = self.store.client.pipeline(transaction=False)
+        execute = pipeline.execute
+        reads = []
+        with mock.patch.object(self.store.client, "pipeline", return_value=pipeline), \
+                mock.patch.object(pipeline, "execute", side_effect=lambda: reads.append(len(pipeline.command_stack)) or execute()):
+            stats = self.store.read_stats(self.api_key_obj.id, now)
+
+        self.assertEqual(stats["total_usage"], 4)
+        self.assertEqual(stats["recent_usage_24h"], 3)
+        # The totals, 23 or 24 hour buckets and 60 minute buckets
+        self.assertLessEqual(reads[0], 85)
+
+    def test_rollup_is_idempotent(self):
+        """
+        Ensure closed minutes are rolled up into hourly rows, and later minutes of the hour replace rather than add.
+        """
+        hour = hour_start(minute_of(timezone.now() - timedelta(hours=3)))
+        self.store.increment(self.api_key_obj.id, "validate_national_id", 1, hour + timedelta(minutes=1))
+        self.store.increment(self.api_key_obj.id, "validate_national_id", 5, hour + timedelta(minutes=2))
+
+        call_command("rollup_usage_counters", stdout=mock.MagicMock())
+        self.assertEqual(ApiKeyService.rollup_usage_counters(), 0)
+
+        self.store.increment(self.api_key_obj.id, "validate_national_id", 1, hour + timedelta(minutes=59))
+        self.assertEqual(ApiKeyService.rollup_usage_counters(), 1)
+
+        rollup = ApiKeyUsageRollup.objects.get(api_key=self.api_key_obj, endpoint="validate_national_id")
+        self.assertEqual(rollup.hour, hour)
+        self.assertEqual((rollup.request_count, rollup.item_count), (3, 7))
+
+    def test_recently_closed_minutes_are_not_rolled_up(self):
+        """
+        Ensure a minute is only rolled up rollup_delay seconds after it closed, so late increments are not lost.
+        """
+        now = timezone.now()
+        self.store.increment(self.api_key_obj.id, "validate_national_id", 1, now - timedelta(seconds=90))
+        self.store.increment(self.api_key_obj.id, "validate_national_id", 1, now - timedelta(minutes=10))
+
+        counts, members = self.store.rollup(now)
+
+        self.assertEqual(members, [f"{self.api_key_obj.id}:{minute_of(now - timedelta(minutes=10))}"])
+
+    def test_rollup_keeps_usage_written_to_the_database(self):
+        """
+        Ensure rolled up counters add to usage records of the same hour, and rebuilding from the records keeps them.
+        """
+        hour = hour_start(minute_of(timezone.now() - timedelta(hours=3)))
+        write_usage([ApiKeyUsage(api_key=self.api_key_obj, endpoint="validate_national_id", item_count=10, time_of_usage=hour)])
+        self.store.increment(self.api_key_obj.id, "validate_national_id", 1, hour + timedelta(minutes=1))
+
+        ApiKeyService.rollup_usage_counters()
+        self.store.increment(self.api_key_obj.id, "validate_national_id", 2, hour + timedelta(minutes=2))
+        ApiKeyService.rollup_usage_counters()
+        rebuild_rollups(hour, hour + timedelta(hours=1))
+
+        rollup = ApiKeyUsageRollup.objects.get(api_key=self.api_key_obj, endpoint="validate_national_id")
+        self.assertEqual((rollup.request_count, rollup.item_count), (3, 13))
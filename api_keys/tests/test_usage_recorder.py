@@ -0,0 +1,119 @@
+import time
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.helpers.usage_recorder import UsageRecorder
+from api_keys.models import ApiKey, ApiKeyUsage
+from api_keys.services.api_key_service import ApiKeyService
+
+class UsageRecorderTests(APITestCase):
+    def setUp(self):
+        ApiKeyService.key_cache.clear()
+        self.recorder = UsageRecorder(batch_size=2, flush_interval=0.05, max_queue=3, max_retries=0)
+        # Only the explicit flushes below write, the test transaction is not visible to a writer thread
+        start_writer = mock.patch.object(self.recorder, "_start_writer")
+        start_writer.start()
+        self.addCleanup(start_writer.stop)
+        self.addCleanup(self.recorder.close)
+
+        self.api_key = generate_api_key()
+        self.api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(self.api_key))
+
+    def test_tracking_queues_the_usage_record(self):
+        """
+        Ensure tracking a cached key outside a transaction does not write until the recorder flushes.
+        """
+        ApiKeyService.resolve_api_key(self.api_key)
+
+        with mock.patch.object(ApiKeyService, "usage_recorder", self.recorder), \
+                mock.patch.object(connection, "in_atomic_block", False):
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(3):
+                    self.assertTrue(ApiKeyService.track_usage(self.api_key, "validate_national_id", 4)["success"])
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(self.recorder.queue_depth(), 3)
+        self.assertEqual(ApiKeyUsage.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.recorder.flush(), 3)
+        # Two batches of at most batch_size records, each an insert and a rollup upsert
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(ApiKeyUsage.objects.filter(api_key=self.api_key_obj, item_count=4).count(), 3)
+        self.assertEqual(self.recorder.queue_depth(), 0)
+
+    def test_full_queue_drops_records(self):
+        """
+        Ensure memory stays bounded by dropping records once max_queue records are waiting.
+        """
+        results = [self.recorder.record(self.api_key_obj.id, "validate_national_id", 1, timezone.now()) for _ in range(5)]
+
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(self.recorder.queue_depth(), 3)
+
+    def test_failing_batch_is_dropped(self):
+        """
+        Ensure a batch the database keeps rejecting is dropped after its retries instead of blocking the queue.
+        """
+        self.recorder.record(self.api_key_obj.id, "validate_national_id", 1, timezone.now())
+
+        with mock.patch("api_keys.helpers.usage_recorder.write_usage", side_effect=OperationalError("database is down")):
+            self.assertEqual(self.recorder.flush(), 0)
+
+        self.assertEqual(self.recorder.queue_depth(), 0)
+        self.assertEqual(ApiKeyUsage.objects.count(), 0)
+
+    def test_discarded_records_are_never_written(self):
+        """
+        Ensure discarding drops the queued records, so closing the recorder afterwards writes nothing.
+        """
+        for _ in range(3):
+            self.recorder.record(self.api_key_obj.id, "validate_national_id", 1, timezone.now())
+
+        self.assertEqual(self.recorder.discard(), 3)
+        self.recorder.close()
+
+        self.assertEqual(ApiKeyUsage.objects.count(), 0)
+
+class UsageRecorderWriterTests(TransactionTestCase):
+    def test_writer_thread_writes_batches(self):
+        """
+        Ensure the background thread writes queued records without an explicit flush.
+        """
+        api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(generate_api_key()))
+        recorder = UsageRecorder(batch_size=10, flush_interval=0.05, max_queue=100)
+        self.addCleanup(recorder.close)
+
+        for _ in range(3):
+            recorder.record(api_key_obj.id, "validate_national_id", 1, timezone.now())
+
+        deadline = time.monotonic() + 5
+        while ApiKeyUsage.objects.count() < 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(ApiKeyUsage.objects.filter(api_key=api_key_obj).count(), 3)
+
+    def test_writer_thread_survives_unexpected_errors(self):
+        """
+        Ensure a batch failing with an error other than a DatabaseError does not stop the background thread.
+        """
+        api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(generate_api_key()))
+        recorder = UsageRecorder(batch_size=10, flush_interval=0.05, max_queue=100, max_retries=0)
+        self.addCleanup(recorder.close)
+
+        with mock.patch("api_keys.helpers.usage_recorder.write_usage", side_effect=RuntimeError("boom")) as write_usage:
+            recorder.record(api_key_obj.id, "validate_national_id", 1, timezone.now())
+            deadline = time.monotonic() + 5
+            while write_usage.call_count < 1 and time.monotonic() < deadline:
+                time.sleep(0.02)
+
+        recorder.record(api_key_obj.id, "validate_national_id", 2, timezone.now())
+
+        deadline = time.monotonic() + 5
+        while not ApiKeyUsage.objects.exists() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(list(ApiKeyUsage.objects.values_list("item_count", flat=True)), [2])
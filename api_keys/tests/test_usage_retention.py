@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from unittest import skipIf, skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.helpers.usage_partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    compact_usage,
+    create_partition,
+    is_partitioned,
+    month_start,
+    monthly_partitions,
+)
+from api_keys.helpers.usage_rollups import write_usage
+from api_keys.models import ApiKey, ApiKeyUsage, ApiKeyUsageRollup
+from api_keys.services.api_key_service import ApiKeyService
+
+class UsageRetentionTests(APITestCase):
+    def setUp(self):
+        ApiKeyService.key_cache.clear()
+        self.api_key = generate_api_key()
+        self.api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(self.api_key))
+        self.current_month = month_start(timezone.now())
+
+    def usage(self, time_of_usage):
+        return ApiKeyUsage(api_key=self.api_key_obj, endpoint="validate_national_id", time_of_usage=time_of_usage)
+
+    def test_months_arithmetic(self):
+        """
+        Ensure month boundaries roll over years.
+        """
+        month = datetime(2026, 11, 1, tzinfo=dt_timezone.utc)
+        self.assertEqual(add_months(month, 2), datetime(2027, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(add_months(month, -11), datetime(2025, 12, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(month_start(datetime(2026, 11, 30, 23, 59, tzinfo=dt_timezone.utc)), month)
+
+    def test_compacted_usage_still_counts_in_stats(self):
+        """
+        Ensure records before the retention period are removed while stats keep counting them.
+        """
+        old_month = add_months(self.current_month, -8)
+        write_usage([self.usage(old_month + timedelta(days=3, minutes=minutes)) for minutes in range(10)])
+        write_usage([self.usage(timezone.now() - timedelta(minutes=1))])
+        # Written without a rollup, e.g. through the admin
+        ApiKeyUsage.objects.create(api_key=self.api_key_obj, endpoint="extract_data", time_of_usage=old_month)
+        stats_before = ApiKeyService.get_usage_stats(self.api_key)
+
+        stdout = StringIO()
+        call_command("compact_usage", "--retention-months", "6", stdout=stdout)
+
+        self.assertIn("11 rows deleted", stdout.getvalue())
+        self.assertEqual(ApiKeyUsage.objects.count(), 1)
+        stats = ApiKeyService.get_usage_stats(self.api_key)
+        self.assertEqual(stats["total_usage"], 12)
+        self.assertEqual(stats["endpoint_breakdown"], {"validate_national_id": 11, "extract_data": 1})
+        self.assertEqual(stats["recent_usage_24h"], stats_before["recent_usage_24h"])
+
+    def test_compaction_can_be_repeated(self):
+        """
+        Ensure running compaction again leaves the rollups of compacted months unchanged.
+        """
+        old_month = add_months(self.current_month, -8)
+        write_usage([self.usage(old_month + timedelta(hours=hours)) for hours in range(5)])
+
+        compact_usage(add_months(self.current_month, -6))
+        result = compact_usage(add_months(self.current_month, -6))
+
+        self.assertEqual(result["rows_deleted"], 0)
+        self.assertEqual(ApiKeyUsageRollup.objects.filter(api_key=self.api_key_obj).count(), 5)
+
+    @skipIf(connection.vendor == "postgresql", "The usage table is partitioned on PostgreSQL")
+    def test_partitions_require_postgres(self):
+        """
+        Ensure creating partitions fails clearly on a database without a partitioned usage table.
+        """
+        with self.assertRaises(CommandError):
+            call_command("create_usage_partitions", stdout=StringIO())
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning requires PostgreSQL")
+class UsagePartitionTests(APITestCase):
+    def setUp(self):
+        self.api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(generate_api_key()))
+        self.old_month = add_months(month_start(timezone.now()), -8)
+
+    def rows_in(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+            return cursor.fetchone()[0]
+
+    def test_late_partition_takes_the_rows_of_the_default_partition(self):
+        """
+        Ensure creating the partition of a month whose rows landed in the default partition moves them into it.
+        """
+        write_usage([
+            ApiKeyUsage(api_key=self.api_key_obj, endpoint="validate_national_id", time_of_usage=self.old_month + timedelta(days=day))
+            for day in range(3)
+        ])
+        self.assertEqual(self.rows_in(DEFAULT_PARTITION), 3)
+
+        self.assertTrue(create_partition(self.old_month))
+        self.assertFalse(create_partition(self.old_month))
+
+        self.assertIn(self.old_month, monthly_partitions())
+        self.assertEqual(self.rows_in(DEFAULT_PARTITION), 0)
+        self.assertEqual(self.rows_in(f"api_keys_apikeyusage_{self.old_month:%Y_%m}"), 3)
+        self.assertEqual(ApiKeyUsage.objects.count(), 3)
+
+    def test_compaction_drops_old_partitions(self):
+        """
+        Ensure compaction rolls up and drops the partitions of months before the retention period.
+        """
+        create_partition(self.old_month)
+        write_usage([
+            ApiKeyUsage(api_key=self.api_key_obj, endpoint="validate_national_id", time_of_usage=self.old_month + timedelta(hours=hours))
+            for hours in range(4)
+        ])
+        write_usage([ApiKeyUsage(api_key=self.api_key_obj, endpoint="validate_national_id", time_of_usage=timezone.now())])
+
+        result = compact_usage(add_months(self.old_month, 2))
+
+        self.assertEqual(result["partitions_dropped"], [f"api_keys_apikeyusage_{self.old_month:%Y_%m}"])
+        self.assertNotIn(self.old_month, monthly_partitions())
+        self.assertEqual(ApiKeyUsage.objects.count(), 1)
+        self.assertEqual(ApiKeyUsageRollup.objects.filter(hour__lt=add_months(self.old_month, 1)).count(), 4)
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning requires PostgreSQL")
+class PartitionMigrationTests(TransactionTestCase):
+    before = [("api_keys", "0006_apikeyusage_key_time_idx_backfill_rollups")]
+    after = [("api_keys", "0007_partition_apikeyusage")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+
+    def setUp(self):
+        self.addCleanup(self.migrate, MigrationExecutor(connection).loader.graph.leaf_nodes())
+        self.migrate(self.before)
+
+    def rows_in_default_partition(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {DEFAULT_PARTITION}")
+            return cursor.fetchone()[0]
+
+    def test_existing_rows_are_moved_into_monthly_partitions(self):
+        """
+        Ensure the migration partitions a table holding rows, which keep their ids, and new rows still get ids.
+        """
+        self.assertFalse(is_partitioned())
+        old_month = add_months(month_start(timezone.now()), -2)
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO api_keys_apikey (key_hash, is_active) VALUES ('hash', true) RETURNING id")
+            key_id = cursor.fetchone()[0]
+            cursor.execute(
+                "INSERT INTO api_keys_apikeyusage (endpoint, time_of_usage, api_key_id, item_count) "
+                "VALUES ('validate_national_id', %s, %s, 1), ('validate_national_id', NOW(), %s, 1) RETURNING id",
+                [old_month, key_id, key_id],
+            )
+            ids = sorted(row[0] for row in cursor.fetchall())
+
+        self.migrate(self.after)
+
+        self.assertTrue(is_partitioned())
+        self.assertEqual(monthly_partitions()[0], old_month)
+        self.assertEqual(sorted(ApiKeyUsage.objects.values_list("id", flat=True)), ids)
+        self.assertEqual(self.rows_in_default_partition(), 0)
+        new_usage = ApiKeyUsage.objects.create(api_key_id=key_id, endpoint="validate_national_id")
+        self.assertGreater(new_usage.id, ids[-1])
+
+        self.migrate(self.before)
+        self.assertFalse(is_partitioned())
+        self.assertEqual(sorted(ApiKeyUsage.objects.values_list("id", flat=True)), [*ids, new_usage.id])
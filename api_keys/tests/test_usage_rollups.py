@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.helpers.usage_rollups import truncate_to_hour, write_usage
+from api_keys.models import ApiKey, ApiKeyUsage, ApiKeyUsageRollup
+from api_keys.services.api_key_service import ApiKeyService
+
+class UsageRollupTests(APITestCase):
+    def setUp(self):
+        ApiKeyService.key_cache.clear()
+        self.api_key = generate_api_key()
+        self.api_key_obj = ApiKey.objects.create(key_hash=hash_api_key(self.api_key))
+
+    def usage(self, endpoint, time_of_usage, item_count=1):
+        return ApiKeyUsage(api_key=self.api_key_obj, endpoint=endpoint, item_count=item_count, time_of_usage=time_of_usage)
+
+    def test_batches_add_to_the_hourly_rollup(self):
+        """
+        Ensure each batch of usage records adds to the rollup of its hour instead of replacing it.
+        """
+        hour = truncate_to_hour(timezone.now())
+        write_usage([self.usage("validate_national_id", hour), self.usage("validate_national_id", hour, 3)])
+        write_usage([self.usage("validate_national_id", hour + timedelta(minutes=30), 5)])
+
+        rollup = ApiKeyUsageRollup.objects.get(api_key=self.api_key_obj, endpoint="validate_national_id", hour=hour)
+        self.assertEqual((rollup.request_count, rollup.item_count), (3, 9))
+
+    def test_usage_stats_are_read_from_the_rollups(self):
+        """
+        Ensure stats match the usage records and take the same queries however many records a key has.
+        """
+        now = timezone.now()
+        write_usage(
+            [self.usage("validate_national_id", now - timedelta(days=2))]
+            # Just inside and just outside the last 24 hours, in the same partial hour
+            + [self.usage("validate_national_id", now - timedelta(hours=24) + timedelta(seconds=5))]
+            + [self.usage("validate_national_id", now - timedelta(hours=24) - timedelta(seconds=5))]
+            + [self.usage("validate_national_ids_batch", now - timedelta(minutes=minutes), 10) for minutes in range(100)]
+        )
+        ApiKeyService.track_usage(self.api_key, "validate_national_id")
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = ApiKeyService.get_usage_stats(self.api_key)
+        write_usage([self.usage("validate_national_id", now - timedelta(minutes=minutes)) for minutes in range(500)])
+        with CaptureQueriesContext(connection) as more_queries:
+            ApiKeyService.get_usage_stats(self.api_key)
+
+        self.assertEqual(stats["total_usage"], 104)
+        self.assertEqual(stats["total_items"], 1004)
+        self.assertEqual(stats["recent_usage_24h"], 102)
+        self.assertEqual(stats["endpoint_breakdown"], {"validate_national_id": 4, "validate_national_ids_batch": 100})
+        self.assertEqual(len(queries), len(more_queries))
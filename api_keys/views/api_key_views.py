@@ -4,12 +4,14 @@ from rest_framework import status
 
 from api_keys.serializers.api_key_serializer import GenerateApiKeySerializer, VerifyApiKeySerializer
 from api_keys.services.api_key_service import ApiKeyService
+from core.decorators.request_profiler import profile_request
 
 class GenerateApiKeyView(APIView):
     """
     View for generating new API keys.
     """
     
+    @profile_request("generate_api_key")
     def post(self, request):
         """Generate a new API key (always 64 characters)."""
         serializer = GenerateApiKeySerializer(data=request.data)
@@ -27,6 +29,7 @@ class VerifyApiKeyView(APIView):
     View for verifying API keys.
     """
     
+    @profile_request("verify_api_key")
     def post(self, request):
         """Verify an API key."""
         serializer = VerifyApiKeySerializer(data=request.data)
@@ -45,6 +48,7 @@ class GetUsageStatsView(APIView):
     View for getting API key usage statistics.
     """
     
+    @profile_request("get_usage_stats")
     def post(self, request):
         """Get usage statistics for an API key."""
         api_key = request.data.get('api_key')
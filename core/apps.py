@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+
+        from core.helpers.metrics import registry
+
+        registry.configure(getattr(settings, "METRICS_DIR", None), getattr(settings, "METRICS_FLUSH_INTERVAL", 5.0))
@@ -1,16 +1,25 @@
 from functools import wraps
+from django.conf import settings
 from django.http import JsonResponse
-from django.core.cache import cache
 import time
 
-def rate_limit_by_api_key(requests_per_minute=2):
+from core.helpers.metrics import RATE_LIMITED, current_endpoint, record_stage
+from core.helpers.rate_limit import get_rate_limiter
+
+def rate_limit_by_api_key(requests_per_minute=2, algorithm=None):
     """
     Decorator to rate limit API requests based on API key.
     Only applies rate limiting when API key header exists.
-    
+
+    Limits are kept in Redis and shared by every worker, each check is one atomic round-trip.
+    Responses carry the RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset and RateLimit-Policy headers,
+    and rejected requests also Retry-After. When Redis is unavailable requests are let through.
+
     Args:
         requests_per_minute (int): Maximum number of requests allowed per minute
-        
+        algorithm (str, optional): sliding_window_log, sliding_window_counter or token_bucket.
+            Defaults to settings.RATE_LIMIT_ALGORITHM.
+
     Usage:
         @rate_limit_by_api_key(requests_per_minute=2)
         def my_view(request):
@@ -32,41 +41,39 @@ def rate_limit_by_api_key(requests_per_minute=2):
 
             # Get API key from headers
             api_key = request.headers.get("X-API-Key") or request.META.get("HTTP_X_API_KEY")
-            
+
             # Only apply rate limiting if API key exists
-            if api_key:
-                # Create a unique cache key for this API key
-                cache_key = f"rate_limit:{api_key}"
-                
-                # Get current request count and timestamp
-                current_data = cache.get(cache_key, {"count": 0, "window_start": time.time()})
-                current_time = time.time()
-                
-                # Check if we're still in the same minute window
-                if current_time - current_data["window_start"] < 60:
-                    # Still in the same minute window
-                    if current_data["count"] >= requests_per_minute:
-                        # Rate limit exceeded
-                        return JsonResponse(
-                            {
-                                "error": "Rate limit exceeded",
-                                "message": f"Maximum {requests_per_minute} requests per minute allowed",
-                                "retry_after": 60 - int(current_time - current_data["window_start"])
-                            },
-                            status=429
-                        )
-                    else:
-                        # Increment counter
-                        current_data["count"] += 1
-                else:
-                    # New minute window, reset counter
-                    current_data = {"count": 1, "window_start": current_time}
-                
-                # Update cache with new data (expire after 60 seconds)
-                cache.set(cache_key, current_data, 60)
+            if not api_key:
+                return view_func(*args, **kwargs)
+
+            started_at = time.perf_counter()
+            result = get_rate_limiter().check(
+                api_key,
+                requests_per_minute,
+                60,
+                algorithm or getattr(settings, "RATE_LIMIT_ALGORITHM", "sliding_window_log"),
+            )
+            record_stage("rate_limit", started_at)
+
+            if result is not None and not result.allowed:
+                # Rate limit exceeded
+                RATE_LIMITED.inc(current_endpoint.get())
+                response = JsonResponse(
+                    {
+                        "error": "Rate limit exceeded",
+                        "message": f"Maximum {requests_per_minute} requests per minute allowed",
+                        "retry_after": int(result.headers()["Retry-After"])
+                    },
+                    status=429
+                )
+            else:
+                # Call the original view function
+                response = view_func(*args, **kwargs)
 
-            # Call the original view function
-            return view_func(*args, **kwargs)
+            if result is not None:
+                for header, value in result.headers().items():
+                    response[header] = value
+            return response
 
         return wrapper
     return decorator
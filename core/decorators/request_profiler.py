@@ -0,0 +1,117 @@
+import cProfile
+import hmac
+import logging
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+from core.helpers.profiling import save_profile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+def _profiling_trigger(request) -> str | None:
+    admin_token = getattr(settings, "PROFILING_ADMIN_TOKEN", None)
+    token = request.headers.get(PROFILE_HEADER)
+    if admin_token and token and hmac.compare_digest(token, admin_token):
+        return "header"
+
+    sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+    if sample_rate and random.random() < sample_rate:
+        return "sample"
+    return None
+
+
+def profile_request(endpoint_name):
+    """
+    Decorator to profile a view on demand.
+
+    A request is profiled when it sends the X-Profile-Token header matching settings.PROFILING_ADMIN_TOKEN,
+    or when it is picked at random with probability settings.PROFILING_SAMPLE_RATE. The cProfile stats and
+    the SQL it ran are written to settings.PROFILING_DIR, which keeps the newest PROFILING_MAX_PROFILES profiles.
+    Requests profiled through the header get the profile id back in the X-Profile-Id response header.
+    Other requests only pay for the trigger check.
+
+    Args:
+        endpoint_name (str): The name of the endpoint, used in the profile id
+
+    Usage:
+        @profile_request("validate_national_id")
+        def my_view(request):
+            # Your view logic here
+            pass
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            # DRF passes (self, request, *args, **kwargs) for class-based views
+            # and (request, *args, **kwargs) for function-based views
+            if hasattr(args[0], "request"):
+                # It's a method on a class-based view
+                request = args[1]
+            else:
+                # It's a function-based view
+                request = args[0]
+
+            trigger = _profiling_trigger(request)
+            if trigger is None:
+                return view_func(*args, **kwargs)
+
+            queries = []
+
+            def record_query(execute, sql, params, many, context):
+                started_at = time.perf_counter()
+                try:
+                    return execute(sql, params, many, context)
+                finally:
+                    # Parameters are left out, they hold national IDs and API key hashes
+                    queries.append({"sql": sql, "duration_ms": (time.perf_counter() - started_at) * 1000})
+
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already running in this thread
+                return view_func(*args, **kwargs)
+
+            started_at = time.perf_counter()
+            try:
+                with connection.execute_wrapper(record_query):
+                    response = view_func(*args, **kwargs)
+            finally:
+                profiler.disable()
+            duration_ms = (time.perf_counter() - started_at) * 1000
+
+            try:
+                profile_id = save_profile(
+                    settings.PROFILING_DIR,
+                    profiler,
+                    {
+                        "endpoint": endpoint_name,
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "trigger": trigger,
+                        "duration_ms": duration_ms,
+                        "query_count": len(queries),
+                        "query_duration_ms": sum(query["duration_ms"] for query in queries),
+                        "queries": queries,
+                    },
+                    getattr(settings, "PROFILING_MAX_PROFILES", 200),
+                )
+            except Exception as e:
+                logger.error(f"[profile_request] Failed to save the profile of {endpoint_name}: {e}")
+                return response
+
+            if trigger == "header":
+                response[PROFILE_ID_HEADER] = profile_id
+            return response
+
+        return wrapper
+    return decorator
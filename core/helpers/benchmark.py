@@ -0,0 +1,174 @@
+import gc
+import json
+import platform
+import statistics
+import time
+
+MICRO = "micro"
+MACRO = "macro"
+KINDS = (MICRO, MACRO)
+
+# Allowed slowdown before a benchmark counts as a regression, as a fraction of the baseline median.
+# Macro benchmarks go through the database and are noisier.
+DEFAULT_THRESHOLDS = {MICRO: 0.2, MACRO: 0.35}
+
+OK = "ok"
+REGRESSED = "regressed"
+IMPROVED = "improved"
+NEW = "new"
+
+
+class Benchmark:
+    """
+    A named benchmark. factory is called once before timing and returns the callable that is timed.
+    """
+
+    def __init__(self, name: str, factory, kind: str = MICRO, requires_db: bool = False, threshold: float | None = None):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown benchmark kind '{kind}'")
+        self.name = name
+        self.factory = factory
+        self.kind = kind
+        self.requires_db = requires_db or kind == MACRO
+        self.threshold = DEFAULT_THRESHOLDS[kind] if threshold is None else threshold
+
+
+_registry: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, kind: str = MICRO, requires_db: bool = False, threshold: float | None = None):
+    """
+    Registers a benchmark. Apps declare benchmarks in a benchmarks.py module, which is discovered
+    by the benchmark management command.
+
+    Args:
+        name (str): Unique name, conventionally prefixed with the app name.
+        kind (str): MICRO for in-process functions, MACRO for requests through the full stack.
+        requires_db (bool): Whether the benchmark needs a database. Always true for MACRO benchmarks.
+        threshold (float, optional): Allowed slowdown over the baseline. Defaults to DEFAULT_THRESHOLDS[kind].
+
+    Usage:
+        @benchmark("national_id.check_sum")
+        def check_sum():
+            return lambda: validate_check_sum("29501012101234")
+    """
+    def decorator(factory):
+        if name in _registry:
+            raise ValueError(f"Benchmark '{name}' is already registered")
+        _registry[name] = Benchmark(name, factory, kind, requires_db, threshold)
+        return factory
+
+    return decorator
+
+
+def get_benchmarks() -> list[Benchmark]:
+    """Returns the registered benchmarks, sorted by name."""
+    return [_registry[name] for name in sorted(_registry)]
+
+
+def _time_loops(func, loops: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return time.perf_counter() - started_at
+
+
+def measure(func, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """
+    Times a callable. The loop count is grown until one run of loops lasts at least min_time,
+    then the run is repeated and per call timings are summarized.
+
+    Args:
+        func: The callable to time, called without arguments.
+        min_time (float): Minimum seconds per run.
+        repeat (int): Number of runs.
+
+    Returns:
+        dict: median_ns, min_ns and max_ns per call, ops_per_second, loops and repeat.
+    """
+    loops = 1
+    while True:
+        elapsed = _time_loops(func, loops)
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        gc.collect()
+        timings.append(_time_loops(func, loops) / loops)
+
+    median = statistics.median(timings)
+    return {
+        "median_ns": round(median * 1e9, 1),
+        "min_ns": round(min(timings) * 1e9, 1),
+        "max_ns": round(max(timings) * 1e9, 1),
+        "ops_per_second": round(1 / median, 1) if median else None,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def environment() -> dict:
+    """Describes the machine results were recorded on, baselines are only comparable on the same one."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": platform.processor(),
+    }
+
+
+def save_results(path: str, results: dict[str, dict]):
+    """
+    Saves results as a JSON baseline.
+
+    Args:
+        path (str): The file to write.
+        results (dict[str, dict]): measure results by benchmark name, each with its threshold.
+    """
+    with open(path, "w") as baseline_file:
+        json.dump({"environment": environment(), "benchmarks": results}, baseline_file, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> dict[str, dict]:
+    """Loads the benchmark results of a JSON baseline by name."""
+    with open(path) as baseline_file:
+        return json.load(baseline_file)["benchmarks"]
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float | None = None) -> list[dict]:
+    """
+    Compares results with a baseline by median time per call.
+
+    Args:
+        results (dict[str, dict]): Current results by benchmark name.
+        baseline (dict[str, dict]): Baseline results by benchmark name.
+        threshold (float, optional): Allowed slowdown for every benchmark. Defaults to each result's
+            own threshold, then the one stored in the baseline.
+
+    Returns:
+        list[dict]: One row per current result with name, baseline_ns, current_ns, change, threshold and status.
+        change is the relative difference of the medians, positive when slower.
+    """
+    rows = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        row = {"name": name, "baseline_ns": None, "current_ns": result["median_ns"], "change": None, "status": NEW}
+        row["threshold"] = next(
+            value for value in (threshold, result.get("threshold"), (previous or {}).get("threshold"), 0.2)
+            if value is not None
+        )
+
+        if previous:
+            row["baseline_ns"] = previous["median_ns"]
+            row["change"] = result["median_ns"] / previous["median_ns"] - 1
+            if row["change"] > row["threshold"]:
+                row["status"] = REGRESSED
+            elif row["change"] < -row["threshold"]:
+                row["status"] = IMPROVED
+            else:
+                row["status"] = OK
+        rows.append(row)
+    return rows
@@ -0,0 +1,212 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+
+def approximate_size(value) -> int:
+    """
+    Approximates the memory held by a cached value.
+    Containers are measured one level deep, which is what cached results look like.
+
+    Args:
+        value: The value to measure.
+
+    Returns:
+        int: The approximate size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(key) + sys.getsizeof(item) for key, item in value.items())
+    elif isinstance(value, (tuple, list)):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+class LRUCache:
+    """
+    Thread safe least recently used cache bounded by entry count and approximate memory.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept.
+            max_bytes (int, optional): Maximum approximate memory held by keys and values.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Returns the cached value for key, or default on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """Stores value under key, evicting the least recently used entries to stay within bounds."""
+        size = approximate_size(key) + approximate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Removes key from the cache if present."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def invalidate_matching(self, predicate) -> int:
+        """
+        Removes every entry for which predicate(key, value) is true. Scans the whole cache.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._lock:
+            keys = [key for key, (value, _) in self._entries.items() if predicate(key, self._unwrap(value))]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def _unwrap(self, stored):
+        # Subclasses that store extra data with each value return the value itself
+        return stored
+
+    def clear(self):
+        """Removes every entry, counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Returns the current size and the hit, miss and eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DayScopedLRUCache(LRUCache):
+    """
+    LRU cache whose entries are only valid for the day they were stored on.
+    Used for results that depend on the current date, such as ages.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None, today=date.today):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept.
+            max_bytes (int, optional): Maximum approximate memory held by keys and values.
+            today (callable): Returns the current date, the cache is cleared whenever it changes.
+        """
+        super().__init__(max_entries, max_bytes)
+        self._today = today
+        self._day = today()
+        self.day_rollovers = 0
+
+    def _roll_over_if_needed(self):
+        today = self._today()
+        if today != self._day:
+            self.clear()
+            self._day = today
+            self.day_rollovers += 1
+
+    def get(self, key, default=None):
+        self._roll_over_if_needed()
+        return super().get(key, default)
+
+    def set(self, key, value):
+        self._roll_over_if_needed()
+        super().set(key, value)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["day_rollovers"] = self.day_rollovers
+        return stats
+
+
+class TTLLRUCache(LRUCache):
+    """
+    LRU cache whose entries expire a fixed time after they are stored.
+    Used for data that can change elsewhere and may be served slightly stale.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None, ttl: float = 60.0, clock=time.monotonic):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept.
+            max_bytes (int, optional): Maximum approximate memory held by keys and values.
+            ttl (float): Default seconds an entry stays valid.
+            clock (callable): Returns the current time in seconds.
+        """
+        super().__init__(max_entries, max_bytes)
+        self.ttl = ttl
+        self._clock = clock
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                (value, expires_at), size = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+
+            self.misses += 1
+            return default
+
+    def _unwrap(self, stored):
+        return stored[0]
+
+    def set(self, key, value, ttl: float | None = None):
+        """Stores value under key for ttl seconds, defaulting to the cache's ttl."""
+        super().set(key, (value, self._clock() + (self.ttl if ttl is None else ttl)))
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["expirations"] = self.expirations
+        return stats
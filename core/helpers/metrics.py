@@ -0,0 +1,275 @@
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+# Upper bounds in seconds, from 50 microseconds (a cached lookup) to 10 seconds (a large batch)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 50)
+
+# The endpoint label of the request being handled, set by MetricsMiddleware
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="unknown")
+
+
+class Metric:
+    """
+    A counter, gauge or histogram with labels, kept in process memory.
+    Label values are passed positionally in the order of label_names.
+    """
+
+    def __init__(self, name: str, help_text: str, kind: str, label_names: tuple[str, ...] = (), buckets: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.label_names = label_names
+        self.buckets = buckets
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self.samples[label_values] = self.samples.get(label_values, 0) + amount
+
+    def set(self, value: float, *label_values):
+        with self._lock:
+            self.samples[label_values] = value
+
+    def observe(self, value: float, *label_values):
+        # Histogram samples are [count per bucket..., count above the last bucket, sum]
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self.samples.get(label_values)
+            if sample is None:
+                sample = self.samples[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            sample[index] += 1
+            sample[-1] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(labels), list(value) if isinstance(value, list) else value] for labels, value in self.samples.items()]
+        return {
+            "help": self.help_text,
+            "kind": self.kind,
+            "labels": list(self.label_names),
+            "buckets": list(self.buckets),
+            "samples": samples,
+        }
+
+
+class MetricsRegistry:
+    """
+    Process local metrics.
+
+    With a directory configured, each process writes a snapshot of its metrics to <directory>/<pid>.json
+    at most every flush_interval seconds and at exit. collect then sums the counters and histograms of every
+    live process, so any worker can serve metrics for all of them. Gauges are reported per process with a pid
+    label, since summing e.g. the cache entries of every worker means nothing. Snapshots of processes that
+    are gone, e.g. recycled workers, are deleted. The directory must be local to the host, pids are checked there.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors = []
+        self.directory = None
+        self.flush_interval = 5.0
+        self._next_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def configure(self, directory: str | None, flush_interval: float = 5.0):
+        """
+        Args:
+            directory (str, optional): Shared directory for per process snapshots, None to only report this process.
+            flush_interval (float): Minimum seconds between snapshot writes.
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Metric:
+        return self.register(Metric(name, help_text, COUNTER, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Metric:
+        return self.register(Metric(name, help_text, GAUGE, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS) -> Metric:
+        return self.register(Metric(name, help_text, HISTOGRAM, label_names, buckets))
+
+    def add_collector(self, collector):
+        """Registers a callable run before every snapshot, used to copy counters kept elsewhere into metrics."""
+        self.collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error(f"[MetricsRegistry] Collector failed: {e}")
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def maybe_flush(self):
+        """Writes this process' snapshot if the last one is older than flush_interval."""
+        if self.directory and time.monotonic() >= self._next_flush:
+            self.flush()
+
+    def flush(self):
+        if not self.directory:
+            return
+        with self._flush_lock:
+            self._next_flush = time.monotonic() + self.flush_interval
+            try:
+                with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False) as snapshot_file:
+                    json.dump(self.snapshot(), snapshot_file)
+                os.replace(snapshot_file.name, os.path.join(self.directory, f"{os.getpid()}.json"))
+            except OSError as e:
+                logger.error(f"[MetricsRegistry] Failed to write the metrics snapshot: {e}")
+
+    def collect(self) -> dict:
+        """
+        Returns the metrics of every live process, summing counter and histogram samples with the same labels
+        and labelling gauge samples with the pid of their process.
+        This process is read from memory, the others from their latest snapshot.
+        """
+        snapshots = [(os.getpid(), self.snapshot())]
+        if self.directory:
+            for file_name in os.listdir(self.directory):
+                pid = file_name.removesuffix(".json")
+                if not file_name.endswith(".json") or not pid.isdigit() or int(pid) == os.getpid():
+                    continue
+                path = os.path.join(self.directory, file_name)
+                if not _process_alive(int(pid)):
+                    # Its counters are final, Prometheus treats their disappearance as a counter reset
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    with open(path) as snapshot_file:
+                        snapshots.append((int(pid), json.load(snapshot_file)))
+                except (OSError, ValueError):
+                    continue
+
+        merged = {}
+        for pid, snapshot in snapshots:
+            for name, metric in snapshot.items():
+                per_process = metric["kind"] == GAUGE
+                label_names = [*metric["labels"], "pid"] if per_process else metric["labels"]
+                target = merged.setdefault(name, {**metric, "labels": label_names, "samples": {}})
+                for labels, value in metric["samples"]:
+                    labels = (*labels, pid) if per_process else tuple(labels)
+                    previous = target["samples"].get(labels)
+                    if previous is None:
+                        target["samples"][labels] = value
+                    elif isinstance(value, list):
+                        target["samples"][labels] = [a + b for a, b in zip(previous, value)]
+                    else:
+                        target["samples"][labels] = previous + value
+        return merged
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, owned by another user
+        return True
+    return True
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render_prometheus(metrics: dict) -> str:
+    """
+    Formats collected metrics in the Prometheus text exposition format.
+
+    Args:
+        metrics (dict): Metrics as returned by MetricsRegistry.collect.
+
+    Returns:
+        str: The exposition text.
+    """
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for labels, value in sorted(metric["samples"].items()):
+            if metric["kind"] != HISTOGRAM:
+                lines.append(f"{name}{_format_labels(metric['labels'], labels)} {value}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip([*metric["buckets"], "+Inf"], value[:-1]):
+                cumulative += count
+                bucket_label = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_format_labels(metric['labels'], labels, bucket_label)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(metric['labels'], labels)} {value[-1]}")
+            lines.append(f"{name}_count{_format_labels(metric['labels'], labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+REQUESTS = registry.counter("http_requests_total", "Requests handled", ("endpoint", "method", "status"))
+REQUEST_DURATION = registry.histogram("http_request_duration_seconds", "Time to produce a response", ("endpoint",))
+RATE_LIMITED = registry.counter("rate_limited_requests_total", "Requests rejected by the rate limiter", ("endpoint",))
+STAGE_DURATION = registry.histogram(
+    "request_stage_duration_seconds",
+    "Time spent in each stage of a request: rate_limit, track_usage, serializer, service",
+    ("endpoint", "stage"),
+)
+DB_QUERIES = registry.histogram(
+    "db_queries_per_request", "Database queries run by a request", ("endpoint",), QUERY_COUNT_BUCKETS
+)
+
+
+def record_stage(stage: str, started_at: float):
+    """Records the time since started_at, a time.perf_counter() value, as a stage of the current request."""
+    STAGE_DURATION.observe(time.perf_counter() - started_at, current_endpoint.get(), stage)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """
+    Records the time spent in a block as a stage of the current request.
+
+    Usage:
+        with time_stage("serializer"):
+            serializer.is_valid(raise_exception=True)
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, started_at)
@@ -0,0 +1,92 @@
+import io
+import json
+import logging
+import os
+import pstats
+import uuid
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".prof"
+METADATA_SUFFIX = ".json"
+
+
+def save_profile(directory: str, profiler, metadata: dict, max_profiles: int) -> str:
+    """
+    Writes a request profile and its metadata, then removes the oldest profiles beyond max_profiles.
+
+    Args:
+        directory (str): The profile directory, created if missing.
+        profiler: A disabled cProfile.Profile.
+        metadata (dict): Details of the request, e.g. endpoint, duration and the SQL queries it ran.
+        max_profiles (int): Number of profiles kept in the directory.
+
+    Returns:
+        str: The profile id, the shared file name of the .prof and .json files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    started_at = datetime.now(timezone.utc)
+    profile_id = f"{started_at:%Y%m%dT%H%M%S.%f}_{metadata.get('endpoint', 'request')}_{uuid.uuid4().hex[:8]}"
+
+    profiler.dump_stats(os.path.join(directory, profile_id + PROFILE_SUFFIX))
+    with open(os.path.join(directory, profile_id + METADATA_SUFFIX), "w") as metadata_file:
+        json.dump({"id": profile_id, "captured_at": started_at.isoformat(), **metadata}, metadata_file, indent=2)
+
+    rotate_profiles(directory, max_profiles)
+    return profile_id
+
+
+def rotate_profiles(directory: str, max_profiles: int):
+    """Removes the oldest profiles so at most max_profiles are kept."""
+    profile_ids = sorted(name[:-len(METADATA_SUFFIX)] for name in os.listdir(directory) if name.endswith(METADATA_SUFFIX))
+    for profile_id in profile_ids[:max(len(profile_ids) - max_profiles, 0)]:
+        for suffix in (PROFILE_SUFFIX, METADATA_SUFFIX):
+            try:
+                os.remove(os.path.join(directory, profile_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory: str) -> list[dict]:
+    """
+    Reads the metadata of every captured profile.
+
+    Args:
+        directory (str): The profile directory.
+
+    Returns:
+        list[dict]: Profile metadata, slowest first.
+    """
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in os.listdir(directory):
+        if not name.endswith(METADATA_SUFFIX):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as metadata_file:
+                profiles.append(json.load(metadata_file))
+        except (OSError, ValueError) as e:
+            logger.warning(f"[list_profiles] Skipping {name}: {e}")
+    return sorted(profiles, key=lambda profile: profile.get("duration_ms", 0), reverse=True)
+
+
+def summarize_profile(directory: str, profile_id: str, limit: int = 15, sort: str = "cumulative") -> str:
+    """
+    Formats the most expensive functions of a captured profile.
+
+    Args:
+        directory (str): The profile directory.
+        profile_id (str): The profile to summarize.
+        limit (int): Number of functions listed.
+        sort (str): A pstats sort key, e.g. cumulative or tottime.
+
+    Returns:
+        str: The pstats report.
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(os.path.join(directory, profile_id + PROFILE_SUFFIX), stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+SLIDING_WINDOW_LOG = "sliding_window_log"
+SLIDING_WINDOW_COUNTER = "sliding_window_counter"
+TOKEN_BUCKET = "token_bucket"
+ALGORITHMS = (SLIDING_WINDOW_LOG, SLIDING_WINDOW_COUNTER, TOKEN_BUCKET)
+
+# Every script takes ARGV = now (ms), window (ms), limit, and returns {allowed, remaining, reset (ms), retry after (ms)}.
+# Redis truncates Lua numbers to integers in replies, so every returned value is rounded explicitly.
+
+# A sorted set of the accepted requests of the last window, scored by time. Exact, memory grows with the limit.
+SLIDING_WINDOW_LOG_SCRIPT = """
+local now, window, limit = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window)
+    count = count + 1
+    allowed = 1
+end
+local oldest = tonumber(redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')[2] or now)
+local reset = oldest + window - now
+local retry_after = 0
+if allowed == 0 then
+    retry_after = reset
+end
+return {allowed, limit - count, reset, retry_after}
+"""
+
+# Counters of the current and previous fixed windows, the previous one weighted by how much of it
+# still overlaps the sliding window. Approximate, two integers per key.
+SLIDING_WINDOW_COUNTER_SCRIPT = """
+local now, window, limit = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local elapsed = now % window
+local weighted = previous * (window - elapsed) / window + current
+if weighted + 1 <= limit then
+    redis.call('INCR', KEYS[1])
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+    return {1, math.floor(limit - weighted - 1), window - elapsed, 0}
+end
+local retry_after
+if current + 1 <= limit then
+    -- Within this window, once enough of the previous window has slid out
+    retry_after = (window - elapsed) - (limit - 1 - current) * window / previous
+else
+    -- In the next window, once enough of this window has slid out
+    retry_after = (window - elapsed) + window * (1 - (limit - 1) / current)
+end
+return {0, 0, window - elapsed, math.ceil(retry_after)}
+"""
+
+# Tokens refilled continuously at limit per window, up to limit. Allows bursts of up to limit requests.
+TOKEN_BUCKET_SCRIPT = """
+local now, window, limit = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or limit
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - updated_at) * limit / window)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+local reset = math.ceil((limit - tokens) * window / limit)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.max(reset, 1))
+local retry_after = 0
+if allowed == 0 then
+    retry_after = math.ceil((1 - tokens) * window / limit)
+end
+return {allowed, math.floor(tokens), reset, retry_after}
+"""
+
+
+class RateLimitResult:
+    """The decision of a rate limit check, with the values of the RateLimit-* and Retry-After headers."""
+
+    __slots__ = ("allowed", "limit", "remaining", "reset", "retry_after", "window")
+
+    def __init__(self, allowed: bool, limit: int, remaining: int, reset: float, retry_after: float, window: int):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        # Seconds until the quota is fully available again, and until the next request is accepted
+        self.reset = reset
+        self.retry_after = retry_after
+        self.window = window
+
+    def headers(self) -> dict:
+        """Returns the RateLimit-* headers, and Retry-After when the request was rejected."""
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(max(self.remaining, 0)),
+            "RateLimit-Reset": str(math.ceil(self.reset)),
+            "RateLimit-Policy": f"{self.limit};w={self.window}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+
+class RedisRateLimiter:
+    """
+    Rate limits shared by every worker, each check decided by a Lua script in one Redis round-trip.
+
+    Since the script runs atomically, concurrent requests cannot both take the last slot. Requests are
+    timed with the clock of the worker, so workers are expected to keep their clocks in sync (NTP).
+    Redis errors let the request through (fail open) and Redis is then skipped for retry_interval seconds.
+    """
+
+    def __init__(self, client: redis.Redis, prefix: str = "rate_limit:", retry_interval: float = 5.0):
+        """
+        Args:
+            client (redis.Redis): The Redis client, with decode_responses enabled.
+            prefix (str): Prefix of the Redis keys holding the limiter state.
+            retry_interval (float): Seconds Redis is skipped after an error.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.retry_interval = retry_interval
+        self._retry_at = 0.0
+        self._scripts = {
+            SLIDING_WINDOW_LOG: client.register_script(SLIDING_WINDOW_LOG_SCRIPT),
+            SLIDING_WINDOW_COUNTER: client.register_script(SLIDING_WINDOW_COUNTER_SCRIPT),
+            TOKEN_BUCKET: client.register_script(TOKEN_BUCKET_SCRIPT),
+        }
+
+    def _key(self, algorithm: str, identity: str) -> str:
+        # Identities are API keys, only a digest of them is stored in Redis
+        return f"{self.prefix}{algorithm}:{hashlib.sha256(identity.encode()).hexdigest()}"
+
+    def check(self, identity: str, limit: int, window: int, algorithm: str = SLIDING_WINDOW_LOG, now: float | None = None):
+        """
+        Counts a request against the limit of an identity, unless the limit is reached.
+
+        Args:
+            identity (str): Who is limited, e.g. an API key.
+            limit (int): Requests allowed per window.
+            window (int): The window in seconds.
+            algorithm (str): One of ALGORITHMS.
+            now (float, optional): The current time in seconds, time.time() by default.
+
+        Returns:
+            RateLimitResult | None: The decision, or None if Redis is unavailable and the request is let through.
+        """
+        if algorithm not in self._scripts:
+            raise ValueError(f"Unknown rate limit algorithm '{algorithm}', expected one of {', '.join(ALGORITHMS)}")
+        if time.monotonic() < self._retry_at:
+            return None
+
+        now_ms = int((time.time() if now is None else now) * 1000)
+        window_ms = window * 1000
+        key = self._key(algorithm, identity)
+        if algorithm == SLIDING_WINDOW_COUNTER:
+            keys = [f"{key}:{now_ms // window_ms}", f"{key}:{now_ms // window_ms - 1}"]
+            args = [now_ms, window_ms, limit]
+        elif algorithm == SLIDING_WINDOW_LOG:
+            # Members must be unique, two requests can share a millisecond
+            keys, args = [key], [now_ms, window_ms, limit, f"{now_ms}:{uuid.uuid4().hex[:12]}"]
+        else:
+            keys, args = [key], [now_ms, window_ms, limit]
+
+        try:
+            allowed, remaining, reset, retry_after = self._scripts[algorithm](keys=keys, args=args)
+        except redis.RedisError as e:
+            self._retry_at = time.monotonic() + self.retry_interval
+            logger.warning(f"[RedisRateLimiter] Check failed, allowing requests for {self.retry_interval}s: {e}")
+            return None
+
+        return RateLimitResult(bool(allowed), limit, int(remaining), reset / 1000, retry_after / 1000, window)
+
+    def reset(self, identity: str, window: int = 60):
+        """Clears the state of an identity under every algorithm, e.g. between benchmark runs."""
+        window_ms = window * 1000
+        current_window = int(time.time() * 1000) // window_ms
+        keys = [self._key(SLIDING_WINDOW_LOG, identity), self._key(TOKEN_BUCKET, identity)]
+        counter_key = self._key(SLIDING_WINDOW_COUNTER, identity)
+        keys += [f"{counter_key}:{current_window}", f"{counter_key}:{current_window - 1}"]
+        try:
+            self.client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"[RedisRateLimiter] Reset failed: {e}")
+
+
+_limiter: RedisRateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RedisRateLimiter:
+    """Returns the process wide limiter, using core.helpers.redis_client."""
+    global _limiter
+
+    if _limiter is None:
+        from core.helpers.redis_client import redis_client
+
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RedisRateLimiter(redis_client)
+    return _limiter
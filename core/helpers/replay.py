@@ -0,0 +1,272 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+
+
+class RecordedRequest:
+    """
+    One request of a traffic log.
+
+    Log lines are JSON objects with a path and optionally a method (default POST), headers,
+    a JSON body and a timestamp in seconds used to keep the recorded pacing:
+        {"method": "POST", "path": "/api/national-id/validate", "headers": {"X-API-Key": "..."},
+         "body": {"national_id": "29501012101234"}, "timestamp": 12.5}
+    """
+    __slots__ = ("method", "path", "headers", "body", "timestamp")
+
+    def __init__(self, path: str, method: str = "POST", headers: dict | None = None, body=None, timestamp: float | None = None):
+        self.method = method.upper()
+        self.path = path
+        self.headers = headers or {}
+        self.body = body
+        self.timestamp = timestamp
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def read_traffic_log(path: str) -> tuple[list[RecordedRequest], int]:
+    """
+    Reads a JSONL traffic log.
+
+    Args:
+        path (str): The log file.
+
+    Returns:
+        tuple[list[RecordedRequest], int]: The requests, and the number of lines skipped because they are
+        not JSON objects with a path starting with "/", or have a method that is not a string, headers that
+        are not an object or a timestamp that is not a number.
+    """
+    recorded = []
+    skipped = 0
+    with open(path) as log_file:
+        for line in log_file:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+
+            path_value = entry.get("path") if isinstance(entry, dict) else None
+            if not isinstance(path_value, str) or not path_value.startswith("/"):
+                skipped += 1
+                continue
+
+            method = entry.get("method", "POST")
+            headers = entry.get("headers")
+            timestamp = entry.get("timestamp")
+            if (
+                not isinstance(method, str)
+                or not (headers is None or isinstance(headers, dict))
+                or not (timestamp is None or (isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool)))
+            ):
+                skipped += 1
+                continue
+
+            recorded.append(RecordedRequest(
+                path=path_value,
+                method=method,
+                headers=headers,
+                body=entry.get("body"),
+                timestamp=timestamp,
+            ))
+    return recorded, skipped
+
+
+class EndpointStats:
+    """Latencies and outcomes of the replayed requests of one endpoint."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = defaultdict(int)
+        self.errors = 0
+        self.rate_limited = 0
+
+    def record(self, latency: float, status: int | None):
+        self.latencies.append(latency)
+        if status is None:
+            self.errors += 1
+            self.statuses["error"] += 1
+            return
+
+        self.statuses[status] += 1
+        if status == 429:
+            self.rate_limited += 1
+        elif status >= 400:
+            self.errors += 1
+
+    def merge(self, other: "EndpointStats"):
+        self.latencies.extend(other.latencies)
+        for status, count in other.statuses.items():
+            self.statuses[status] += count
+        self.errors += other.errors
+        self.rate_limited += other.rate_limited
+
+    def summary(self, elapsed: float) -> dict:
+        """
+        Summarizes the endpoint.
+
+        Args:
+            elapsed (float): Wall clock seconds of the replay, used for throughput.
+
+        Returns:
+            dict: count, throughput, error_rate, rate_limited_rate, p50/p95/p99/max latency in milliseconds
+            and the count of each status code.
+        """
+        count = len(self.latencies)
+        latencies = np.array(self.latencies) * 1000
+        summary = {
+            "count": count,
+            "throughput": count / elapsed if elapsed else 0.0,
+            "error_rate": self.errors / count if count else 0.0,
+            "rate_limited_rate": self.rate_limited / count if count else 0.0,
+        }
+        for percentile, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES) if count else [0.0] * 3):
+            summary[f"p{percentile}_ms"] = float(value)
+        summary["max_ms"] = float(latencies.max()) if count else 0.0
+        summary["statuses"] = {str(status): count for status, count in sorted(self.statuses.items(), key=str)}
+        return summary
+
+
+class TrafficReplayer:
+    """
+    Replays recorded requests against a server from a pool of threads.
+
+    Every thread keeps its own requests.Session, so connections are reused across its requests.
+    Requests are started at a fixed rate, at the recorded pacing, or as fast as the threads allow.
+
+    Usage:
+        replayer = TrafficReplayer("http://localhost:8000", concurrency=16, rate=200)
+        report = replayer.run(read_traffic_log("traffic.jsonl")[0])
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        concurrency: int = 8,
+        rate: float | None = None,
+        speedup: float | None = None,
+        timeout: float = 30.0,
+        headers: dict | None = None,
+    ):
+        """
+        Args:
+            base_url (str): Scheme and host of the server, e.g. http://localhost:8000.
+            concurrency (int): Number of threads sending requests.
+            rate (float, optional): Requests started per second across all threads.
+            speedup (float, optional): Keep the recorded timestamps, compressed by this factor. Ignored when rate is set.
+            timeout (float): Seconds before a request counts as an error.
+            headers (dict, optional): Headers added to every request, overriding recorded ones (e.g. X-API-Key).
+        """
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.rate = rate
+        self.speedup = speedup
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def _session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _send(self, session: requests.Session, recorded: RecordedRequest) -> int | None:
+        try:
+            response = session.request(
+                recorded.method,
+                self.base_url + recorded.path,
+                json=recorded.body,
+                headers={**recorded.headers, **self.headers},
+                timeout=self.timeout,
+            )
+            return response.status_code
+        except requests.RequestException as e:
+            logger.debug(f"[TrafficReplayer] {recorded.endpoint} failed: {e}")
+            return None
+
+    def _worker(self, pending: queue.Queue, stats: dict[str, EndpointStats]):
+        session = self._session()
+        try:
+            while True:
+                recorded = pending.get()
+                if recorded is None:
+                    return
+                started_at = time.perf_counter()
+                status = self._send(session, recorded)
+                stats[recorded.endpoint].record(time.perf_counter() - started_at, status)
+        finally:
+            session.close()
+
+    def _start_offsets(self, recorded_requests: list[RecordedRequest]):
+        # Seconds after the start at which each request should be sent, None to send immediately
+        if self.rate:
+            return [index / self.rate for index in range(len(recorded_requests))]
+
+        timestamps = [recorded.timestamp for recorded in recorded_requests]
+        if self.speedup and all(timestamp is not None for timestamp in timestamps) and timestamps:
+            first = timestamps[0]
+            return [(timestamp - first) / self.speedup for timestamp in timestamps]
+        return [None] * len(recorded_requests)
+
+    def run(self, recorded_requests: list[RecordedRequest]) -> dict:
+        """
+        Replays the requests and waits for every one to finish.
+
+        Args:
+            recorded_requests (list[RecordedRequest]): The requests, in the order they are started.
+
+        Returns:
+            dict: elapsed seconds, an "overall" summary and a summary per endpoint (see EndpointStats.summary).
+        """
+        pending = queue.Queue(maxsize=self.concurrency * 2)
+        thread_stats = [defaultdict(EndpointStats) for _ in range(self.concurrency)]
+        threads = [
+            threading.Thread(target=self._worker, args=(pending, stats), daemon=True)
+            for stats in thread_stats
+        ]
+
+        started_at = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        for recorded, offset in zip(recorded_requests, self._start_offsets(recorded_requests)):
+            if offset is not None:
+                delay = started_at + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pending.put(recorded)
+
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started_at
+
+        by_endpoint = defaultdict(EndpointStats)
+        overall = EndpointStats()
+        for stats in thread_stats:
+            for endpoint, endpoint_stats in stats.items():
+                by_endpoint[endpoint].merge(endpoint_stats)
+                overall.merge(endpoint_stats)
+
+        return {
+            "elapsed": elapsed,
+            "overall": overall.summary(elapsed),
+            "endpoints": {endpoint: by_endpoint[endpoint].summary(elapsed) for endpoint in sorted(by_endpoint)},
+        }
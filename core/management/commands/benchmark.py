@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils.module_loading import autodiscover_modules
+
+from core.helpers.benchmark import (
+    IMPROVED,
+    KINDS,
+    REGRESSED,
+    compare,
+    get_benchmarks,
+    load_baseline,
+    measure,
+    save_results,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the benchmarks declared in each app's benchmarks.py. Results can be saved as a JSON baseline "
+        "and compared with one, failing when a benchmark is slower than its threshold allows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help="Only run benchmarks whose name contains one of these")
+        parser.add_argument("--kind", choices=KINDS, help="Only run micro or macro benchmarks")
+        parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timed run")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+        parser.add_argument("--save", help="Write the results to this JSON baseline")
+        parser.add_argument("--baseline", help="Compare with this JSON baseline")
+        parser.add_argument("--threshold", type=float, help="Allowed slowdown for every benchmark, e.g. 0.1 for 10%%")
+        parser.add_argument("--list", action="store_true", help="List the benchmarks without running them")
+
+    def handle(self, *args, **options):
+        autodiscover_modules("benchmarks")
+
+        benchmarks = [
+            benchmark for benchmark in get_benchmarks()
+            if (not options["names"] or any(name in benchmark.name for name in options["names"]))
+            and (not options["kind"] or benchmark.kind == options["kind"])
+        ]
+        if not benchmarks:
+            raise CommandError("No benchmarks match")
+
+        if options["list"]:
+            for benchmark in benchmarks:
+                self.stdout.write(f"{benchmark.name} ({benchmark.kind}, threshold {benchmark.threshold:.0%})")
+            return
+
+        baseline = load_baseline(options["baseline"]) if options["baseline"] else None
+
+        # Benchmarks that write to the database run against a throwaway test database
+        test_database_name = None
+        if any(benchmark.requires_db for benchmark in benchmarks):
+            setup_test_environment()
+            test_database_name = connection.settings_dict["NAME"]
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        results = {}
+        try:
+            for benchmark in benchmarks:
+                func = benchmark.factory()
+                results[benchmark.name] = dict(
+                    measure(func, options["min_time"], options["repeat"]), kind=benchmark.kind,
+                    threshold=benchmark.threshold,
+                )
+                result = results[benchmark.name]
+                self.stdout.write(
+                    f"{benchmark.name:<60} {result['median_ns'] / 1000:>12,.2f} us/op"
+                    f" {result['ops_per_second']:>14,.0f} ops/s"
+                )
+        finally:
+            if test_database_name is not None:
+                connection.creation.destroy_test_db(test_database_name, verbosity=0)
+                teardown_test_environment()
+
+        if options["save"]:
+            save_results(options["save"], results)
+            self.stdout.write(f"Saved {len(results)} results to {options['save']}")
+
+        if baseline is None:
+            return
+
+        regressions = []
+        self.stdout.write("")
+        for row in compare(results, baseline, options["threshold"]):
+            change = "" if row["change"] is None else f"{row['change']:+.1%}"
+            self.stdout.write(f"{row['name']:<60} {change:>8} (threshold {row['threshold']:.0%}) {row['status']}")
+            if row["status"] == REGRESSED:
+                regressions.append(row["name"])
+            elif row["status"] == IMPROVED:
+                self.stdout.write(self.style.SUCCESS(f"  consider saving a new baseline for {row['name']}"))
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmarks regressed: {', '.join(regressions)}")
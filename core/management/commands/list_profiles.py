@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.helpers.profiling import list_profiles, summarize_profile
+
+
+class Command(BaseCommand):
+    help = "Lists the slowest captured request profiles, or summarizes one profile with its SQL queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("profile_id", nargs="?", help="Summarize this profile instead of listing")
+        parser.add_argument("--limit", type=int, default=10, help="Number of profiles, or functions of a profile, shown")
+        parser.add_argument("--endpoint", help="Only list profiles of this endpoint")
+        parser.add_argument("--sort", default="cumulative", help="pstats sort key used in summaries, e.g. tottime")
+        parser.add_argument("--directory", default=None, help="Profile directory, defaults to PROFILING_DIR")
+
+    def handle(self, *args, **options):
+        directory = options["directory"] or settings.PROFILING_DIR
+        profiles = list_profiles(directory)
+        if options["endpoint"]:
+            profiles = [profile for profile in profiles if profile.get("endpoint") == options["endpoint"]]
+
+        if options["profile_id"]:
+            profile = next((profile for profile in profiles if profile["id"] == options["profile_id"]), None)
+            if profile is None:
+                raise CommandError(f"Profile '{options['profile_id']}' not found in {directory}")
+            self._summarize(directory, profile, options)
+            return
+
+        if not profiles:
+            self.stdout.write(f"No profiles in {directory}")
+            return
+
+        self.stdout.write(f"{'id':<60} {'status':>6} {'ms':>10} {'queries':>8} {'sql ms':>9}  trigger")
+        for profile in profiles[:options["limit"]]:
+            self.stdout.write(
+                f"{profile['id']:<60} {profile['status']:>6} {profile['duration_ms']:>10.2f} "
+                f"{profile['query_count']:>8} {profile['query_duration_ms']:>9.2f}  {profile['trigger']}"
+            )
+
+    def _summarize(self, directory, profile, options):
+        self.stdout.write(
+            f"{profile['method']} {profile['path']} -> {profile['status']} in {profile['duration_ms']:.2f} ms "
+            f"({profile['query_count']} queries, {profile['query_duration_ms']:.2f} ms in SQL)"
+        )
+        for query in sorted(profile["queries"], key=lambda query: query["duration_ms"], reverse=True):
+            self.stdout.write(f"  {query['duration_ms']:8.2f} ms  {query['sql']}")
+        self.stdout.write("")
+        self.stdout.write(summarize_profile(directory, profile["id"], options["limit"], options["sort"]))
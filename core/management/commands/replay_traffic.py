@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.helpers.replay import TrafficReplayer, read_traffic_log
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays a JSONL traffic log against a running server and reports latency percentiles, "
+        "throughput, error and 429 rates per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("log", help="JSONL file of recorded requests, see core.helpers.replay.RecordedRequest")
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument("--concurrency", type=int, default=8, help="Threads sending requests")
+        parser.add_argument("--rate", type=float, help="Requests started per second, unlimited by default")
+        parser.add_argument("--speedup", type=float, help="Keep the recorded pacing, compressed by this factor")
+        parser.add_argument("--repeat", type=int, default=1, help="Replay the log this many times")
+        parser.add_argument("--limit", type=int, help="Replay at most this many requests")
+        parser.add_argument("--api-key", help="Send this X-API-Key with every request instead of the recorded one")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--output", help="Also write the report as JSON to this file")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["repeat"] < 1:
+            raise CommandError("--concurrency and --repeat must be at least 1")
+
+        recorded_requests, skipped = read_traffic_log(options["log"])
+        if skipped:
+            self.stderr.write(f"Skipped {skipped} lines that are not recorded requests")
+        recorded_requests = recorded_requests * options["repeat"]
+        if options["limit"] is not None:
+            recorded_requests = recorded_requests[:options["limit"]]
+        if not recorded_requests:
+            raise CommandError("The log has no requests to replay")
+
+        replayer = TrafficReplayer(
+            options["base_url"],
+            concurrency=options["concurrency"],
+            rate=options["rate"],
+            speedup=options["speedup"],
+            timeout=options["timeout"],
+            headers={"X-API-Key": options["api_key"]} if options["api_key"] else None,
+        )
+        report = replayer.run(recorded_requests)
+
+        self.stdout.write(
+            f"{'endpoint':<45} {'count':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'max ms':>9} {'errors':>8} {'429s':>8}"
+        )
+        for endpoint, summary in [*report["endpoints"].items(), ("overall", report["overall"])]:
+            self.stdout.write(
+                f"{endpoint:<45} {summary['count']:>8} {summary['throughput']:>9.1f} {summary['p50_ms']:>9.2f} "
+                f"{summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f} "
+                f"{summary['error_rate']:>8.1%} {summary['rate_limited_rate']:>8.1%}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                json.dump(report, output_file, indent=2)
@@ -0,0 +1,42 @@
+import time
+
+from django.db import connection
+
+from core.helpers.metrics import DB_QUERIES, REQUEST_DURATION, REQUESTS, current_endpoint, registry
+
+
+class MetricsMiddleware:
+    """
+    Records the count, latency and database queries of every request, labelled by URL name.
+    Should be listed first in MIDDLEWARE so the latency covers the other middleware too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count_query(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        token = current_endpoint.set("unresolved")
+        started_at = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_query):
+                response = self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            endpoint = current_endpoint.get()
+            current_endpoint.reset(token)
+
+        REQUEST_DURATION.observe(elapsed, endpoint)
+        REQUESTS.inc(endpoint, request.method, str(response.status_code))
+        DB_QUERIES.observe(queries[0], endpoint)
+        registry.maybe_flush()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        current_endpoint.set(match.url_name or match.view_name if match else "unresolved")
@@ -0,0 +1,12 @@
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Runs the tests, dropping the usage buffered by the tests before the test database is destroyed."""
+
+    def teardown_databases(self, old_config, **kwargs):
+        from api_keys.services.api_key_service import ApiKeyService
+
+        # Written after this, the usage would go to the configured database instead
+        ApiKeyService.discard_usage_writers()
+        super().teardown_databases(old_config, **kwargs)
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from core.helpers.benchmark import IMPROVED, NEW, OK, REGRESSED, compare, measure
+
+class BenchmarkTests(SimpleTestCase):
+    def test_measure_reports_per_call_timings(self):
+        """
+        Ensure the loop count grows until a run lasts min_time and every run is summarized.
+        """
+        result = measure(lambda: sum(range(100)), min_time=0.01, repeat=3)
+
+        self.assertGreater(result["loops"], 1)
+        self.assertEqual(result["repeat"], 3)
+        self.assertLessEqual(result["min_ns"], result["median_ns"])
+        self.assertLessEqual(result["median_ns"], result["max_ns"])
+
+    def test_compare_applies_thresholds(self):
+        """
+        Ensure slowdowns past the threshold are regressions and unknown benchmarks are new.
+        """
+        baseline = {"a": {"median_ns": 100}, "b": {"median_ns": 100}, "c": {"median_ns": 100}}
+        results = {
+            "a": {"median_ns": 130, "threshold": 0.2},
+            "b": {"median_ns": 110, "threshold": 0.2},
+            "c": {"median_ns": 50, "threshold": 0.2},
+            "d": {"median_ns": 10, "threshold": 0.2},
+        }
+
+        statuses = {row["name"]: row["status"] for row in compare(results, baseline)}
+
+        self.assertEqual(statuses, {"a": REGRESSED, "b": OK, "c": IMPROVED, "d": NEW})
+        self.assertEqual(compare(results, baseline, threshold=0.5)[0]["status"], OK)
+
+    def test_command_fails_on_regression(self):
+        """
+        Ensure the command saves a baseline and fails when compared with a much faster one.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        baseline_path = os.path.join(directory.name, "baseline.json")
+        options = {"min_time": 0.01, "repeat": 2, "stdout": StringIO()}
+
+        call_command("benchmark", "national_id.check_sum", save=baseline_path, **options)
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+        self.assertEqual(list(baseline["benchmarks"]), ["national_id.check_sum"])
+
+        baseline["benchmarks"]["national_id.check_sum"]["median_ns"] /= 100
+        with open(baseline_path, "w") as baseline_file:
+            json.dump(baseline, baseline_file)
+
+        with self.assertRaises(CommandError):
+            call_command("benchmark", "national_id.check_sum", baseline=baseline_path, **options)
@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import tempfile
+
+import fakeredis
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.models import ApiKey
+from core.helpers import rate_limit
+from core.helpers.metrics import MetricsRegistry, render_prometheus
+from core.helpers.rate_limit import RedisRateLimiter
+
+class MetricsRegistryTests(APITestCase):
+    def test_snapshots_of_other_workers_are_summed(self):
+        """
+        Ensure samples written by other processes are added to this process' samples.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        registry = MetricsRegistry()
+        registry.configure(directory.name)
+        requests = registry.counter("requests_total", "Requests", ("endpoint",))
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+        requests.inc("validate", amount=2)
+        latency.observe(0.05)
+
+        other_worker = registry.snapshot()
+        # Any live process other than this one
+        with open(os.path.join(directory.name, f"{os.getppid()}.json"), "w") as snapshot_file:
+            json.dump(other_worker, snapshot_file)
+        latency.observe(5)
+
+        text = render_prometheus(registry.collect())
+
+        self.assertIn('requests_total{endpoint="validate"} 4', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("latency_seconds_count 3", text)
+
+    def test_gauges_are_per_process_and_dead_processes_are_dropped(self):
+        """
+        Ensure gauges are not summed across processes, and snapshots of processes that exited are removed.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        registry = MetricsRegistry()
+        registry.configure(directory.name)
+        requests = registry.counter("requests_total", "Requests")
+        queue_depth = registry.gauge("queue_depth", "Queued records")
+        requests.inc()
+        queue_depth.set(3)
+
+        snapshot = registry.snapshot()
+        dead_process = subprocess.Popen(["true"])
+        dead_process.wait()
+        for pid in (os.getppid(), dead_process.pid):
+            with open(os.path.join(directory.name, f"{pid}.json"), "w") as snapshot_file:
+                json.dump(snapshot, snapshot_file)
+
+        text = render_prometheus(registry.collect())
+
+        self.assertIn("requests_total 2", text)
+        self.assertIn(f'queue_depth{{pid="{os.getpid()}"}} 3', text)
+        self.assertIn(f'queue_depth{{pid="{os.getppid()}"}} 3', text)
+        self.assertNotIn(f'pid="{dead_process.pid}"', text)
+        self.assertFalse(os.path.exists(os.path.join(directory.name, f"{dead_process.pid}.json")))
+
+    def test_metrics_endpoint_reports_request_stages(self):
+        """
+        Ensure a request is counted with its stage timings, 429s and queries, and exposed on /metrics.
+        """
+        rate_limit._limiter = RedisRateLimiter(fakeredis.FakeRedis(decode_responses=True))
+        self.addCleanup(setattr, rate_limit, "_limiter", None)
+        api_key = generate_api_key()
+        ApiKey.objects.create(key_hash=hash_api_key(api_key))
+        for _ in range(3):
+            self.client.post(
+                "/api/national-id/validate", {"national_id": "29501012101234"}, format="json", HTTP_X_API_KEY=api_key
+            )
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        text = response.content.decode()
+        self.assertIn('http_requests_total{endpoint="validate_national_id",method="POST",status="429"}', text)
+        self.assertIn('rate_limited_requests_total{endpoint="validate_national_id"}', text)
+        for stage in ("rate_limit", "track_usage", "serializer", "service"):
+            self.assertIn(f'request_stage_duration_seconds_count{{endpoint="validate_national_id",stage="{stage}"}}', text)
+        self.assertIn('db_queries_per_request_count{endpoint="validate_national_id"}', text)
+        self.assertIn("national_id_result_cache_hits_total", text)
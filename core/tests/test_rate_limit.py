@@ -0,0 +1,119 @@
+import threading
+
+import fakeredis
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.models import ApiKey
+from core.helpers import rate_limit
+from core.helpers.rate_limit import SLIDING_WINDOW_COUNTER, SLIDING_WINDOW_LOG, TOKEN_BUCKET, RedisRateLimiter
+
+class RedisRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.limiter = RedisRateLimiter(fakeredis.FakeRedis(server=self.server, decode_responses=True))
+
+    def decisions(self, algorithm, times, limit=2, window=60):
+        return [self.limiter.check("key", limit, window, algorithm, now=now) for now in times]
+
+    def test_sliding_window_log(self):
+        """
+        Ensure the log allows limit requests in any window and frees a slot when its oldest request slides out.
+        """
+        first, second, rejected, freed = self.decisions(SLIDING_WINDOW_LOG, [1000, 1030, 1059, 1060.001])
+
+        self.assertEqual([first.allowed, second.allowed, rejected.allowed, freed.allowed], [True, True, False, True])
+        self.assertEqual((first.remaining, second.remaining, rejected.remaining), (1, 0, 0))
+        self.assertAlmostEqual(rejected.retry_after, 1)
+        self.assertEqual(rejected.headers()["Retry-After"], "1")
+
+    def test_sliding_window_counter(self):
+        """
+        Ensure the counter weighs the previous window by its overlap with the sliding window.
+        """
+        # Two requests late in one window, then the next window a quarter and three quarters through
+        decisions = self.decisions(SLIDING_WINDOW_COUNTER, [1150, 1170, 1215, 1245], limit=2)
+
+        # At 1215 the previous window still counts 2 * 0.75 = 1.5 requests, at 1245 only 0.5
+        self.assertEqual([decision.allowed for decision in decisions], [True, True, False, True])
+        self.assertAlmostEqual(decisions[2].retry_after, 15)
+
+    def test_token_bucket(self):
+        """
+        Ensure the bucket allows a burst of limit requests, then refills at limit per window.
+        """
+        burst = self.decisions(TOKEN_BUCKET, [1000] * 4, limit=3)
+        refilled = self.decisions(TOKEN_BUCKET, [1020, 1020], limit=3)
+
+        self.assertEqual([decision.allowed for decision in burst], [True, True, True, False])
+        self.assertAlmostEqual(burst[3].retry_after, 20)
+        self.assertEqual([decision.allowed for decision in refilled], [True, False])
+
+    def test_concurrent_requests_cannot_exceed_the_limit(self):
+        """
+        Ensure concurrent checks never accept more than limit requests.
+        """
+        allowed = []
+        lock = threading.Lock()
+
+        def request():
+            result = self.limiter.check("key", 5, 60, SLIDING_WINDOW_LOG, now=1000)
+            with lock:
+                allowed.append(result.allowed)
+
+        threads = [threading.Thread(target=request) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(allowed.count(True), 5)
+
+    def test_fails_open_when_redis_is_down(self):
+        """
+        Ensure a Redis error lets the request through instead of failing it.
+        """
+        self.server.connected = False
+
+        self.assertIsNone(self.limiter.check("key", 2, 60, TOKEN_BUCKET))
+
+class RateLimitHeaderTests(APITestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        rate_limit._limiter = RedisRateLimiter(fakeredis.FakeRedis(server=self.server, decode_responses=True))
+        self.addCleanup(setattr, rate_limit, "_limiter", None)
+
+        self.api_key = generate_api_key()
+        ApiKey.objects.create(key_hash=hash_api_key(self.api_key))
+
+    def validate(self):
+        return self.client.post(
+            "/api/national-id/validate", {"national_id": "29501012101234"}, format="json", HTTP_X_API_KEY=self.api_key
+        )
+
+    def test_responses_carry_rate_limit_headers(self):
+        """
+        Ensure accepted and rejected requests report the quota, and rejected ones when to retry.
+        """
+        first, second, rejected = self.validate(), self.validate(), self.validate()
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual((first["RateLimit-Limit"], first["RateLimit-Remaining"]), ("2", "1"))
+        self.assertEqual(second["RateLimit-Remaining"], "0")
+        self.assertEqual(rejected.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(rejected["RateLimit-Policy"], "2;w=60")
+        self.assertIn(rejected["Retry-After"], ("59", "60"))
+        self.assertEqual(rejected.json()["retry_after"], int(rejected["Retry-After"]))
+
+    def test_requests_pass_when_redis_is_down(self):
+        """
+        Ensure requests are served without rate limit headers while Redis is unavailable.
+        """
+        self.server.connected = False
+
+        responses = [self.validate() for _ in range(3)]
+
+        self.assertEqual([response.status_code for response in responses], [status.HTTP_200_OK] * 3)
+        self.assertNotIn("RateLimit-Limit", responses[0])
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from core.helpers.replay import RecordedRequest, TrafficReplayer, read_traffic_log
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(429 if self.path.endswith("limited") else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class TrafficReplayTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_log_lines_without_a_path_are_skipped(self):
+        """
+        Ensure only JSON objects with a path are read as requests.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        log_path = os.path.join(directory.name, "traffic.jsonl")
+        with open(log_path, "w") as log_file:
+            log_file.write(json.dumps({"path": "/api/national-id/validate", "body": {"national_id": "1"}}) + "\n")
+            log_file.write(json.dumps({"request_id": "user-001", "title": "not a request"}) + "\n")
+            log_file.write("not json\n")
+
+        recorded, skipped = read_traffic_log(log_path)
+
+        self.assertEqual([request.endpoint for request in recorded], ["POST /api/national-id/validate"])
+        self.assertEqual(skipped, 2)
+
+    def test_log_lines_with_malformed_fields_are_skipped(self):
+        """
+        Ensure a line with a method, headers or timestamp of the wrong type is skipped rather than aborting the replay.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        log_path = os.path.join(directory.name, "traffic.jsonl")
+        with open(log_path, "w") as log_file:
+            for entry in (
+                {"path": "/api/national-id/validate", "method": None},
+                {"path": "/api/national-id/validate", "method": 1},
+                {"path": "/api/national-id/validate", "headers": ["X-API-Key"]},
+                {"path": "/api/national-id/validate", "timestamp": "12.5"},
+                {"path": "/api/national-id/validate", "method": "get", "timestamp": 12.5},
+            ):
+                log_file.write(json.dumps(entry) + "\n")
+
+        recorded, skipped = read_traffic_log(log_path)
+
+        self.assertEqual([request.endpoint for request in recorded], ["GET /api/national-id/validate"])
+        self.assertEqual(skipped, 4)
+
+    def test_report_per_endpoint(self):
+        """
+        Ensure every request is counted under its endpoint with its 429 and error rates.
+        """
+        recorded = [RecordedRequest("/ok")] * 20 + [RecordedRequest("/limited")] * 10
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        report = TrafficReplayer(base_url, concurrency=4, rate=1000).run(recorded)
+
+        self.assertEqual(report["overall"]["count"], 30)
+        self.assertEqual(report["endpoints"]["POST /ok"]["count"], 20)
+        self.assertEqual(report["endpoints"]["POST /ok"]["error_rate"], 0)
+        self.assertEqual(report["endpoints"]["POST /limited"]["rate_limited_rate"], 1)
+        self.assertLessEqual(report["overall"]["p50_ms"], report["overall"]["max_ms"])
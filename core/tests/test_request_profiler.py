@@ -0,0 +1,52 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.helpers.profiling import list_profiles
+
+class RequestProfilerTests(APITestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_admin_header_captures_profile_and_queries(self):
+        """
+        Ensure a request with the admin token is profiled with its SQL, and others are not.
+        """
+        with override_settings(PROFILING_DIR=self.directory.name, PROFILING_ADMIN_TOKEN="secret"):
+            self.client.post("/api/api-keys/verify", {"api_key": "b" * 64}, format="json", HTTP_X_PROFILE_TOKEN="wrong")
+            self.assertEqual(list_profiles(self.directory.name), [])
+
+            response = self.client.post(
+                "/api/api-keys/verify", {"api_key": "a" * 64}, format="json", HTTP_X_PROFILE_TOKEN="secret"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        profiles = list_profiles(self.directory.name)
+        self.assertEqual([profile["id"] for profile in profiles], [response["X-Profile-Id"]])
+        self.assertEqual(profiles[0]["endpoint"], "verify_api_key")
+        self.assertGreaterEqual(profiles[0]["query_count"], 1)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, f"{response['X-Profile-Id']}.prof")))
+
+        output = StringIO()
+        call_command("list_profiles", response["X-Profile-Id"], directory=self.directory.name, stdout=output)
+        self.assertIn("SELECT", output.getvalue())
+
+    def test_sampled_profiles_are_rotated(self):
+        """
+        Ensure sampling profiles every request and only the newest profiles are kept.
+        """
+        with override_settings(PROFILING_DIR=self.directory.name, PROFILING_SAMPLE_RATE=1.0, PROFILING_MAX_PROFILES=2):
+            for _ in range(4):
+                response = self.client.post("/api/api-keys/generate", {}, format="json")
+                self.assertNotIn("X-Profile-Id", response)
+
+        profiles = list_profiles(self.directory.name)
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual({profile["trigger"] for profile in profiles}, {"sample"})
+        self.assertEqual(len(os.listdir(self.directory.name)), 4)
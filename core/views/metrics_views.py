@@ -0,0 +1,10 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from core.helpers.metrics import registry, render_prometheus
+
+
+@require_GET
+def metrics_view(request):
+    """Exposes the metrics of every worker in the Prometheus text format."""
+    return HttpResponse(render_prometheus(registry.collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -4,3 +4,23 @@ from django.apps import AppConfig
 class NationalIdConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'national_id'
+
+    def ready(self):
+        from core.helpers.metrics import registry
+        from national_id.services.national_id_service import NationalIdService
+
+        cache = NationalIdService.result_cache
+        # The cache keeps its own counters, they are copied into metrics when a snapshot is taken
+        hits = registry.counter("national_id_result_cache_hits_total", "Result cache hits")
+        misses = registry.counter("national_id_result_cache_misses_total", "Result cache misses")
+        evictions = registry.counter("national_id_result_cache_evictions_total", "Result cache evictions")
+        entries = registry.gauge("national_id_result_cache_entries", "Entries held by the result cache")
+
+        def collect_result_cache():
+            stats = cache.stats()
+            hits.set(stats["hits"])
+            misses.set(stats["misses"])
+            evictions.set(stats["evictions"])
+            entries.set(stats["entries"])
+
+        registry.add_collector(collect_result_cache)
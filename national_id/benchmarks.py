@@ -0,0 +1,113 @@
+from datetime import date
+
+from rest_framework.test import APIClient
+
+from api_keys.services.api_key_service import ApiKeyService
+from core.helpers.benchmark import MACRO, benchmark
+from core.helpers.rate_limit import get_rate_limiter
+from national_id.helpers.check_sum import validate_check_sum
+from national_id.helpers.dates import calculate_age
+from national_id.helpers.generator import NationalIdGenerator
+from national_id.serializers.national_id_serializer import NationalIdSerializer
+from national_id.services.national_id_service import NationalIdService
+
+VALID_NATIONAL_ID = "29501012101234"
+BATCH_SIZE = 1_000
+
+
+@benchmark("national_id.check_sum")
+def check_sum():
+    return lambda: validate_check_sum(VALID_NATIONAL_ID)
+
+
+@benchmark("national_id.calculate_age")
+def age():
+    birth_date = date(1995, 1, 1)
+    return lambda: calculate_age(birth_date)
+
+
+@benchmark("national_id.serializer")
+def serializer():
+    def run():
+        national_id_serializer = NationalIdSerializer(data={"national_id": VALID_NATIONAL_ID})
+        national_id_serializer.is_valid(raise_exception=True)
+
+    return run
+
+
+@benchmark("national_id.service.validate_national_id.cached")
+def validate_cached():
+    return lambda: NationalIdService.validate_national_id(VALID_NATIONAL_ID)
+
+
+@benchmark("national_id.service.validate_national_id.uncached")
+def validate_uncached():
+    def run():
+        NationalIdService.result_cache.clear()
+        NationalIdService.validate_national_id(VALID_NATIONAL_ID)
+
+    return run
+
+
+@benchmark("national_id.service.extract_data_from_national_id.cached")
+def extract_cached():
+    return lambda: NationalIdService.extract_data_from_national_id(VALID_NATIONAL_ID)
+
+
+@benchmark("national_id.service.extract_data_from_national_id.uncached")
+def extract_uncached():
+    def run():
+        NationalIdService.result_cache.clear()
+        NationalIdService.extract_data_from_national_id(VALID_NATIONAL_ID)
+
+    return run
+
+
+@benchmark("national_id.service.validate_many")
+def validate_many():
+    national_ids = NationalIdGenerator(seed=1).generate(BATCH_SIZE)[0].tolist()
+    return lambda: NationalIdService.validate_many(national_ids)
+
+
+def _api_client() -> tuple[APIClient, str]:
+    api_key = ApiKeyService.generate_api_key()["api_key"]
+    return APIClient(HTTP_X_API_KEY=api_key), api_key
+
+
+def _request_benchmark(url: str, data: dict):
+    client, api_key = _api_client()
+
+    def run():
+        # The limiter allows two requests a minute, reset it so every call takes the full path
+        get_rate_limiter().reset(api_key)
+        response = client.post(url, data, format="json")
+        assert response.status_code == 200, response.status_code
+
+    return run
+
+
+@benchmark("national_id.request.validate", kind=MACRO)
+def validate_request():
+    return _request_benchmark("/api/national-id/validate", {"national_id": VALID_NATIONAL_ID})
+
+
+@benchmark("national_id.request.extract_data", kind=MACRO)
+def extract_request():
+    return _request_benchmark("/api/national-id/extract-data", {"national_id": VALID_NATIONAL_ID})
+
+
+@benchmark("national_id.request.validate_batch", kind=MACRO)
+def validate_batch_request():
+    national_ids = NationalIdGenerator(seed=1).generate(BATCH_SIZE)[0].tolist()
+    return _request_benchmark("/api/national-id/validate-batch", {"national_ids": national_ids})
+
+
+@benchmark("national_id.request.rate_limited", kind=MACRO)
+def rate_limited_request():
+    client, _ = _api_client()
+
+    def run():
+        response = client.post("/api/national-id/validate", {"national_id": VALID_NATIONAL_ID}, format="json")
+        assert response.status_code in (200, 429), response.status_code
+
+    return run
@@ -29,4 +29,55 @@ GOVERNORATE_NAME_BY_CODE = MappingProxyType({
     "34": "North Sinai",
     "35": "South Sinai",
     "88": "Outside Egypt"
-})
\ No newline at end of file
+})
+
+# Governorate names indexed by the integer value of the two digit code (None for unknown codes).
+# Built from the same string keys the service looks up, so both stay in agreement.
+GOVERNORATE_NAME_BY_INT_CODE = tuple(GOVERNORATE_NAME_BY_CODE.get(f"{code:02d}") for code in range(100))
+
+# Maximum number of national IDs accepted by a single batch request
+MAX_BATCH_SIZE = 10_000
+
+# Weights applied to the first 13 digits when computing the check digit
+CHECKSUM_WEIGHTS = (2, 7, 6, 5, 4, 3, 2, 7, 6, 5, 4, 3, 2)
+
+# Reason codes returned by the array based validation engine.
+# VALIDATION_REASONS maps each code to the message used by the scalar path.
+REASON_VALID = 0
+REASON_INVALID_GOVERNORATE = 1
+REASON_INVALID_BIRTH_DATE = 2
+REASON_FUTURE_BIRTH_DATE = 3
+REASON_INVALID_CHECK_DIGIT = 4
+REASON_NOT_DIGITS = 5
+REASON_INVALID_LENGTH = 6
+REASON_INVALID_PREFIX = 7
+REASON_UNEXPECTED_ERROR = 8
+REASON_REVOKED = 9
+
+VALIDATION_REASONS = (
+    "valid",
+    "Invalid governorate code",
+    "Invalid birth date",
+    "Birth date is in the future",
+    "Invalid check digit",
+    "National ID must contain digits only.",
+    "National ID must be exactly 14 digits long.",
+    "National ID must start with 2 or 3.",
+    "Unexpected error",
+    "National ID is revoked",
+)
+
+# Bounds of NationalIdService.result_cache
+RESULT_CACHE_MAX_ENTRIES = 100_000
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Number of NDJSON lines validated and flushed together by the streaming endpoint
+STREAM_CHUNK_SIZE = 1_000
+
+# Longest NDJSON line, newline included, read by the streaming endpoint. Longer lines are reported invalid
+# and skipped without being held in memory
+MAX_STREAM_LINE_BYTES = 1024
+
+# Lower bounds (in years) of the age buckets used by demographics aggregation, after an implicit 0
+AGE_BUCKET_EDGES = (18, 25, 35, 45, 55, 65)
+AGE_BUCKET_LABELS = ("0-17", "18-24", "25-34", "35-44", "45-54", "55-64", "65+")
@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+
+CSV_FORMAT = "csv"
+JSONL_FORMAT = "jsonl"
+FORMATS = (CSV_FORMAT, JSONL_FORMAT)
+
+VALIDATE_MODE = "validate"
+EXTRACT_MODE = "extract"
+MODES = (VALIDATE_MODE, EXTRACT_MODE)
+
+EXTRACTED_FIELDS = ("birth_governorate_name", "birth_date", "age", "gender")
+
+
+def detect_format(path: str) -> str:
+    """Guesses the file format from its extension, defaulting to CSV."""
+    return JSONL_FORMAT if path.endswith((".jsonl", ".ndjson", ".json")) else CSV_FORMAT
+
+
+def national_id_from_json_line(text: str) -> str:
+    """Reads a national ID from a JSON string or {"national_id": ...} line, falling back to the raw text."""
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return text
+
+    if isinstance(value, dict):
+        value = value.get("national_id", "")
+    return value if isinstance(value, str) else str(value)
+
+
+def read_national_id_chunks(file, file_format: str, chunk_size: int, column: str = "national_id", start_offset: int = 0):
+    """
+    Reads national IDs from a binary file in chunks, tracking the byte offset after each chunk.
+    Only one chunk is held in memory at a time.
+
+    CSV files must have a header row holding the national ID column, and rows must not span lines.
+    JSONL lines are either a JSON string or an object with a national_id key.
+
+    Args:
+        file: A file opened in binary mode.
+        file_format (str): CSV_FORMAT or JSONL_FORMAT.
+        chunk_size (int): Maximum number of national IDs per chunk.
+        column (str): The CSV column holding the national IDs.
+        start_offset (int): The byte offset to resume reading from, 0 to read from the start.
+
+    Yields:
+        tuple[list[str], int]: The national IDs of a chunk and the byte offset right after it.
+    """
+    column_index = None
+    if file_format == CSV_FORMAT:
+        file.seek(0)
+        header = file.readline()
+        header_row = next(csv.reader([header.decode("utf-8-sig")]), [])
+        if column not in header_row:
+            raise ValueError(f"Column '{column}' not found in the CSV header")
+        column_index = header_row.index(column)
+        start_offset = max(start_offset, len(header))
+
+    file.seek(start_offset)
+    offset = start_offset
+    chunk = []
+
+    for line in iter(file.readline, b""):
+        offset += len(line)
+        # Undecodable bytes become U+FFFD, so the row fails format validation instead of aborting the run
+        text = line.decode("utf-8", errors="replace").strip()
+        if not text:
+            continue
+
+        if column_index is None:
+            chunk.append(national_id_from_json_line(text))
+        else:
+            row = next(csv.reader([text]), [])
+            chunk.append(row[column_index].strip() if column_index < len(row) else "")
+
+        if len(chunk) >= chunk_size:
+            yield chunk, offset
+            chunk = []
+
+    if chunk:
+        yield chunk, offset
+
+
+def result_rows(mode: str, national_ids: list[str], results: list) -> list[dict]:
+    """
+    Flattens service results into one row per national ID.
+
+    Args:
+        mode (str): VALIDATE_MODE for validate_many results, EXTRACT_MODE for extract_many results.
+        national_ids (list[str]): The national IDs the results belong to.
+        results (list): The service results, in the same order.
+
+    Returns:
+        list[dict]: Rows with national_id, is_valid_national_id and reason, plus the extracted fields in EXTRACT_MODE.
+    """
+    rows = []
+    for national_id, result in zip(national_ids, results):
+        if mode == VALIDATE_MODE:
+            is_valid, reason = result
+            row = {"national_id": national_id, "is_valid_national_id": is_valid, "reason": None if is_valid else reason}
+        elif "reason" in result:
+            row = {"national_id": national_id, "is_valid_national_id": False, "reason": result["reason"]}
+            row.update(dict.fromkeys(EXTRACTED_FIELDS))
+        else:
+            row = {"national_id": national_id, "is_valid_national_id": True, "reason": None}
+            row.update(result)
+            row["birth_date"] = result["birth_date"].date().isoformat()
+        rows.append(row)
+    return rows
+
+
+def format_rows(rows: list[dict], mode: str, file_format: str, include_header: bool = False) -> bytes:
+    """
+    Serializes result rows to CSV or JSONL.
+
+    Args:
+        rows (list[dict]): Rows from result_rows.
+        mode (str): The mode the rows were produced in, which decides the CSV columns.
+        file_format (str): CSV_FORMAT or JSONL_FORMAT.
+        include_header (bool): Whether to start CSV output with a header row.
+
+    Returns:
+        bytes: The UTF-8 encoded output.
+    """
+    if file_format == JSONL_FORMAT:
+        return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+    fields = ["national_id", "is_valid_national_id", "reason"]
+    if mode == EXTRACT_MODE:
+        fields.extend(EXTRACTED_FIELDS)
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, lineterminator="\n")
+    if include_header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
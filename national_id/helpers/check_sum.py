@@ -1,5 +1,7 @@
+from national_id.constants.constants import CHECKSUM_WEIGHTS
+
 def validate_check_sum(national_id: str) -> bool:
-    weights = [2, 7, 6, 5, 4, 3, 2, 7, 6, 5, 4, 3, 2]
+    weights = CHECKSUM_WEIGHTS
 
     total = sum(int(digit) * weights[i] for i, digit in enumerate(national_id[:13]))
 
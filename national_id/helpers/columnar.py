@@ -0,0 +1,190 @@
+import csv
+import os
+from datetime import date
+
+import numpy as np
+
+from national_id.constants.constants import GOVERNORATE_NAME_BY_INT_CODE, REASON_VALID, VALIDATION_REASONS
+from national_id.helpers.dates import FIRST_BIRTH_DATE, get_age_table, get_reference_date
+from national_id.helpers.parser import parse_national_id
+from national_id.helpers.vectorized import to_digit_matrix, validate_national_ids
+
+# Shared by every ExtractedColumns, governorate_code indexes into it
+GOVERNORATE_NAMES = np.array([name or "" for name in GOVERNORATE_NAME_BY_INT_CODE])
+
+_FIRST_BIRTH_DAY = np.datetime64(FIRST_BIRTH_DATE, "D")
+
+CSV_CHUNK_ROWS = 100_000
+
+
+class ExtractedColumns:
+    """
+    Extracted data for many national IDs as a struct of arrays, one entry per ID.
+
+    Columns of invalid IDs hold placeholders: NaT birth dates, -1 ages, governorate code 0 and is_male False.
+    Use is_valid or reason_code to tell them apart.
+    """
+    __slots__ = (
+        "national_id",
+        "reason_code",
+        "birth_date",
+        "is_male",
+        "governorate_code",
+        "age_years",
+        "age_months",
+        "age_days",
+    )
+
+    COLUMNS = __slots__
+    governorate_names = GOVERNORATE_NAMES
+
+    def __init__(self, national_id, reason_code, birth_date, is_male, governorate_code, age_years, age_months, age_days):
+        self.national_id = national_id
+        self.reason_code = reason_code
+        self.birth_date = birth_date
+        self.is_male = is_male
+        self.governorate_code = governorate_code
+        self.age_years = age_years
+        self.age_months = age_months
+        self.age_days = age_days
+
+    def __len__(self):
+        return len(self.reason_code)
+
+    @property
+    def is_valid(self) -> np.ndarray:
+        return self.reason_code == REASON_VALID
+
+    def invalidate(self, mask: np.ndarray, reason_code: int):
+        """
+        Marks IDs as invalid after extraction, replacing their columns with the invalid placeholders.
+
+        Args:
+            mask (np.ndarray): A boolean mask of the IDs to invalidate.
+            reason_code (int): The reason code to record for them.
+        """
+        self.reason_code[mask] = reason_code
+        self.birth_date[mask] = np.datetime64("NaT")
+        self.is_male[mask] = False
+        self.governorate_code[mask] = 0
+        self.age_years[mask] = -1
+        self.age_months[mask] = -1
+        self.age_days[mask] = -1
+
+    def governorate_name(self) -> np.ndarray:
+        """Returns the governorate name of every ID, empty for invalid IDs."""
+        return GOVERNORATE_NAMES[self.governorate_code]
+
+    def to_npz(self, path: str, compressed: bool = False):
+        """
+        Saves every column, plus the governorate_names and reasons lookup tables, to a single .npz file.
+
+        Args:
+            path (str): The file to write.
+            compressed (bool): Whether to compress the archive.
+        """
+        save = np.savez_compressed if compressed else np.savez
+        save(
+            path,
+            governorate_names=GOVERNORATE_NAMES,
+            reasons=np.array(VALIDATION_REASONS),
+            **{column: getattr(self, column) for column in self.COLUMNS},
+        )
+
+    def save_npy(self, directory: str):
+        """
+        Saves each column to <directory>/<column>.npy, so columns can later be memory mapped individually.
+
+        Args:
+            directory (str): The directory to write to, created if missing.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for column in self.COLUMNS:
+            np.save(os.path.join(directory, f"{column}.npy"), getattr(self, column))
+        np.save(os.path.join(directory, "governorate_names.npy"), GOVERNORATE_NAMES)
+
+    def to_csv(self, file):
+        """
+        Writes one CSV row per ID, formatting columns a chunk at a time.
+
+        Args:
+            file: A path, or a text file opened with newline="".
+        """
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, "w", newline="") as csv_file:
+                return self.to_csv(csv_file)
+
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(("national_id", "is_valid_national_id", "reason", "birth_governorate_name", "birth_date",
+                         "gender", "age_years", "age_months", "age_days"))
+
+        reason_names = np.array(VALIDATION_REASONS)
+        gender_names = np.array(["Female", "Male"])
+        for start in range(0, len(self), CSV_CHUNK_ROWS):
+            rows = slice(start, start + CSV_CHUNK_ROWS)
+            valid = self.is_valid[rows]
+            writer.writerows(zip(
+                self.national_id[rows].tolist(),
+                valid.tolist(),
+                np.where(valid, "", reason_names[self.reason_code[rows]]).tolist(),
+                self.governorate_name()[rows].tolist(),
+                np.where(valid, np.datetime_as_string(self.birth_date[rows], unit="D"), "").tolist(),
+                np.where(valid, gender_names[self.is_male[rows].astype(np.intp)], "").tolist(),
+                self.age_years[rows].tolist(),
+                self.age_months[rows].tolist(),
+                self.age_days[rows].tolist(),
+            ))
+
+
+def extract_columns(national_ids, today: date | None = None) -> ExtractedColumns:
+    """
+    Extracts birth date, gender, governorate and age for many national IDs at once.
+
+    Args:
+        national_ids: A sequence or array of national ID strings, not expected to be format checked.
+        today (date, optional): The date to validate and calculate ages against. Defaults to the reference date.
+
+    Returns:
+        ExtractedColumns: One entry per national ID, in input order.
+    """
+    today = today or get_reference_date()
+    ids = np.asarray(national_ids, dtype=np.str_).reshape(-1)
+
+    is_valid, reasons = validate_national_ids(ids, today)
+    digits, decodable = to_digit_matrix(ids)
+    columns = digits.astype(np.int32)
+
+    year = np.where(columns[:, 0] == 2, 1900, 2000) + columns[:, 1] * 10 + columns[:, 2]
+    month = columns[:, 3] * 10 + columns[:, 4]
+    day = columns[:, 5] * 10 + columns[:, 6]
+    governorate_code = columns[:, 7] * 10 + columns[:, 8]
+    is_male = columns[:, 12] % 2 == 1
+
+    # Valid IDs the digit matrix could not represent (non ASCII digits) are decoded by the scalar parser
+    for index in np.flatnonzero(is_valid & ~decodable):
+        parsed = parse_national_id(str(ids[index]), today)
+        year[index], month[index], day[index] = parsed.year, parsed.month, parsed.day
+        governorate_code[index], is_male[index] = parsed.governorate_code, parsed.is_male
+
+    valid_year = np.where(is_valid, year, 1970)
+    valid_month = np.where(is_valid, month, 1)
+    valid_day = np.where(is_valid, day, 1)
+    birth_date = (
+        (valid_year - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+        + (valid_month - 1).astype("timedelta64[M]")
+    ).astype("datetime64[D]") + (valid_day - 1).astype("timedelta64[D]")
+    birth_date[~is_valid] = np.datetime64("NaT")
+
+    age_table = get_age_table(today)
+    table_index = np.where(is_valid, (birth_date - _FIRST_BIRTH_DAY).astype(np.int64), 0)
+
+    return ExtractedColumns(
+        national_id=ids,
+        reason_code=reasons,
+        birth_date=birth_date,
+        is_male=is_male & is_valid,
+        governorate_code=np.where(is_valid, governorate_code, 0).astype(np.uint8),
+        age_years=np.where(is_valid, age_table.years[table_index], -1).astype(np.int16),
+        age_months=np.where(is_valid, age_table.months[table_index], -1).astype(np.int8),
+        age_days=np.where(is_valid, age_table.days[table_index], -1).astype(np.int8),
+    )
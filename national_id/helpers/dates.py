@@ -1,31 +1,148 @@
-from datetime import date, datetime
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, timedelta
 
-def calculate_age(birth_date: date) ->  tuple[int, int, int]:
+import numpy as np
+
+_reference_date: ContextVar[date | None] = ContextVar("reference_date", default=None)
+
+
+def get_reference_date() -> date:
+    """
+    Returns the date national IDs are checked against.
+
+    Returns:
+        date: The date pinned with pin_reference_date, or the system date if none is pinned.
+    """
+    pinned = _reference_date.get()
+    return pinned if pinned is not None else date.today()
+
+
+@contextmanager
+def pin_reference_date(value: date | None = None):
+    """
+    Pins the reference date for the duration of a block, so a request or batch sees a single "today".
+    Tests can pass a fixed date.
+
+    Args:
+        value (date, optional): The date to pin. Defaults to the current reference date.
+
+    Usage:
+        with pin_reference_date(date(2024, 1, 1)):
+            NationalIdService.extract_data_from_national_id(national_id)
+    """
+    token = _reference_date.set(value or get_reference_date())
+    try:
+        yield _reference_date.get()
+    finally:
+        _reference_date.reset(token)
+
+
+# Every birth date a national ID can encode, as offsets from FIRST_BIRTH_DATE
+FIRST_BIRTH_DATE = date(1900, 1, 1)
+LAST_BIRTH_DATE = date(2099, 12, 31)
+_FIRST_ORDINAL = FIRST_BIRTH_DATE.toordinal()
+
+_BIRTH_DAYS = np.arange(np.datetime64(FIRST_BIRTH_DATE), np.datetime64(LAST_BIRTH_DATE + timedelta(days=1)))
+_BIRTH_MONTH_STARTS = _BIRTH_DAYS.astype("datetime64[M]")
+_BIRTH_YEAR = (_BIRTH_MONTH_STARTS.astype("datetime64[Y]").astype(np.int32) + 1970).astype(np.int16)
+_BIRTH_MONTH = (_BIRTH_MONTH_STARTS.astype(np.int32) % 12 + 1).astype(np.int16)
+_BIRTH_DAY = ((_BIRTH_DAYS - _BIRTH_MONTH_STARTS).astype(np.int32) + 1).astype(np.int16)
+
+
+def _days_in_previous_month(today: date) -> int:
+    return (today.replace(day=1) - timedelta(days=1)).day
+
+
+class AgeTable:
+    """
+    The age on a given day for every birth date from FIRST_BIRTH_DATE to LAST_BIRTH_DATE,
+    indexed by the number of days since FIRST_BIRTH_DATE.
+    """
+
+    def __init__(self, today: date):
+        self.today = today
+
+        years = today.year - _BIRTH_YEAR
+        months = today.month - _BIRTH_MONTH
+        days = today.day - _BIRTH_DAY
+
+        # Borrow days from the month before today, then months from the year
+        borrow_days = days < 0
+        months -= borrow_days
+        days += borrow_days * np.int16(_days_in_previous_month(today))
+
+        borrow_months = months < 0
+        months += borrow_months * np.int16(12)
+        years -= borrow_months
+
+        self.years = years
+        self.months = months.astype(np.int8)
+        self.days = days.astype(np.int8)
+
+    @staticmethod
+    def index_of(birth_date: date) -> int:
+        """Returns the table index of a birth date, which is out of range for unsupported dates."""
+        return birth_date.toordinal() - _FIRST_ORDINAL
+
+    def age_at(self, index: int) -> tuple[int, int, int]:
+        """Returns the (years, months, days) age stored at a table index."""
+        return self.years.item(index), self.months.item(index), self.days.item(index)
+
+
+_age_table: AgeTable | None = None
+_age_table_lock = threading.Lock()
+
+
+def get_age_table(today: date | None = None) -> AgeTable:
+    """
+    Returns the age table for a day, building it once per day.
+
+    Args:
+        today (date, optional): The day to compute ages on. Defaults to the reference date.
+
+    Returns:
+        AgeTable: The age table for that day.
+    """
+    global _age_table
+
+    today = today or get_reference_date()
+    table = _age_table
+    if table is None or table.today != today:
+        with _age_table_lock:
+            table = _age_table
+            if table is None or table.today != today:
+                table = _age_table = AgeTable(today)
+    return table
+
+
+def calculate_age(birth_date: date, today: date | None = None) ->  tuple[int, int, int]:
     """
     Calculates the age from a birth date.
 
     Args:
         birth_date (date): The birth date.
+        today (date, optional): The date to calculate the age on. Defaults to the reference date.
 
     Returns:
         tuple[int, int, int]: A tuple containing the age in years, months, and days.
     """
-    now = datetime.now()
-    
-    years = now.year - birth_date.year
-    months = now.month - birth_date.month
-    days = now.day - birth_date.day
+    today = today or get_reference_date()
+
+    index = AgeTable.index_of(birth_date)
+    if 0 <= index <= LAST_BIRTH_DATE.toordinal() - _FIRST_ORDINAL:
+        return get_age_table(today).age_at(index)
+
+    years = today.year - birth_date.year
+    months = today.month - birth_date.month
+    days = today.day - birth_date.day
 
     # Adjust days and months if negative
     if days < 0:
         # borrow days from previous month
         months -= 1
-        # get number of days in previous month
-        prev_month = (now.month - 1) if now.month > 1 else 12
-        prev_year = now.year if now.month > 1 else now.year - 1
-        # days in previous month
-        days_in_prev_month = (datetime(prev_year, prev_month + 1, 1) - datetime(prev_year, prev_month, 1)).days
-        days += days_in_prev_month
+        days += _days_in_previous_month(today)
 
     if months < 0:
         months += 12
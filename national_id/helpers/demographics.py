@@ -0,0 +1,129 @@
+from datetime import date
+
+import numpy as np
+
+from national_id.constants.constants import (
+    AGE_BUCKET_EDGES,
+    AGE_BUCKET_LABELS,
+    GOVERNORATE_NAME_BY_INT_CODE,
+    REASON_UNEXPECTED_ERROR,
+    REASON_VALID,
+    VALIDATION_REASONS,
+)
+from national_id.helpers.columnar import ExtractedColumns
+from national_id.services.national_id_service import NationalIdService
+
+_AGE_BUCKET_EDGES = np.array(AGE_BUCKET_EDGES)
+GENDER_LABELS = ("Female", "Male")
+FIRST_DECADE = 1900
+DECADE_LABELS = tuple(f"{decade}s" for decade in range(FIRST_DECADE, 2100, 10))
+
+# governorate code x gender x age bucket x birth decade
+HISTOGRAM_SHAPE = (len(GOVERNORATE_NAME_BY_INT_CODE), len(GENDER_LABELS), len(AGE_BUCKET_LABELS), len(DECADE_LABELS))
+
+
+class DemographicsAggregate:
+    """
+    Running governorate x gender x age bucket x birth decade counts over a stream of national IDs.
+
+    Chunks are counted with a single bincount and only the histogram is kept, never per ID results.
+    Aggregates built on different shards of the input can be combined with merge.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(HISTOGRAM_SHAPE, dtype=np.int64)
+        self.reason_counts = np.zeros(len(VALIDATION_REASONS), dtype=np.int64)
+
+    def add(self, national_ids, today: date | None = None) -> "DemographicsAggregate":
+        """
+        Counts a chunk of national IDs.
+
+        Args:
+            national_ids: A sequence or array of national ID strings, not expected to be format checked.
+            today (date, optional): The date to validate and calculate ages against. Defaults to the reference date.
+
+        Returns:
+            DemographicsAggregate: self, for chaining.
+        """
+        return self.add_columns(NationalIdService.extract_columns(national_ids, today))
+
+    def add_columns(self, columns: ExtractedColumns) -> "DemographicsAggregate":
+        """Counts a chunk that has already been extracted."""
+        self.reason_counts += np.bincount(columns.reason_code, minlength=len(VALIDATION_REASONS))
+
+        valid = columns.is_valid
+        birth_year = columns.birth_date[valid].astype("datetime64[Y]").astype(np.int64) + 1970
+        index = np.ravel_multi_index(
+            (
+                columns.governorate_code[valid].astype(np.intp),
+                columns.is_male[valid].astype(np.intp),
+                np.searchsorted(_AGE_BUCKET_EDGES, columns.age_years[valid], side="right"),
+                (birth_year - FIRST_DECADE) // 10,
+            ),
+            HISTOGRAM_SHAPE,
+        )
+        self.counts += np.bincount(index, minlength=self.counts.size).reshape(HISTOGRAM_SHAPE)
+        return self
+
+    def add_failed(self, count: int) -> "DemographicsAggregate":
+        """Records IDs that could not be processed, for example because their shard failed."""
+        self.reason_counts[REASON_UNEXPECTED_ERROR] += count
+        return self
+
+    def merge(self, other: "DemographicsAggregate") -> "DemographicsAggregate":
+        """
+        Adds the counts of another aggregate, such as one built by another worker.
+
+        Args:
+            other (DemographicsAggregate): The aggregate to add.
+
+        Returns:
+            DemographicsAggregate: self, for chaining.
+        """
+        self.counts += other.counts
+        self.reason_counts += other.reason_counts
+        return self
+
+    @property
+    def total(self) -> int:
+        return int(self.reason_counts.sum())
+
+    def to_dict(self) -> dict:
+        """
+        Summarizes the aggregate with a breakdown per dimension and the full governorate x gender x age bucket table.
+
+        Returns:
+            dict: JSON serializable counts keyed by human readable labels. Empty groups are left out.
+        """
+        governorate_counts = self.counts.sum(axis=(1, 2, 3))
+        by_governorate = {
+            GOVERNORATE_NAME_BY_INT_CODE[code]: int(count)
+            for code, count in enumerate(governorate_counts)
+            if count
+        }
+
+        table = {}
+        for code, gender, bucket in zip(*np.nonzero(self.counts.sum(axis=3))):
+            governorate = table.setdefault(GOVERNORATE_NAME_BY_INT_CODE[code], {})
+            governorate.setdefault(GENDER_LABELS[gender], {})[AGE_BUCKET_LABELS[bucket]] = int(
+                self.counts[code, gender, bucket].sum()
+            )
+
+        return {
+            "total": self.total,
+            "valid": int(self.reason_counts[REASON_VALID]),
+            "invalid_by_reason": {
+                VALIDATION_REASONS[code]: int(count)
+                for code, count in enumerate(self.reason_counts)
+                if count and code != REASON_VALID
+            },
+            "by_governorate": by_governorate,
+            "by_gender": dict(zip(GENDER_LABELS, self.counts.sum(axis=(0, 2, 3)).tolist())),
+            "by_age_bucket": dict(zip(AGE_BUCKET_LABELS, self.counts.sum(axis=(0, 1, 3)).tolist())),
+            "by_birth_decade": {
+                label: count
+                for label, count in zip(DECADE_LABELS, self.counts.sum(axis=(0, 1, 2)).tolist())
+                if count
+            },
+            "by_governorate_gender_age_bucket": table,
+        }
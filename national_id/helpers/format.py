@@ -0,0 +1,27 @@
+from national_id.constants.constants import (
+    REASON_INVALID_LENGTH,
+    REASON_INVALID_PREFIX,
+    REASON_NOT_DIGITS,
+    VALIDATION_REASONS,
+)
+
+def validate_national_id_format(national_id: str) -> str | None:
+    """
+    Checks that a national ID has the expected shape before it is decoded.
+
+    Args:
+        national_id (str): The national ID to check.
+
+    Returns:
+        str | None: A message describing the formatting problem, or None if the national ID is well formed.
+    """
+    if not national_id.isdigit():
+        return VALIDATION_REASONS[REASON_NOT_DIGITS]
+
+    if len(national_id) != 14:
+        return VALIDATION_REASONS[REASON_INVALID_LENGTH]
+
+    if not national_id.startswith(("2", "3")):
+        return VALIDATION_REASONS[REASON_INVALID_PREFIX]
+
+    return None
@@ -0,0 +1,243 @@
+from datetime import date
+
+import numpy as np
+
+from national_id.constants.constants import (
+    CHECKSUM_WEIGHTS,
+    GOVERNORATE_NAME_BY_INT_CODE,
+    REASON_FUTURE_BIRTH_DATE,
+    REASON_INVALID_BIRTH_DATE,
+    REASON_INVALID_CHECK_DIGIT,
+    REASON_INVALID_GOVERNORATE,
+    REASON_VALID,
+)
+from national_id.helpers.bulk_io import CSV_FORMAT, JSONL_FORMAT
+from national_id.helpers.dates import FIRST_BIRTH_DATE, LAST_BIRTH_DATE, get_reference_date
+from national_id.helpers.vectorized import NATIONAL_ID_LENGTH
+
+# One 14 digit ID and a newline per record, as read by validate_fixed_width_file
+FIXED_WIDTH_FORMAT = "fixed"
+OUTPUT_FORMATS = (CSV_FORMAT, JSONL_FORMAT, FIXED_WIDTH_FORMAT)
+
+VALID_KIND = "valid"
+BAD_CHECKSUM_KIND = "bad_checksum"
+INVALID_DATE_KIND = "invalid_date"
+INVALID_GOVERNORATE_KIND = "invalid_governorate"
+FUTURE_BIRTH_DATE_KIND = "future_birth_date"
+
+# The reason code the validator reports for each kind of generated ID
+REASON_CODE_BY_KIND = {
+    VALID_KIND: REASON_VALID,
+    BAD_CHECKSUM_KIND: REASON_INVALID_CHECK_DIGIT,
+    INVALID_DATE_KIND: REASON_INVALID_BIRTH_DATE,
+    INVALID_GOVERNORATE_KIND: REASON_INVALID_GOVERNORATE,
+    FUTURE_BIRTH_DATE_KIND: REASON_FUTURE_BIRTH_DATE,
+}
+KINDS = tuple(REASON_CODE_BY_KIND)
+
+DEFAULT_MAX_AGE = 80
+
+_CHECKSUM_WEIGHTS = np.array(CHECKSUM_WEIGHTS, dtype=np.int32)
+_KNOWN_GOVERNORATE_CODES = np.array([code for code, name in enumerate(GOVERNORATE_NAME_BY_INT_CODE) if name])
+_UNKNOWN_GOVERNORATE_CODES = np.array([code for code, name in enumerate(GOVERNORATE_NAME_BY_INT_CODE) if not name])
+_FIRST_DAY = np.datetime64(FIRST_BIRTH_DATE, "D")
+_LAST_DAY = np.datetime64(LAST_BIRTH_DATE, "D")
+_DAYS_PER_YEAR = 365.2425
+
+
+def _normalized(weights, size: int, name: str) -> np.ndarray:
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.shape != (size,) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError(f"{name} must be {size} non negative weights with a positive sum")
+    return weights / weights.sum()
+
+
+class NationalIdGenerator:
+    """
+    Generates synthetic national IDs in bulk, valid ones and ones broken in a known way.
+
+    Every ID is built as a digit matrix and its check digit computed with CHECKSUM_WEIGHTS,
+    so each generated ID fails exactly the check its kind describes.
+
+    Usage:
+        generator = NationalIdGenerator(seed=1, error_mix={"bad_checksum": 0.05})
+        national_ids, expected_reasons = generator.generate(1_000_000)
+    """
+
+    def __init__(
+        self,
+        seed: int | None = None,
+        error_mix: dict[str, float] | None = None,
+        governorate_weights: dict[str, float] | None = None,
+        age_weights=None,
+        male_ratio: float = 0.5,
+        today: date | None = None,
+    ):
+        """
+        Args:
+            seed (int, optional): Seed of the random generator, the same seed produces the same IDs.
+            error_mix (dict[str, float], optional): Share of each invalid kind, e.g. {"bad_checksum": 0.05}.
+                The remaining share is valid IDs.
+            governorate_weights (dict[str, float], optional): Relative weight of each two digit governorate code.
+                Defaults to every code the validator accepts, equally weighted.
+            age_weights (optional): Relative weight of each age in years, indexed by age.
+                Defaults to ages 0 to DEFAULT_MAX_AGE, equally weighted.
+            male_ratio (float): Share of IDs with a male gender digit.
+            today (date, optional): The date ages are counted back from. Defaults to the reference date.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.today = today or get_reference_date()
+        self.male_ratio = male_ratio
+
+        error_mix = dict(error_mix or {})
+        unknown_kinds = set(error_mix) - set(KINDS) - {VALID_KIND}
+        if unknown_kinds:
+            raise ValueError(f"Unknown error kinds: {', '.join(sorted(unknown_kinds))}")
+        error_mix[VALID_KIND] = 1 - sum(share for kind, share in error_mix.items() if kind != VALID_KIND)
+        self.kind_probabilities = _normalized([error_mix.get(kind, 0) for kind in KINDS], len(KINDS), "error_mix")
+
+        if governorate_weights:
+            codes = []
+            for code in governorate_weights:
+                if not code.isdigit() or int(code) > 99 or not GOVERNORATE_NAME_BY_INT_CODE[int(code)]:
+                    raise ValueError(f"Governorate code '{code}' is not accepted by the validator")
+                codes.append(int(code))
+            self.governorate_codes = np.array(codes)
+            self.governorate_probabilities = _normalized(
+                list(governorate_weights.values()), len(codes), "governorate_weights"
+            )
+        else:
+            self.governorate_codes = _KNOWN_GOVERNORATE_CODES
+            self.governorate_probabilities = None
+
+        if age_weights is None:
+            age_weights = np.ones(DEFAULT_MAX_AGE + 1)
+        self.age_probabilities = _normalized(age_weights, len(age_weights), "age_weights")
+
+    def _birth_dates(self, size: int) -> np.ndarray:
+        # Birth dates are spread over the year of each age, ages that would fall before 1900 are clipped
+        today = np.datetime64(self.today, "D")
+        ages = self.rng.choice(len(self.age_probabilities), size=size, p=self.age_probabilities)
+        days_back = ((ages + self.rng.random(size)) * _DAYS_PER_YEAR).astype(np.int64)
+        return np.clip(today - days_back.astype("timedelta64[D]"), _FIRST_DAY, today)
+
+    def _future_birth_dates(self, size: int) -> np.ndarray:
+        first = np.datetime64(self.today, "D") + np.timedelta64(1, "D")
+        if first > _LAST_DAY:
+            raise ValueError("Future birth dates cannot be encoded after 2099-12-31")
+        span = (_LAST_DAY - first).astype(np.int64) + 1
+        return first + self.rng.integers(0, min(span, 365 * 20), size=size).astype("timedelta64[D]")
+
+    def generate_digits(self, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Generates national IDs as a digit matrix.
+
+        Args:
+            size (int): Number of IDs to generate.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: An (N, 14) uint8 digit matrix and the uint8 reason code
+            the validator is expected to report for each row.
+        """
+        kind_index = self.rng.choice(len(KINDS), size=size, p=self.kind_probabilities).astype(np.uint8)
+        kind_is = {kind: kind_index == index for index, kind in enumerate(KINDS)}
+
+        birth_dates = self._birth_dates(size)
+        future = kind_is[FUTURE_BIRTH_DATE_KIND]
+        if future.any():
+            birth_dates[future] = self._future_birth_dates(int(future.sum()))
+
+        month_starts = birth_dates.astype("datetime64[M]")
+        year = month_starts.astype("datetime64[Y]").astype(np.int64) + 1970
+        month = month_starts.astype(np.int64) % 12 + 1
+        day = (birth_dates - month_starts).astype(np.int64) + 1
+
+        invalid_date = kind_is[INVALID_DATE_KIND]
+        if invalid_date.any():
+            # Either a month outside 1-12 or a day past the end of the month
+            count = int(invalid_date.sum())
+            days_in_month = ((month_starts[invalid_date] + 1).astype("datetime64[D]") - month_starts[invalid_date])
+            days_in_month = days_in_month.astype(np.int64)
+            bad_month = self.rng.choice(np.array([0, *range(13, 100)]), size=count)
+            bad_day = days_in_month + 1 + (self.rng.random(count) * (99 - days_in_month)).astype(np.int64)
+            use_bad_month = self.rng.random(count) < 0.5
+            month[invalid_date] = np.where(use_bad_month, bad_month, month[invalid_date])
+            day[invalid_date] = np.where(use_bad_month, day[invalid_date], bad_day)
+
+        governorate = self.rng.choice(self.governorate_codes, size=size, p=self.governorate_probabilities)
+        unknown_governorate = kind_is[INVALID_GOVERNORATE_KIND]
+        if unknown_governorate.any():
+            governorate[unknown_governorate] = self.rng.choice(
+                _UNKNOWN_GOVERNORATE_CODES, size=int(unknown_governorate.sum())
+            )
+
+        sequence = self.rng.integers(0, 1000, size=size)
+        gender_digit = self.rng.integers(0, 5, size=size) * 2 + (self.rng.random(size) < self.male_ratio)
+
+        digits = np.empty((size, NATIONAL_ID_LENGTH), dtype=np.uint8)
+        digits[:, 0] = np.where(year >= 2000, 3, 2)
+        for column, (values, place) in enumerate(
+            [(year % 100, 10), (year % 100, 1), (month, 10), (month, 1), (day, 10), (day, 1),
+             (governorate, 10), (governorate, 1), (sequence, 100), (sequence, 10), (sequence, 1)],
+            start=1,
+        ):
+            digits[:, column] = values // place % 10
+        digits[:, 12] = gender_digit
+
+        check_digit = (11 - (digits[:, :13].astype(np.int32) @ _CHECKSUM_WEIGHTS) % 11) % 10
+        bad_checksum = kind_is[BAD_CHECKSUM_KIND]
+        check_digit[bad_checksum] += self.rng.integers(1, 10, size=int(bad_checksum.sum()))
+        digits[:, 13] = check_digit % 10
+
+        expected_reasons = np.array([REASON_CODE_BY_KIND[kind] for kind in KINDS], dtype=np.uint8)[kind_index]
+        return digits, expected_reasons
+
+    def generate(self, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Generates national IDs as strings.
+
+        Args:
+            size (int): Number of IDs to generate.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The national IDs as a 14 character string array,
+            and the reason code the validator is expected to report for each.
+        """
+        digits, expected_reasons = self.generate_digits(size)
+        national_ids = (digits + np.uint8(48)).view(f"S{NATIONAL_ID_LENGTH}").reshape(-1)
+        return national_ids.astype(f"U{NATIONAL_ID_LENGTH}"), expected_reasons
+
+    def write(self, file, size: int, file_format: str = CSV_FORMAT, chunk_size: int = 1_000_000) -> np.ndarray:
+        """
+        Writes generated national IDs to a binary file, a chunk at a time.
+
+        Args:
+            file: A file opened in binary mode.
+            size (int): Number of IDs to generate.
+            file_format (str): CSV_FORMAT (with a national_id header), JSONL_FORMAT (one JSON string per line)
+                or FIXED_WIDTH_FORMAT.
+            chunk_size (int): Number of IDs generated and written at a time.
+
+        Returns:
+            np.ndarray: The expected reason code of every written ID, in file order.
+        """
+        if file_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown format '{file_format}'")
+        if file_format == CSV_FORMAT:
+            file.write(b"national_id\n")
+
+        expected_reasons = []
+        for start in range(0, size, chunk_size):
+            digits, chunk_reasons = self.generate_digits(min(chunk_size, size - start))
+
+            # Each record is assembled as a row of bytes, so a chunk is written with a single call
+            characters = digits + np.uint8(48)
+            if file_format == JSONL_FORMAT:
+                quotes = np.full((len(digits), 1), ord('"'), dtype=np.uint8)
+                characters = np.hstack([quotes, characters, quotes])
+            newlines = np.full((len(digits), 1), ord("\n"), dtype=np.uint8)
+            file.write(np.hstack([characters, newlines]).tobytes())
+
+            expected_reasons.append(chunk_reasons)
+
+        return np.concatenate(expected_reasons) if expected_reasons else np.zeros(0, dtype=np.uint8)
@@ -0,0 +1,152 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+from national_id.helpers.bulk_io import EXTRACT_MODE, VALIDATE_MODE
+from national_id.helpers.dates import get_reference_date
+from national_id.helpers.demographics import DemographicsAggregate
+from national_id.services.national_id_service import NationalIdService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_SIZE = 10_000
+
+# Shards in this mode return a DemographicsAggregate instead of one result per ID
+AGGREGATE_MODE = "aggregate"
+
+
+def _run_shard(mode: str, national_ids: list[str], today: date) -> list:
+    # Runs in a worker process, the reference date is passed so every shard agrees on "today"
+    if mode == AGGREGATE_MODE:
+        return DemographicsAggregate().add(national_ids, today)
+    if mode == EXTRACT_MODE:
+        return NationalIdService.extract_many(national_ids, today)
+    return NationalIdService.validate_many(national_ids, today)
+
+
+def failed_shard_results(mode: str, size: int) -> list:
+    """Results reported for every ID of a shard that could not be processed."""
+    if mode == AGGREGATE_MODE:
+        return DemographicsAggregate().add_failed(size)
+    if mode == EXTRACT_MODE:
+        return [{"is_valid_national_id": False, "reason": "Unexpected error"} for _ in range(size)]
+    return [(False, "Unexpected error")] * size
+
+
+class ShardedExecutor:
+    """
+    Runs bulk validation or extraction on a pool of worker processes.
+
+    Input is split into shards that are processed independently and merged back in input order.
+    A shard that fails is retried, and if it keeps failing its IDs are reported as "Unexpected error"
+    while the other shards are unaffected.
+
+    Usage:
+        with ShardedExecutor(workers=8) as executor:
+            results = executor.map(VALIDATE_MODE, national_ids)
+    """
+
+    def __init__(self, workers: int | None = None, shard_size: int = DEFAULT_SHARD_SIZE, retries: int = 1):
+        """
+        Args:
+            workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            shard_size (int): Number of IDs per shard when splitting a list with map.
+            retries (int): How many times a failed shard is resubmitted.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.retries = retries
+        self.failed_shards = 0
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _submit(self, mode: str, national_ids: list[str], today: date):
+        try:
+            return self._get_pool().submit(_run_shard, mode, national_ids, today)
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool, start a new one for the remaining shards
+            self._pool = None
+            return self._get_pool().submit(_run_shard, mode, national_ids, today)
+
+    def _result(self, future, mode: str, national_ids: list[str], today: date) -> list:
+        for attempt in range(self.retries + 1):
+            try:
+                return future.result()
+            except Exception as e:
+                logger.error(f"[ShardedExecutor] Shard of {len(national_ids)} IDs failed (attempt {attempt + 1}): {e}")
+                if isinstance(e, BrokenProcessPool):
+                    self._pool = None
+                if attempt < self.retries:
+                    future = self._submit(mode, national_ids, today)
+
+        self.failed_shards += 1
+        return failed_shard_results(mode, len(national_ids))
+
+    def imap(self, mode: str, shards, max_pending: int | None = None):
+        """
+        Processes shards lazily, keeping a bounded number in flight.
+
+        Args:
+            mode (str): VALIDATE_MODE, EXTRACT_MODE or AGGREGATE_MODE.
+            shards: An iterable of (national_ids, tag) pairs. The tag is passed through untouched.
+            max_pending (int, optional): Maximum shards in flight. Defaults to twice the worker count.
+
+        Yields:
+            tuple[list[str], object, list]: The national IDs, tag and results of each shard, in input order.
+            In AGGREGATE_MODE the results are the shard's DemographicsAggregate.
+        """
+        if mode not in (VALIDATE_MODE, EXTRACT_MODE, AGGREGATE_MODE):
+            raise ValueError(f"Unknown mode '{mode}'")
+
+        today = get_reference_date()
+        max_pending = max_pending or self.workers * 2
+        pending = deque()
+
+        for national_ids, tag in shards:
+            pending.append((self._submit(mode, national_ids, today), national_ids, tag))
+            if len(pending) >= max_pending:
+                future, pending_ids, pending_tag = pending.popleft()
+                yield pending_ids, pending_tag, self._result(future, mode, pending_ids, today)
+
+        while pending:
+            future, pending_ids, pending_tag = pending.popleft()
+            yield pending_ids, pending_tag, self._result(future, mode, pending_ids, today)
+
+    def map(self, mode: str, national_ids: list[str]) -> list:
+        """
+        Processes a list of national IDs across the worker pool.
+
+        Args:
+            mode (str): VALIDATE_MODE or EXTRACT_MODE.
+            national_ids (list[str]): The national IDs, not expected to be format checked.
+
+        Returns:
+            list: One result per national ID, in input order, as returned by validate_many or extract_many.
+        """
+        shards = (
+            (national_ids[start:start + self.shard_size], None)
+            for start in range(0, len(national_ids), self.shard_size)
+        )
+
+        results = []
+        for _, _, shard_results in self.imap(mode, shards):
+            results.extend(shard_results)
+        return results
@@ -0,0 +1,116 @@
+from datetime import date, datetime
+
+from national_id.constants.constants import (
+    CHECKSUM_WEIGHTS,
+    GOVERNORATE_NAME_BY_INT_CODE,
+    REASON_FUTURE_BIRTH_DATE,
+    REASON_INVALID_BIRTH_DATE,
+    REASON_INVALID_CHECK_DIGIT,
+    REASON_INVALID_GOVERNORATE,
+    REASON_VALID,
+    VALIDATION_REASONS,
+)
+from national_id.helpers.dates import get_reference_date
+
+FIRST_YEAR = 1900
+LAST_YEAR = 2099
+
+# weight * digit for every checksum position, indexed by position * 256 + ASCII byte of the digit
+_CHECKSUM_PRODUCTS = tuple(
+    weight * (byte - 48) if 48 <= byte <= 57 else 0
+    for weight in CHECKSUM_WEIGHTS
+    for byte in range(256)
+)
+
+# Days in each month for every supported year, indexed by (year - FIRST_YEAR) * 13 + month (month 0 has no days)
+_DAYS_IN_MONTH = tuple(
+    days
+    for year in range(FIRST_YEAR, LAST_YEAR + 1)
+    for days in (
+        0, 31, 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28,
+        31, 30, 31, 30, 31, 31, 30, 31, 30, 31,
+    )
+)
+
+
+class ParsedNationalId:
+    """
+    The result of decoding a national ID once.
+    Birth date and governorate fields are None when decoding stopped before reaching them.
+    """
+    __slots__ = ("national_id", "reason_code", "year", "month", "day", "governorate_code", "is_male")
+
+    def __init__(self, national_id, reason_code, year=None, month=None, day=None, governorate_code=None, is_male=None):
+        self.national_id = national_id
+        self.reason_code = reason_code
+        self.year = year
+        self.month = month
+        self.day = day
+        self.governorate_code = governorate_code
+        self.is_male = is_male
+
+    @property
+    def is_valid(self) -> bool:
+        return self.reason_code == REASON_VALID
+
+    @property
+    def reason(self) -> str:
+        return VALIDATION_REASONS[self.reason_code]
+
+    @property
+    def birth_date(self) -> datetime:
+        return datetime(self.year, self.month, self.day)
+
+    @property
+    def governorate_name(self) -> str | None:
+        return GOVERNORATE_NAME_BY_INT_CODE[self.governorate_code]
+
+    @property
+    def gender(self) -> str:
+        return "Male" if self.is_male else "Female"
+
+
+def parse_national_id(national_id: str, today: date | None = None) -> ParsedNationalId:
+    """
+    Decodes and validates a national ID in a single pass.
+
+    Checks run in the service's order: governorate code, birth date, future birth date, then the check digit.
+    The national ID is expected to have passed validate_national_id_format.
+
+    Args:
+        national_id (str): The national ID to parse.
+        today (date, optional): The date for the future birth date check. Defaults to the reference date.
+
+    Returns:
+        ParsedNationalId: The decoded fields and the reason code of the first failed check.
+    """
+    if not national_id.isascii():
+        # Non ASCII decimal digits never match a governorate code, anywhere else they are read as digits
+        if not national_id[7:9].isascii():
+            return ParsedNationalId(national_id, REASON_INVALID_GOVERNORATE)
+        raw = b"%014d" % int(national_id)
+    else:
+        raw = national_id.encode("ascii")
+
+    governorate_code = (raw[7] - 48) * 10 + raw[8] - 48
+    if GOVERNORATE_NAME_BY_INT_CODE[governorate_code] is None:
+        return ParsedNationalId(national_id, REASON_INVALID_GOVERNORATE)
+
+    year = (1900 if raw[0] == 50 else 2000) + (raw[1] - 48) * 10 + raw[2] - 48
+    month = (raw[3] - 48) * 10 + raw[4] - 48
+    day = (raw[5] - 48) * 10 + raw[6] - 48
+    if not 1 <= month <= 12 or day < 1 or day > _DAYS_IN_MONTH[(year - FIRST_YEAR) * 13 + month]:
+        return ParsedNationalId(national_id, REASON_INVALID_BIRTH_DATE)
+
+    today = today or get_reference_date()
+    if year * 10000 + month * 100 + day > today.year * 10000 + today.month * 100 + today.day:
+        return ParsedNationalId(national_id, REASON_FUTURE_BIRTH_DATE)
+
+    products = _CHECKSUM_PRODUCTS
+    total = 0
+    for position in range(13):
+        total += products[position * 256 + raw[position]]
+
+    reason_code = REASON_VALID if (11 - total % 11) % 10 == raw[13] - 48 else REASON_INVALID_CHECK_DIGIT
+
+    return ParsedNationalId(national_id, reason_code, year, month, day, governorate_code, raw[12] % 2 == 1)
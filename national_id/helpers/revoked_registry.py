@@ -0,0 +1,258 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# File layout, all little endian uint64 words:
+#   header (MAGIC, count, bloom_words, hash_count) | bloom filter bits | sorted national IDs
+MAGIC = 0x314B5645_5244494E  # "NIDREVK1"
+HEADER_WORDS = 4
+HASH_COUNT = 7
+BLOOM_BITS_PER_ID = 10
+REGISTRY_FILE_MODE = 0o644
+
+_MASK64 = (1 << 64) - 1
+_POWERS_OF_TEN = 10 ** np.arange(13, -1, -1, dtype=np.uint64)
+
+
+def _mix(value: int) -> int:
+    # splitmix64 finalizer, spreads 14 digit IDs over the 64 bit space
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def _mix_array(values: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        values = values + np.uint64(0x9E3779B97F4A7C15)
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
+
+
+def _bloom_positions(mixed: np.ndarray, bit_mask: int) -> np.ndarray:
+    # Double hashing, returns an (N, HASH_COUNT) array of bit positions
+    first = mixed & np.uint64(0xFFFFFFFF)
+    step = (mixed >> np.uint64(32)) | np.uint64(1)
+    with np.errstate(over="ignore"):
+        positions = first[:, None] + step[:, None] * np.arange(HASH_COUNT, dtype=np.uint64)
+    return positions & np.uint64(bit_mask)
+
+
+def national_ids_to_integers(national_ids) -> np.ndarray:
+    """
+    Converts 14 digit national IDs to uint64 integers.
+
+    Args:
+        national_ids: A sequence or array of 14 digit national ID strings.
+
+    Returns:
+        np.ndarray: The national IDs as uint64.
+    """
+    try:
+        ids = np.asarray(national_ids, dtype="S14").reshape(-1)
+    except UnicodeEncodeError:
+        # Non ASCII digits (e.g. Arabic-Indic) are rare, int() understands them
+        return np.fromiter((int(national_id) for national_id in national_ids), dtype=np.uint64)
+
+    digits = ids.view(np.uint8).reshape(-1, 14) - np.uint8(48)
+    return digits.astype(np.uint64) @ _POWERS_OF_TEN
+
+
+def write_registry(national_ids: np.ndarray, path: str) -> int:
+    """
+    Writes a registry file for a set of national IDs, replacing any existing file atomically
+    so processes that have the old file mapped keep a consistent view until they reload.
+
+    Args:
+        national_ids (np.ndarray): The national IDs as integers, duplicates and order do not matter.
+        path (str): The registry file to write.
+
+    Returns:
+        int: The number of distinct national IDs written.
+    """
+    ids = np.unique(np.asarray(national_ids, dtype=np.uint64))
+    bloom_bits = 64
+    while bloom_bits < len(ids) * BLOOM_BITS_PER_ID:
+        bloom_bits *= 2
+
+    bloom = np.zeros(bloom_bits // 64, dtype=np.uint64)
+    if len(ids):
+        positions = _bloom_positions(_mix_array(ids), bloom_bits - 1).reshape(-1)
+        np.bitwise_or.at(bloom, positions >> np.uint64(6), np.uint64(1) << (positions & np.uint64(63)))
+
+    header = np.array([MAGIC, len(ids), len(bloom), HASH_COUNT], dtype=np.uint64)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temporary_file:
+        for part in (header, bloom, ids):
+            temporary_file.write(part.astype("<u8").tobytes())
+        temporary_file.flush()
+        os.fsync(temporary_file.fileno())
+        # Temporary files are private (0600) and os.replace keeps the mode, workers may run as another user
+        os.fchmod(temporary_file.fileno(), REGISTRY_FILE_MODE)
+    os.replace(temporary_file.name, path)
+    return len(ids)
+
+
+class _RegistrySnapshot:
+    __slots__ = ("ids", "bloom", "bit_mask", "hash_count", "file_id")
+
+    def __init__(self, ids, bloom, hash_count, file_id):
+        self.ids = ids
+        self.bloom = bloom
+        self.bit_mask = len(bloom) * 64 - 1
+        self.hash_count = hash_count
+        self.file_id = file_id
+
+
+_EMPTY_SNAPSHOT = _RegistrySnapshot(np.zeros(0, dtype=np.uint64), np.zeros(1, dtype=np.uint64), HASH_COUNT, None)
+
+
+class RevokedIdRegistry:
+    """
+    Set of revoked or blocked national IDs backed by a memory mapped file.
+
+    The file holds a sorted uint64 array searched with binary search, behind a Bloom filter
+    that answers most lookups for IDs that are not revoked without touching the array.
+    Every process maps the same file, so the operating system shares its pages between workers.
+    The file is checked for changes at most every reload_interval seconds and swapped in atomically.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 5.0):
+        """
+        Args:
+            path (str): The registry file, written with write_registry. A missing file is treated as empty.
+            reload_interval (float): Minimum seconds between checks for a new file.
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self._snapshot = _EMPTY_SNAPSHOT
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self._reload_if_changed()
+
+    def __len__(self):
+        return len(self._current().ids)
+
+    def _load(self, file_id) -> _RegistrySnapshot:
+        words = np.memmap(self.path, dtype="<u8", mode="r")
+        if len(words) < HEADER_WORDS or words[0] != MAGIC:
+            raise ValueError(f"{self.path} is not a revoked ID registry")
+
+        count, bloom_words, hash_count = (int(word) for word in words[1:HEADER_WORDS])
+        bloom = words[HEADER_WORDS:HEADER_WORDS + bloom_words]
+        ids = words[HEADER_WORDS + bloom_words:HEADER_WORDS + bloom_words + count]
+        return _RegistrySnapshot(ids, bloom, hash_count, file_id)
+
+    def _reload_if_changed(self):
+        with self._lock:
+            self._next_check = time.monotonic() + self.reload_interval
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if self._snapshot.file_id is not None:
+                    logger.warning(f"[RevokedIdRegistry] {self.path} was removed, no IDs are revoked")
+                self._snapshot = _EMPTY_SNAPSHOT
+                return
+
+            file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_id == self._snapshot.file_id:
+                return
+
+            try:
+                self._snapshot = self._load(file_id)
+                self.reloads += 1
+            except Exception as e:
+                logger.error(f"[RevokedIdRegistry] Keeping the previous registry, failed to load {self.path}: {e}")
+
+    def _current(self) -> _RegistrySnapshot:
+        if time.monotonic() >= self._next_check:
+            self._reload_if_changed()
+        return self._snapshot
+
+    def contains(self, national_id: str) -> bool:
+        """
+        Checks whether a single national ID is revoked.
+
+        Args:
+            national_id (str): A national ID that passed format validation.
+
+        Returns:
+            bool: True if the national ID is in the registry.
+        """
+        snapshot = self._current()
+        if not len(snapshot.ids):
+            return False
+
+        value = int(national_id)
+        mixed = _mix(value)
+        first, step = mixed & 0xFFFFFFFF, (mixed >> 32) | 1
+        bloom = snapshot.bloom
+        for i in range(snapshot.hash_count):
+            position = (first + i * step) & snapshot.bit_mask
+            if not (bloom.item(position >> 6) >> (position & 63)) & 1:
+                return False
+
+        index = int(np.searchsorted(snapshot.ids, np.uint64(value)))
+        return index < len(snapshot.ids) and snapshot.ids.item(index) == value
+
+    def contains_many(self, national_ids) -> np.ndarray:
+        """
+        Checks many national IDs at once.
+
+        Args:
+            national_ids: A sequence or array of national IDs that passed format validation.
+
+        Returns:
+            np.ndarray: A boolean mask, True for revoked national IDs.
+        """
+        snapshot = self._current()
+        values = national_ids_to_integers(national_ids)
+        if not len(snapshot.ids) or not len(values):
+            return np.zeros(len(values), dtype=bool)
+
+        positions = _bloom_positions(_mix_array(values), snapshot.bit_mask)[:, :snapshot.hash_count]
+        bits = (snapshot.bloom[positions >> np.uint64(6)] >> (positions & np.uint64(63))) & np.uint64(1)
+        maybe_revoked = bits.all(axis=1)
+
+        revoked = np.zeros(len(values), dtype=bool)
+        candidates = values[maybe_revoked]
+        indices = np.minimum(np.searchsorted(snapshot.ids, candidates), len(snapshot.ids) - 1)
+        revoked[maybe_revoked] = snapshot.ids[indices] == candidates
+        return revoked
+
+
+_registry: RevokedIdRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_revoked_registry() -> RevokedIdRegistry | None:
+    """
+    Returns the process wide registry configured with NATIONAL_ID_REVOKED_REGISTRY_PATH.
+
+    Returns:
+        RevokedIdRegistry | None: The registry, or None when no path is configured.
+    """
+    global _registry
+
+    if _registry is None:
+        from django.conf import settings
+
+        path = getattr(settings, "NATIONAL_ID_REVOKED_REGISTRY_PATH", None) if settings.configured else None
+        if not path:
+            return None
+
+        with _registry_lock:
+            if _registry is None:
+                _registry = RevokedIdRegistry(
+                    path, getattr(settings, "NATIONAL_ID_REVOKED_REGISTRY_RELOAD_INTERVAL", 5.0)
+                )
+    return _registry
@@ -0,0 +1,235 @@
+import os
+from datetime import date
+
+import numpy as np
+
+from national_id.constants.constants import (
+    CHECKSUM_WEIGHTS,
+    GOVERNORATE_NAME_BY_INT_CODE,
+    REASON_FUTURE_BIRTH_DATE,
+    REASON_INVALID_BIRTH_DATE,
+    REASON_INVALID_CHECK_DIGIT,
+    REASON_INVALID_GOVERNORATE,
+    REASON_INVALID_LENGTH,
+    REASON_INVALID_PREFIX,
+    REASON_NOT_DIGITS,
+    REASON_UNEXPECTED_ERROR,
+    REASON_VALID,
+    VALIDATION_REASONS,
+)
+from national_id.helpers.dates import get_reference_date
+from national_id.helpers.format import validate_national_id_format
+from national_id.helpers.parser import parse_national_id
+
+NATIONAL_ID_LENGTH = 14
+
+_CHECKSUM_WEIGHTS = np.array(CHECKSUM_WEIGHTS, dtype=np.int32)
+
+# Indexed by the two digit governorate code
+_KNOWN_GOVERNORATE = np.array(
+    [name is not None for name in GOVERNORATE_NAME_BY_INT_CODE],
+    dtype=bool,
+)
+
+# Indexed by [is_leap_year, month], month 0 is never valid
+_DAYS_IN_MONTH = np.array(
+    [
+        [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+        [0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+    ],
+    dtype=np.int16,
+)
+
+_REASON_CODE_BY_MESSAGE = {message: code for code, message in enumerate(VALIDATION_REASONS)}
+
+
+def to_digit_matrix(national_ids) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Converts national IDs to an (N, 14) matrix of digit values.
+
+    Args:
+        national_ids: A sequence or array of national ID strings.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The uint8 digit matrix, and a mask of the rows that are 14 ASCII characters
+        long and can therefore be validated from the matrix alone. Non digit characters map to values above 9.
+    """
+    ids = np.asarray(national_ids, dtype=np.str_).reshape(-1)
+    lengths = np.char.str_len(ids)
+
+    code_points = np.ascontiguousarray(ids.astype(f"<U{NATIONAL_ID_LENGTH}"))
+    code_points = code_points.view(np.uint32).reshape(-1, NATIONAL_ID_LENGTH)
+
+    decodable = (lengths == NATIONAL_ID_LENGTH) & (code_points < 128).all(axis=1)
+    digits = (code_points - 48).astype(np.uint8)
+
+    return digits, decodable
+
+
+def validate_digit_matrix(digits: np.ndarray, today: date) -> np.ndarray:
+    """
+    Validates rows of a digit matrix, each holding a 14 character national ID.
+
+    Args:
+        digits (np.ndarray): An (N, 14) uint8 matrix of digit values, as produced by to_digit_matrix.
+        today (date): The reference date used for the future birth date check.
+
+    Returns:
+        np.ndarray: A uint8 reason code per row, see VALIDATION_REASONS.
+    """
+    columns = digits.astype(np.int32)
+
+    not_digits = (digits > 9).any(axis=1)
+    invalid_prefix = (columns[:, 0] != 2) & (columns[:, 0] != 3)
+
+    governorate_code = np.minimum(columns[:, 7] * 10 + columns[:, 8], 99)
+    invalid_governorate = ~_KNOWN_GOVERNORATE[governorate_code]
+
+    year = np.where(columns[:, 0] == 2, 1900, 2000) + columns[:, 1] * 10 + columns[:, 2]
+    month = columns[:, 3] * 10 + columns[:, 4]
+    day = columns[:, 5] * 10 + columns[:, 6]
+
+    is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    days_in_month = _DAYS_IN_MONTH[is_leap.astype(np.intp), np.clip(month, 0, 12)]
+    invalid_birth_date = (month < 1) | (month > 12) | (day < 1) | (day > days_in_month)
+
+    today_key = today.year * 10000 + today.month * 100 + today.day
+    future_birth_date = year * 10000 + month * 100 + day > today_key
+
+    check_digit = (11 - (columns[:, :13] @ _CHECKSUM_WEIGHTS) % 11) % 10
+    invalid_check_digit = check_digit != columns[:, 13]
+
+    # Conditions are listed in the same order the scalar path checks them
+    return np.select(
+        [
+            not_digits,
+            invalid_prefix,
+            invalid_governorate,
+            invalid_birth_date,
+            future_birth_date,
+            invalid_check_digit,
+        ],
+        [
+            REASON_NOT_DIGITS,
+            REASON_INVALID_PREFIX,
+            REASON_INVALID_GOVERNORATE,
+            REASON_INVALID_BIRTH_DATE,
+            REASON_FUTURE_BIRTH_DATE,
+            REASON_INVALID_CHECK_DIGIT,
+        ],
+        default=REASON_VALID,
+    ).astype(np.uint8)
+
+
+def _validate_scalar(national_id: str, today: date) -> int:
+    try:
+        format_error = validate_national_id_format(national_id)
+        if format_error:
+            return _REASON_CODE_BY_MESSAGE[format_error]
+
+        return parse_national_id(national_id, today).reason_code
+    except Exception:
+        return REASON_UNEXPECTED_ERROR
+
+
+def validate_national_ids(national_ids, today: date | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Validates an array of national IDs in one pass.
+
+    Rows the digit matrix cannot represent (wrong length, non ASCII digits) go through
+    the scalar parser so that every verdict matches NationalIdService.validate_national_id.
+
+    Args:
+        national_ids: A sequence or array of national ID strings, not expected to be format checked.
+        today (date, optional): The date for the future birth date check. Defaults to the reference date.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: A boolean validity mask and a uint8 reason code per national ID.
+    """
+    today = today or get_reference_date()
+    ids = np.asarray(national_ids, dtype=np.str_).reshape(-1)
+
+    digits, decodable = to_digit_matrix(ids)
+    reasons = validate_digit_matrix(digits, today)
+
+    for index in np.flatnonzero(~decodable):
+        reasons[index] = _validate_scalar(str(ids[index]), today)
+
+    return reasons == REASON_VALID, reasons
+
+
+def validate_fixed_width_file(
+    path: str,
+    today: date | None = None,
+    record_length: int = NATIONAL_ID_LENGTH + 1,
+    chunk_records: int = 1 << 20,
+    output_path: str | None = None,
+) -> np.ndarray:
+    """
+    Validates a file of fixed width records (14 ASCII digits followed by a line ending) without decoding lines.
+
+    The file is memory mapped and viewed as a byte matrix, so only one chunk of records is ever in memory
+    and files larger than RAM can be validated. Records whose line ending is not where it should be are
+    reported as having an invalid length.
+
+    Args:
+        path (str): The fixed width file.
+        today (date, optional): The date for the future birth date check. Defaults to the reference date.
+        record_length (int): Bytes per record, 15 for "\\n" line endings and 16 for "\\r\\n".
+        chunk_records (int): Number of records validated at a time.
+        output_path (str, optional): A .npy file to write the reason codes to as a memory map instead of holding them in memory.
+
+    Returns:
+        np.ndarray: A uint8 reason code per record, see VALIDATION_REASONS.
+    """
+    if record_length not in (NATIONAL_ID_LENGTH + 1, NATIONAL_ID_LENGTH + 2):
+        raise ValueError("record_length must be 15 (\\n line endings) or 16 (\\r\\n line endings)")
+
+    today = today or get_reference_date()
+    line_ending = np.frombuffer(b"\r\n"[-(record_length - NATIONAL_ID_LENGTH):], dtype=np.uint8)
+
+    size = os.path.getsize(path)
+    # The last record may be missing its line ending
+    if size % record_length:
+        size += record_length - size % record_length
+    count = size // record_length
+
+    if output_path:
+        reasons = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.uint8, shape=(count,))
+    else:
+        reasons = np.empty(count, dtype=np.uint8)
+
+    if count == 0:
+        return reasons
+
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    full_records = data.size // record_length
+    records = data[:full_records * record_length].reshape(full_records, record_length)
+
+    for start in range(0, full_records, chunk_records):
+        block = records[start:start + chunk_records]
+        chunk_reasons = validate_digit_matrix(block[:, :NATIONAL_ID_LENGTH] - np.uint8(48), today)
+        misaligned = (block[:, NATIONAL_ID_LENGTH:] != line_ending).any(axis=1)
+        chunk_reasons[misaligned] = REASON_INVALID_LENGTH
+        reasons[start:start + len(block)] = chunk_reasons
+
+    if full_records < count:
+        tail = bytes(data[full_records * record_length:]).rstrip(b"\r\n")
+        reasons[full_records] = _validate_scalar(tail.decode("ascii", errors="replace"), today)
+
+    if output_path:
+        reasons.flush()
+    return reasons
+
+
+def pack_validity_bitmap(reasons: np.ndarray) -> np.ndarray:
+    """
+    Packs reason codes into a bitmap with one bit per national ID, set when the ID is valid.
+
+    Args:
+        reasons (np.ndarray): Reason codes from one of the validation functions.
+
+    Returns:
+        np.ndarray: The uint8 bitmap, most significant bit first.
+    """
+    return np.packbits(reasons == REASON_VALID)
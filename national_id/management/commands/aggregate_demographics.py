@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from national_id.helpers.bulk_io import detect_format, read_national_id_chunks
+from national_id.helpers.dates import get_reference_date
+from national_id.helpers.demographics import DemographicsAggregate
+from national_id.helpers.parallel import AGGREGATE_MODE, ShardedExecutor
+
+
+class Command(BaseCommand):
+    help = (
+        "Counts IDs of a CSV/JSONL file by governorate, gender, age bucket and birth decade, "
+        "streaming the file in chunks and printing the aggregate as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="CSV file with a header row, or JSONL file of national IDs")
+        parser.add_argument("--output", help="File to write the JSON aggregate to, defaults to stdout")
+        parser.add_argument("--column", default="national_id", help="CSV column holding the national IDs")
+        parser.add_argument("--chunk-size", type=int, default=100_000)
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes, 1 aggregates in this process")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--chunk-size and --workers must be at least 1")
+
+        aggregate = DemographicsAggregate()
+        today = get_reference_date()
+        started_at = time.perf_counter()
+
+        with open(options["input"], "rb") as input_file, ShardedExecutor(workers=options["workers"]) as executor:
+            chunks = read_national_id_chunks(
+                input_file, detect_format(options["input"]), options["chunk_size"], column=options["column"]
+            )
+            if options["workers"] > 1:
+                for _, _, shard_aggregate in executor.imap(AGGREGATE_MODE, chunks):
+                    aggregate.merge(shard_aggregate)
+            else:
+                for national_ids, _ in chunks:
+                    aggregate.add(national_ids, today)
+
+        summary = json.dumps(aggregate.to_dict(), indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                output_file.write(summary)
+        else:
+            self.stdout.write(summary)
+
+        elapsed = max(time.perf_counter() - started_at, 1e-9)
+        self.stderr.write(f"Aggregated {aggregate.total} IDs in {elapsed:.2f}s ({aggregate.total / elapsed:,.0f} IDs/s)")
@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from national_id.helpers.bulk_io import FORMATS, detect_format, read_national_id_chunks
+from national_id.helpers.format import validate_national_id_format
+from national_id.helpers.revoked_registry import national_ids_to_integers, write_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the revoked national ID registry from a CSV/JSONL file. The registry file is replaced atomically, "
+        "running workers pick it up on their next reload check."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="CSV file with a header row, or JSONL file of revoked national IDs")
+        parser.add_argument("output", help="Registry file, usually NATIONAL_ID_REVOKED_REGISTRY_PATH")
+        parser.add_argument("--format", choices=FORMATS, help="Input format, guessed from the extension by default")
+        parser.add_argument("--column", default="national_id", help="CSV column holding the national IDs")
+        parser.add_argument("--chunk-size", type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        started_at = time.perf_counter()
+        file_format = options["format"] or detect_format(options["input"])
+
+        chunks = []
+        skipped = 0
+        with open(options["input"], "rb") as input_file:
+            for national_ids, _ in read_national_id_chunks(
+                input_file, file_format, options["chunk_size"], column=options["column"]
+            ):
+                well_formed = [national_id for national_id in national_ids if not validate_national_id_format(national_id)]
+                skipped += len(national_ids) - len(well_formed)
+                if well_formed:
+                    chunks.append(national_ids_to_integers(well_formed))
+
+        national_ids = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint64)
+        count = write_registry(national_ids, options["output"])
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(
+            f"Wrote {count} revoked IDs to {options['output']} in {elapsed:.2f}s"
+            f" ({skipped} malformed IDs skipped)"
+        )
@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from national_id.helpers.generator import KINDS, OUTPUT_FORMATS, NationalIdGenerator, VALID_KIND
+
+
+def parse_weights(value: str) -> dict[str, float]:
+    """Parses "key=weight,key=weight" into a dict."""
+    weights = {}
+    for item in filter(None, value.split(",")):
+        key, _, weight = item.partition("=")
+        try:
+            weights[key.strip()] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight '{item}', expected key=number")
+    return weights
+
+
+class Command(BaseCommand):
+    help = "Generates synthetic national IDs, valid and deliberately invalid, for load and correctness testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="File to write the national IDs to")
+        parser.add_argument("--count", type=int, default=1_000_000)
+        parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv")
+        parser.add_argument("--seed", type=int, help="Seed for reproducible output")
+        parser.add_argument(
+            "--error-mix",
+            default="",
+            help=f"Share of each invalid kind, e.g. bad_checksum=0.05,invalid_date=0.01. "
+                 f"Kinds: {', '.join(kind for kind in KINDS if kind != VALID_KIND)}",
+        )
+        parser.add_argument("--governorates", default="", help="Relative governorate weights, e.g. 21=3,12=2,88=0.1")
+        parser.add_argument("--min-age", type=int, default=0)
+        parser.add_argument("--max-age", type=int, default=80)
+        parser.add_argument("--male-ratio", type=float, default=0.5)
+        parser.add_argument("--chunk-size", type=int, default=1_000_000)
+        parser.add_argument("--expected", help="Also write the expected uint8 reason codes to this .npy file")
+
+    def handle(self, *args, **options):
+        if options["count"] < 0 or options["chunk_size"] < 1:
+            raise CommandError("--count must not be negative and --chunk-size must be at least 1")
+        if not 0 <= options["min_age"] <= options["max_age"]:
+            raise CommandError("--min-age must be between 0 and --max-age")
+
+        age_weights = np.zeros(options["max_age"] + 1)
+        age_weights[options["min_age"]:] = 1
+
+        try:
+            generator = NationalIdGenerator(
+                seed=options["seed"],
+                error_mix=parse_weights(options["error_mix"]),
+                governorate_weights=parse_weights(options["governorates"]),
+                age_weights=age_weights,
+                male_ratio=options["male_ratio"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started_at = time.perf_counter()
+        with open(options["output"], "wb") as output_file:
+            expected_reasons = generator.write(
+                output_file, options["count"], options["format"], chunk_size=options["chunk_size"]
+            )
+
+        if options["expected"]:
+            np.save(options["expected"], expected_reasons)
+
+        elapsed = max(time.perf_counter() - started_at, 1e-9)
+        self.stdout.write(
+            f"Generated {options['count']} IDs in {elapsed:.2f}s ({options['count'] / elapsed:,.0f} IDs/s)"
+        )
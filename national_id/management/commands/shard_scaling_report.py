@@ -0,0 +1,66 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from national_id.helpers.bulk_io import MODES, VALIDATE_MODE, detect_format, read_national_id_chunks
+from national_id.helpers.dates import pin_reference_date
+from national_id.helpers.parallel import DEFAULT_SHARD_SIZE, ShardedExecutor
+
+
+class Command(BaseCommand):
+    help = "Measures sharded bulk processing throughput as the number of worker processes grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="CSV file with a header row, or JSONL file of national IDs")
+        parser.add_argument("--mode", choices=MODES, default=VALIDATE_MODE)
+        parser.add_argument("--column", default="national_id", help="CSV column holding the national IDs")
+        parser.add_argument("--limit", type=int, default=1_000_000, help="Maximum number of IDs loaded from the input")
+        parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per worker count, the fastest is reported")
+
+    def handle(self, *args, **options):
+        national_ids = []
+        with open(options["input"], "rb") as input_file:
+            chunks = read_national_id_chunks(
+                input_file, detect_format(options["input"]), options["shard_size"], column=options["column"]
+            )
+            for chunk, _ in chunks:
+                national_ids.extend(chunk)
+                if len(national_ids) >= options["limit"]:
+                    break
+        national_ids = national_ids[:options["limit"]]
+
+        if not national_ids:
+            raise CommandError("The input file has no national IDs")
+
+        worker_counts = []
+        workers = 1
+        while workers < options["max_workers"]:
+            worker_counts.append(workers)
+            workers *= 2
+        worker_counts.append(options["max_workers"])
+
+        self.stdout.write(f"{len(national_ids)} IDs, mode={options['mode']}, shard size={options['shard_size']}")
+        self.stdout.write(f"{'workers':>8} {'seconds':>9} {'IDs/s':>12} {'speedup':>8} {'efficiency':>10}")
+
+        baseline = None
+        with pin_reference_date():
+            for workers in worker_counts:
+                with ShardedExecutor(workers=workers, shard_size=options["shard_size"]) as executor:
+                    # Start the workers before timing so process startup is not counted
+                    list(executor.imap(options["mode"], (([national_ids[0]], None) for _ in range(workers))))
+
+                    elapsed = float("inf")
+                    for _ in range(options["repeat"]):
+                        started_at = time.perf_counter()
+                        executor.map(options["mode"], national_ids)
+                        elapsed = min(elapsed, time.perf_counter() - started_at)
+
+                throughput = len(national_ids) / elapsed
+                baseline = baseline or throughput
+                speedup = throughput / baseline
+                self.stdout.write(
+                    f"{workers:>8} {elapsed:>9.3f} {throughput:>12,.0f} {speedup:>7.2f}x {speedup / workers:>9.0%}"
+                )
@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from national_id.constants.constants import VALIDATION_REASONS
+from national_id.helpers.dates import pin_reference_date
+from national_id.helpers.vectorized import pack_validity_bitmap, validate_fixed_width_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Validates a fixed width file of national IDs (14 digits and a line ending per record) through a memory map, "
+        "writing one reason code per record to a .npy file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Fixed width file of national IDs")
+        parser.add_argument("output", help=".npy file to write the uint8 reason codes to")
+        parser.add_argument("--crlf", action="store_true", help="Records end with \\r\\n instead of \\n")
+        parser.add_argument("--chunk-records", type=int, default=1 << 20, help="Records validated at a time")
+        parser.add_argument("--bitmap", help="Also write a packed validity bitmap (one bit per record) to this file")
+
+    def handle(self, *args, **options):
+        started_at = time.perf_counter()
+
+        with pin_reference_date():
+            reasons = validate_fixed_width_file(
+                options["input"],
+                record_length=16 if options["crlf"] else 15,
+                chunk_records=options["chunk_records"],
+                output_path=options["output"],
+            )
+
+        if options["bitmap"]:
+            with open(options["bitmap"], "wb") as bitmap_file:
+                for start in range(0, len(reasons), options["chunk_records"] * 8):
+                    bitmap_file.write(pack_validity_bitmap(reasons[start:start + options["chunk_records"] * 8]).tobytes())
+
+        elapsed = max(time.perf_counter() - started_at, 1e-9)
+        self.stdout.write(f"{len(reasons)} records in {elapsed:.2f}s ({len(reasons) / elapsed:,.0f} records/s)")
+
+        counts = np.bincount(reasons, minlength=len(VALIDATION_REASONS))
+        for code, count in enumerate(counts):
+            if count:
+                self.stdout.write(f"  {VALIDATION_REASONS[code]}: {count}")
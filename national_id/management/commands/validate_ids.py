@@ -0,0 +1,132 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from national_id.helpers.bulk_io import (
+    EXTRACT_MODE,
+    FORMATS,
+    MODES,
+    VALIDATE_MODE,
+    detect_format,
+    format_rows,
+    read_national_id_chunks,
+    result_rows,
+)
+from national_id.helpers.dates import pin_reference_date
+from national_id.helpers.parallel import ShardedExecutor
+from national_id.services.national_id_service import NationalIdService
+
+
+class Command(BaseCommand):
+    help = (
+        "Validates or extracts data from a CSV/JSONL file of national IDs, streaming results to an output file. "
+        "Progress is checkpointed after every chunk so an interrupted run can be resumed with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="CSV file with a header row, or JSONL file of national IDs")
+        parser.add_argument("output", help="File to write one result per national ID to")
+        parser.add_argument("--mode", choices=MODES, default=VALIDATE_MODE)
+        parser.add_argument("--input-format", choices=FORMATS, help="Defaults to the input file extension")
+        parser.add_argument("--output-format", choices=FORMATS, help="Defaults to the output file extension")
+        parser.add_argument("--column", default="national_id", help="CSV column holding the national IDs")
+        parser.add_argument("--chunk-size", type=int, default=10_000, help="IDs per chunk, also the shard size with --workers")
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes, 1 processes chunks in this process")
+        parser.add_argument("--checkpoint", help="Checkpoint file, defaults to <output>.checkpoint")
+        parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint of an interrupted run")
+        parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress reports")
+
+    def handle(self, *args, **options):
+        input_path = options["input"]
+        output_path = options["output"]
+        mode = options["mode"]
+        input_format = options["input_format"] or detect_format(input_path)
+        output_format = options["output_format"] or detect_format(output_path)
+        checkpoint_path = options["checkpoint"] or f"{output_path}.checkpoint"
+
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        checkpoint = {"input_offset": 0, "output_offset": 0, "processed": 0}
+        if options["resume"]:
+            if not os.path.exists(checkpoint_path):
+                raise CommandError(f"No checkpoint found at {checkpoint_path}")
+            with open(checkpoint_path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            if checkpoint.get("input") != os.path.abspath(input_path) or checkpoint.get("mode") != mode:
+                raise CommandError("The checkpoint belongs to a different input file or mode")
+
+        input_size = os.path.getsize(input_path)
+        processed = checkpoint["processed"]
+        started_at = last_report = time.monotonic()
+        started_with = processed
+
+        with open(input_path, "rb") as input_file, open(output_path, "r+b" if options["resume"] else "wb") as output_file:
+            # Drop anything written after the last checkpoint
+            output_file.truncate(checkpoint["output_offset"])
+            output_file.seek(checkpoint["output_offset"])
+
+            chunks = read_national_id_chunks(
+                input_file,
+                input_format,
+                options["chunk_size"],
+                column=options["column"],
+                start_offset=checkpoint["input_offset"],
+            )
+
+            with pin_reference_date(), ShardedExecutor(workers=options["workers"]) as executor:
+                if options["workers"] > 1:
+                    processed_chunks = executor.imap(mode, chunks)
+                else:
+                    processed_chunks = (
+                        (national_ids, input_offset, self._process(mode, national_ids))
+                        for national_ids, input_offset in chunks
+                    )
+
+                for national_ids, input_offset, results in processed_chunks:
+                    rows = result_rows(mode, national_ids, results)
+                    output_file.write(format_rows(rows, mode, output_format, include_header=output_file.tell() == 0))
+                    output_file.flush()
+                    os.fsync(output_file.fileno())
+
+                    processed += len(national_ids)
+                    self._write_checkpoint(checkpoint_path, {
+                        "input": os.path.abspath(input_path),
+                        "mode": mode,
+                        "input_offset": input_offset,
+                        "output_offset": output_file.tell(),
+                        "processed": processed,
+                    })
+
+                    now = time.monotonic()
+                    if now - last_report >= options["progress_interval"]:
+                        last_report = now
+                        self._report(processed, started_with, started_at, input_offset, input_size)
+
+        self._report(processed, started_with, started_at, input_size, input_size)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {processed} results to {output_path}"))
+
+    def _process(self, mode: str, national_ids: list[str]) -> list:
+        if mode == EXTRACT_MODE:
+            return NationalIdService.extract_many(national_ids)
+        return NationalIdService.validate_many(national_ids)
+
+    def _write_checkpoint(self, checkpoint_path: str, checkpoint: dict):
+        temporary_path = f"{checkpoint_path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temporary_path, checkpoint_path)
+
+    def _report(self, processed: int, started_with: int, started_at: float, input_offset: int, input_size: int):
+        elapsed = max(time.monotonic() - started_at, 1e-9)
+        percent = 100 * input_offset / input_size if input_size else 100
+        self.stdout.write(
+            f"{processed} IDs processed ({percent:.1f}% of input), "
+            f"{(processed - started_with) / elapsed:,.0f} IDs/s"
+        )
@@ -1,16 +1,26 @@
 from rest_framework import serializers
 
+from national_id.constants.constants import MAX_BATCH_SIZE
+from national_id.helpers.format import validate_national_id_format
+
 class NationalIdSerializer(serializers.Serializer):
     national_id = serializers.CharField()
 
     def validate_national_id(self, value: str) -> str:
-        if not value.isdigit():
-            raise serializers.ValidationError("National ID must contain digits only.")
+        format_error = validate_national_id_format(value)
+        if format_error:
+            raise serializers.ValidationError(format_error)
 
-        if len(value) != 14:
-            raise serializers.ValidationError("National ID must be exactly 14 digits long.")
-            
-        if not value.startswith(("2", "3")):
-            raise serializers.ValidationError("National ID must start with 2 or 3.")
-            
         return value
+
+class NationalIdBatchSerializer(serializers.Serializer):
+    """
+    Serializer for batch requests.
+    Individual IDs are not format checked here so that a single malformed ID
+    is reported in its own result instead of rejecting the whole batch.
+    """
+    national_ids = serializers.ListField(
+        child=serializers.CharField(allow_blank=True),
+        allow_empty=False,
+        max_length=MAX_BATCH_SIZE,
+    )
@@ -1,11 +1,56 @@
-from datetime import datetime
-from logging import Logger
-from national_id.constants.constants import GOVERNORATE_NAME_BY_CODE
-from national_id.helpers.check_sum import validate_check_sum
-from national_id.helpers.dates import calculate_age
+import logging
+from datetime import date
+
+import numpy as np
+
+from core.helpers.lru_cache import DayScopedLRUCache
+from national_id.constants.constants import (
+    REASON_REVOKED,
+    REASON_VALID,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_MAX_ENTRIES,
+    VALIDATION_REASONS,
+)
+from national_id.helpers.columnar import ExtractedColumns, extract_columns
+from national_id.helpers.dates import calculate_age, get_reference_date
+from national_id.helpers.format import validate_national_id_format
+from national_id.helpers.parser import parse_national_id
+from national_id.helpers.revoked_registry import get_revoked_registry
+from national_id.helpers.vectorized import validate_national_ids
+
+logger = logging.getLogger(__name__)
+
+REVOKED_REASON = VALIDATION_REASONS[REASON_REVOKED]
 
 
 class NationalIdService():
+    # Results of the single ID methods. Ages and the future birth date check depend on
+    # the current date, so entries are dropped when the day changes.
+    # Revocation is checked after the cache, so a reloaded registry applies to cached results too.
+    result_cache = DayScopedLRUCache(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES, today=get_reference_date)
+
+    @staticmethod
+    def is_revoked(national_id: str) -> bool:
+        """
+        Checks a national ID that passed validation against the revoked ID registry.
+
+        Args:
+            national_id (str): The national ID to check.
+
+        Returns:
+            bool: True if the national ID is revoked, False if it is not or no registry is configured.
+        """
+        registry = get_revoked_registry()
+        return registry is not None and registry.contains(national_id)
+
+    @staticmethod
+    def _revoked_mask(national_ids, is_valid: np.ndarray) -> np.ndarray:
+        revoked = np.zeros(len(is_valid), dtype=bool)
+        registry = get_revoked_registry()
+        if registry is not None and is_valid.any():
+            revoked[is_valid] = registry.contains_many(np.asarray(national_ids, dtype=np.str_)[is_valid])
+        return revoked
+
     @staticmethod
     def validate_national_id(national_id: str) -> tuple[bool, str]:
         """
@@ -18,33 +63,21 @@ class NationalIdService():
             tuple[bool, str]: A tuple containing a boolean indicating whether the national ID is valid and a string describing the 
             reason for invalidity if the national ID is invalid.
         """
-
-        try:
-            governorate_code = national_id[7:9]
-            if governorate_code not in GOVERNORATE_NAME_BY_CODE:
-                return False, "Invalid governorate code"
-
-            century = "19" if national_id[0] == "2" else "20"
-            year = int(century + national_id[1:3])
-            month = int(national_id[3:5])
-            day = int(national_id[5:7])
-            
-            now = datetime.now()
+        cache_key = ("validate", national_id)
+        result = NationalIdService.result_cache.get(cache_key)
+        if result is None:
             try:
-                birth_date = datetime(year, month, day)
-                if birth_date > now:
-                    return False, "Birth date is in the future"
-            except ValueError:
-                return False, "Invalid birth date"
+                parsed = parse_national_id(national_id)
+                result = parsed.is_valid, parsed.reason
+            except Exception as e:
+                logger.error(f"[NationalIdService][validate_national_id] Unexpected error: {e}")
+                return False, "Unexpected error"
 
-            isValid = validate_check_sum(national_id)
-            if not isValid:
-                return False, "Invalid check digit"
+            NationalIdService.result_cache.set(cache_key, result)
 
-            return True, "valid"
-        except Exception as e:
-            Logger.error(f"[NationalIdService][validate_national_id] Unexpected error: {e}")
-            return False, "Unexpected error"
+        if result[0] and NationalIdService.is_revoked(national_id):
+            return False, REVOKED_REASON
+        return result
 
     @staticmethod
     def extract_data_from_national_id(national_id: str) -> dict:
@@ -55,37 +88,126 @@ class NationalIdService():
             national_id (str): The national ID to extract data from.
 
         Returns:
-            tuple[dict, str]: A tuple containing a dictionary of extracted data and a string describing the reason for invalidity if the national ID is invalid.
+            dict: The extracted data, or is_valid_national_id and reason if the national ID is invalid.
         """
-        try:    
-            isValidNationalId = NationalIdService.validate_national_id(national_id)
-            if not isValidNationalId[0]:
+        cache_key = ("extract", national_id)
+        result = NationalIdService.result_cache.get(cache_key)
+        if result is None:
+            result = NationalIdService._extract_data(national_id, get_reference_date())
+            if result.get("reason") != "Unexpected error":
+                NationalIdService.result_cache.set(cache_key, result)
+
+        if "reason" not in result and NationalIdService.is_revoked(national_id):
+            return {
+                "is_valid_national_id": False,
+                "reason": REVOKED_REASON
+            }
+
+        # Callers own the returned dict, the cached one must not be mutated
+        return dict(result)
+
+    @staticmethod
+    def _extract_data(national_id: str, today: date) -> dict:
+        try:
+            parsed = parse_national_id(national_id, today)
+            if not parsed.is_valid:
                 return {
                     "is_valid_national_id": False,
-                    "reason": isValidNationalId[1]
+                    "reason": parsed.reason
                 }
 
-            governorate_code = national_id[7:9]
-            governorate_name = GOVERNORATE_NAME_BY_CODE[governorate_code]
-
-            century = "19" if national_id[0] == "2" else "20"
-            year = int(century + national_id[1:3])
-            month = int(national_id[3:5])
-            day = int(national_id[5:7])
-            birth_date = datetime(year, month, day)
+            birth_date = parsed.birth_date
 
-            ageDetails = calculate_age(birth_date)
+            ageDetails = calculate_age(birth_date, today)
             parsedAge = f"{ageDetails[0]} years, {ageDetails[1]} months, {ageDetails[2]} days"
 
-            gender = "Male" if int(national_id[12]) % 2 == 1 else "Female"
-
             return {
-                "birth_governorate_name": governorate_name,
+                "birth_governorate_name": parsed.governorate_name,
                 "birth_date": birth_date,
                 "age": parsedAge,
-                "gender": gender
+                "gender": parsed.gender
             }
         except Exception as e:
-            print(e)
-            Logger.error(f"[NationalIdService][extract_data_from_national_id] Unexpected error: {e}")
-            return False, "Unexpected error"
\ No newline at end of file
+            logger.error(f"[NationalIdService][extract_data_from_national_id] Unexpected error: {e}")
+            return {
+                "is_valid_national_id": False,
+                "reason": "Unexpected error"
+            }
+
+    @staticmethod
+    def validate_many(national_ids: list[str], today: date | None = None) -> list[tuple[bool, str]]:
+        """
+        Validates a batch of national IDs.
+
+        Args:
+            national_ids (list[str]): The national IDs to be validated. They are not expected to be format checked.
+            today (date, optional): The date to validate against. Defaults to the reference date.
+
+        Returns:
+            list[tuple[bool, str]]: One (is_valid, reason) tuple per national ID, in input order.
+        """
+        is_valid, reasons = validate_national_ids(national_ids, today or get_reference_date())
+
+        revoked = NationalIdService._revoked_mask(national_ids, is_valid)
+        is_valid &= ~revoked
+        reasons[revoked] = REASON_REVOKED
+
+        return [
+            (valid, VALIDATION_REASONS[reason])
+            for valid, reason in zip(is_valid.tolist(), reasons.tolist())
+        ]
+
+    @staticmethod
+    def extract_many(national_ids: list[str], today: date | None = None) -> list[dict]:
+        """
+        Extracts data from a batch of national IDs.
+
+        Args:
+            national_ids (list[str]): The national IDs to extract data from. They are not expected to be format checked.
+            today (date, optional): The date to validate and calculate ages against. Defaults to the reference date.
+
+        Returns:
+            list[dict]: One result per national ID, in input order, shaped like extract_data_from_national_id's result.
+        """
+        # Bulk jobs bypass result_cache, one-off IDs would only evict the frequently re-checked ones
+        today = today or get_reference_date()
+        registry = get_revoked_registry()
+        results = []
+        for national_id in national_ids:
+            format_error = validate_national_id_format(national_id)
+            if format_error:
+                results.append({
+                    "is_valid_national_id": False,
+                    "reason": format_error
+                })
+                continue
+
+            result = NationalIdService._extract_data(national_id, today)
+            if registry is not None and "reason" not in result and registry.contains(national_id):
+                result = {
+                    "is_valid_national_id": False,
+                    "reason": REVOKED_REASON
+                }
+            results.append(result)
+
+        return results
+
+    @staticmethod
+    def extract_columns(national_ids, today: date | None = None) -> ExtractedColumns:
+        """
+        Extracts data from many national IDs as columns instead of one dict per ID.
+        Suited to analytics and exports, see ExtractedColumns for the layout and exporters.
+
+        Args:
+            national_ids: A sequence or array of national IDs, not expected to be format checked.
+            today (date, optional): The date to validate and calculate ages against. Defaults to the reference date.
+
+        Returns:
+            ExtractedColumns: One entry per national ID, in input order.
+        """
+        columns = extract_columns(national_ids, today)
+
+        revoked = NationalIdService._revoked_mask(columns.national_id, columns.reason_code == REASON_VALID)
+        if revoked.any():
+            columns.invalidate(revoked, REASON_REVOKED)
+        return columns
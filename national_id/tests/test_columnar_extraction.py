@@ -0,0 +1,50 @@
+import io
+import os
+import tempfile
+from datetime import date
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from national_id.services.national_id_service import NationalIdService
+
+NATIONAL_IDS = ["29501012101234", "29501012101235", "123", "30106151204560", "٢٩٥٠١٠١٢١٠١٢٣٤"]
+TODAY = date(2024, 6, 1)
+
+class ExtractColumnsTests(SimpleTestCase):
+    def test_columns_match_extract_many(self):
+        """
+        Ensure every column agrees with the per ID dict results.
+        """
+        columns = NationalIdService.extract_columns(NATIONAL_IDS, TODAY)
+        expected = NationalIdService.extract_many(NATIONAL_IDS, TODAY)
+
+        self.assertEqual(columns.is_valid.tolist(), ["reason" not in result for result in expected])
+        for index, result in enumerate(expected):
+            if "reason" in result:
+                self.assertTrue(np.isnat(columns.birth_date[index]))
+                continue
+            self.assertEqual(columns.birth_date[index].astype(object), result["birth_date"].date())
+            self.assertEqual(columns.governorate_name()[index], result["birth_governorate_name"])
+            self.assertEqual("Male" if columns.is_male[index] else "Female", result["gender"])
+            age = f"{columns.age_years[index]} years, {columns.age_months[index]} months, {columns.age_days[index]} days"
+            self.assertEqual(age, result["age"])
+
+    def test_exporters(self):
+        """
+        Ensure CSV and NPZ exports hold one row per ID.
+        """
+        columns = NationalIdService.extract_columns(NATIONAL_IDS, TODAY)
+
+        csv_file = io.StringIO()
+        columns.to_csv(csv_file)
+        lines = csv_file.getvalue().splitlines()
+        self.assertEqual(len(lines), len(NATIONAL_IDS) + 1)
+        self.assertEqual(lines[1], "29501012101234,True,,Giza,1995-01-01,Male,29,5,0")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "columns.npz")
+            columns.to_npz(path)
+            with np.load(path) as archive:
+                self.assertEqual(archive["reason_code"].tolist(), columns.reason_code.tolist())
+                self.assertEqual(archive["governorate_names"][21], "Giza")
@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from national_id.helpers.dates import calculate_age, get_reference_date, pin_reference_date
+from national_id.services.national_id_service import NationalIdService
+
+class CalculateAgeTests(SimpleTestCase):
+    def test_age_borrows_days_from_previous_month(self):
+        """
+        Ensure the age borrows the length of the month before the reference date.
+        """
+        self.assertEqual(calculate_age(date(1995, 2, 20), date(2024, 3, 10)), (29, 0, 19))
+
+    def test_age_in_january(self):
+        """
+        Ensure borrowing from December works for January reference dates.
+        """
+        self.assertEqual(calculate_age(date(1995, 1, 20), date(2026, 1, 10)), (30, 11, 21))
+
+    def test_pinned_reference_date_is_used_by_the_service(self):
+        """
+        Ensure the service computes ages and future checks against the pinned date.
+        """
+        with pin_reference_date(date(2024, 1, 1)):
+            self.assertEqual(get_reference_date(), date(2024, 1, 1))
+            result = NationalIdService.extract_data_from_national_id("29501012101234")
+            self.assertEqual(result["age"], "29 years, 0 months, 0 days")
+
+        with pin_reference_date(date(1990, 1, 1)):
+            result = NationalIdService.extract_data_from_national_id("29501012101234")
+            self.assertEqual(result["reason"], "Birth date is in the future")
@@ -0,0 +1,39 @@
+from datetime import date
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from national_id.helpers.demographics import DemographicsAggregate
+
+NATIONAL_IDS = ["29501012101234", "29501012101235", "30106151204560", "123"]
+TODAY = date(2024, 6, 1)
+
+class DemographicsAggregateTests(SimpleTestCase):
+    def test_counts_by_dimension(self):
+        """
+        Ensure valid IDs are counted per dimension and invalid ones per reason.
+        """
+        summary = DemographicsAggregate().add(NATIONAL_IDS, TODAY).to_dict()
+
+        self.assertEqual(summary["total"], 4)
+        self.assertEqual(summary["valid"], 2)
+        self.assertEqual(summary["invalid_by_reason"], {
+            "Invalid check digit": 1,
+            "National ID must be exactly 14 digits long.": 1,
+        })
+        self.assertEqual(summary["by_governorate"], {"Giza": 1, "Dakahlia": 1})
+        self.assertEqual(summary["by_gender"], {"Female": 1, "Male": 1})
+        self.assertEqual(summary["by_birth_decade"], {"1990s": 1, "2000s": 1})
+        self.assertEqual(summary["by_governorate_gender_age_bucket"]["Giza"], {"Male": {"25-34": 1}})
+
+    def test_merged_shards_match_a_single_pass(self):
+        """
+        Ensure aggregates of separate shards merge into the single pass result.
+        """
+        single = DemographicsAggregate().add(NATIONAL_IDS, TODAY)
+        merged = DemographicsAggregate().add(NATIONAL_IDS[:1], TODAY).merge(
+            DemographicsAggregate().add(NATIONAL_IDS[1:], TODAY)
+        )
+
+        self.assertTrue(np.array_equal(single.counts, merged.counts))
+        self.assertEqual(single.to_dict(), merged.to_dict())
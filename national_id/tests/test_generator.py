@@ -0,0 +1,67 @@
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from national_id.constants.constants import REASON_VALID
+from national_id.helpers.generator import NationalIdGenerator
+from national_id.helpers.vectorized import validate_fixed_width_file, validate_national_ids
+from national_id.services.national_id_service import NationalIdService
+
+TODAY = date(2024, 6, 1)
+ERROR_MIX = {"bad_checksum": 0.1, "invalid_date": 0.1, "invalid_governorate": 0.1, "future_birth_date": 0.1}
+
+class NationalIdGeneratorTests(SimpleTestCase):
+    def test_expected_reasons_match_the_validator(self):
+        """
+        Ensure every generated ID fails exactly the check its kind describes.
+        """
+        national_ids, expected_reasons = NationalIdGenerator(seed=3, error_mix=ERROR_MIX, today=TODAY).generate(20_000)
+
+        _, reasons = validate_national_ids(national_ids, TODAY)
+
+        self.assertTrue(np.array_equal(reasons, expected_reasons))
+        self.assertEqual(len(np.unique(expected_reasons)), 5)
+        self.assertEqual(
+            [result[0] for result in NationalIdService.validate_many(national_ids[:200].tolist(), TODAY)],
+            (expected_reasons[:200] == REASON_VALID).tolist(),
+        )
+
+    def test_seed_and_distributions(self):
+        """
+        Ensure the same seed reproduces the same IDs and the configured distributions are respected.
+        """
+        options = {"seed": 5, "governorate_weights": {"21": 1}, "age_weights": [0] * 30 + [1], "today": TODAY}
+        first, _ = NationalIdGenerator(**options).generate(1_000)
+        second, _ = NationalIdGenerator(**options).generate(1_000)
+
+        self.assertTrue(np.array_equal(first, second))
+        self.assertTrue(all(national_id[7:9] == "21" for national_id in first))
+        self.assertTrue(all(national_id[1:3] in ("93", "94") for national_id in first))
+
+    def test_unknown_governorate_weight_is_rejected(self):
+        """
+        Ensure governorate codes the validator does not accept cannot be weighted.
+        """
+        with self.assertRaises(ValueError):
+            NationalIdGenerator(governorate_weights={"99": 1})
+
+    def test_command_writes_fixed_width_file(self):
+        """
+        Ensure the command output validates to the expected reason codes.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output_path = os.path.join(directory.name, "ids.txt")
+        expected_path = os.path.join(directory.name, "expected.npy")
+
+        call_command(
+            "generate_ids", output_path, count=5_000, format="fixed", seed=1, chunk_size=1_000,
+            error_mix="bad_checksum=0.2,invalid_date=0.2", expected=expected_path, stdout=StringIO(),
+        )
+
+        self.assertTrue(np.array_equal(validate_fixed_width_file(output_path), np.load(expected_path)))
@@ -0,0 +1,69 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.models import ApiKey, ApiKeyUsage
+
+VALID_NATIONAL_ID = "29501012101234"
+BAD_CHECK_DIGIT_NATIONAL_ID = "29501012101235"
+
+class NationalIdBatchTests(APITestCase):
+    def test_validate_batch(self):
+        """
+        Ensure every ID gets its own result, in input order.
+        """
+        url = "/api/national-id/validate-batch"
+        national_ids = [VALID_NATIONAL_ID, BAD_CHECK_DIGIT_NATIONAL_ID, "12345"]
+        response = self.client.post(url, format="json", data={"national_ids": national_ids})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+
+        results = response.data["results"]
+        self.assertEqual([result["national_id"] for result in results], national_ids)
+        self.assertTrue(results[0]["is_valid_national_id"])
+        self.assertEqual(results[1]["reason"], "Invalid check digit")
+        self.assertEqual(results[2]["reason"], "National ID must be exactly 14 digits long.")
+
+    def test_extract_data_batch(self):
+        """
+        Ensure data is extracted for valid IDs and a reason is given for invalid ones.
+        """
+        url = "/api/national-id/extract-data-batch"
+        national_ids = [VALID_NATIONAL_ID, BAD_CHECK_DIGIT_NATIONAL_ID]
+        response = self.client.post(url, format="json", data={"national_ids": national_ids})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.data["results"]
+        self.assertEqual(results[0]["birth_governorate_name"], "Giza")
+        self.assertEqual(results[0]["gender"], "Male")
+        self.assertFalse(results[1]["is_valid_national_id"])
+
+    def test_batch_usage_is_tracked_once(self):
+        """
+        Ensure a batch is recorded as a single usage carrying the number of IDs.
+        """
+        url = "/api/national-id/validate-batch"
+        api_key = generate_api_key()
+        ApiKey.objects.create(key_hash=hash_api_key(api_key))
+
+        response = self.client.post(
+            url,
+            format="json",
+            data={"national_ids": [VALID_NATIONAL_ID] * 5},
+            HTTP_X_API_KEY=api_key,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(ApiKeyUsage.objects.count(), 1)
+        self.assertEqual(ApiKeyUsage.objects.get().item_count, 5)
+
+    def test_empty_batch_is_rejected(self):
+        """
+        Ensure an empty batch is a bad request.
+        """
+        url = "/api/national-id/validate-batch"
+        response = self.client.post(url, format="json", data={"national_ids": []})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
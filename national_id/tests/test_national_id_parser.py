@@ -0,0 +1,37 @@
+from datetime import date, datetime
+
+from django.test import SimpleTestCase
+
+from national_id.helpers.parser import parse_national_id
+
+class ParseNationalIdTests(SimpleTestCase):
+    def test_parse_valid_national_id(self):
+        """
+        Ensure a valid ID is decoded in one pass.
+        """
+        parsed = parse_national_id("29501012101234", today=date(2024, 1, 1))
+
+        self.assertTrue(parsed.is_valid)
+        self.assertEqual(parsed.reason, "valid")
+        self.assertEqual(parsed.birth_date, datetime(1995, 1, 1))
+        self.assertEqual(parsed.governorate_name, "Giza")
+        self.assertEqual(parsed.gender, "Male")
+
+    def test_parse_reports_first_failed_check(self):
+        """
+        Ensure the reason matches the service's check order.
+        """
+        self.assertEqual(parse_national_id("29502302101234").reason, "Invalid birth date")
+        self.assertEqual(parse_national_id("29502304001234").reason, "Invalid governorate code")
+        self.assertEqual(
+            parse_national_id("30101012101234", today=date(2000, 1, 1)).reason,
+            "Birth date is in the future",
+        )
+        self.assertEqual(parse_national_id("29501012101235").reason, "Invalid check digit")
+
+    def test_parse_leap_day(self):
+        """
+        Ensure February 29th is only accepted in leap years.
+        """
+        self.assertNotEqual(parse_national_id("30002292101234").reason, "Invalid birth date")
+        self.assertEqual(parse_national_id("20002292101234").reason, "Invalid birth date")
@@ -0,0 +1,69 @@
+import json
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from api_keys.helpers.key_generator import generate_api_key, hash_api_key
+from api_keys.models import ApiKey, ApiKeyUsage
+from national_id.constants.constants import MAX_STREAM_LINE_BYTES
+
+class NationalIdStreamTests(APITestCase):
+    def test_validate_stream(self):
+        """
+        Ensure every NDJSON line gets one result line, in input order.
+        """
+        url = "/api/national-id/validate-stream"
+        body = '"29501012101234"\n{"national_id": "29501012101235"}\n\nnot json\n'
+        response = self.client.post(url, data=body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        results = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([result["national_id"] for result in results], ["29501012101234", "29501012101235", "not json"])
+        self.assertTrue(results[0]["is_valid_national_id"])
+        self.assertEqual(results[1]["reason"], "Invalid check digit")
+        self.assertEqual(results[2]["reason"], "National ID must contain digits only.")
+
+    def test_overlong_lines_are_reported_invalid(self):
+        """
+        Ensure a line longer than MAX_STREAM_LINE_BYTES gets an invalid result and the lines after it are still read.
+        """
+        url = "/api/national-id/validate-stream"
+        body = '"29501012101234"\n' + "9" * (MAX_STREAM_LINE_BYTES * 3) + '\n"29501012101234"\n'
+        response = self.client.post(url, data=body, content_type="application/x-ndjson")
+
+        results = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([result["is_valid_national_id"] for result in results], [True, False, True])
+        self.assertEqual(results[1]["reason"], f"Line is longer than {MAX_STREAM_LINE_BYTES} bytes.")
+
+    def test_usage_counts_the_streamed_ids(self):
+        """
+        Ensure a stream is recorded as a single usage carrying the number of IDs, once the response is consumed.
+        """
+        api_key = generate_api_key()
+        ApiKey.objects.create(key_hash=hash_api_key(api_key))
+
+        response = self.client.post(
+            "/api/national-id/validate-stream",
+            data='"29501012101234"\n' * 3,
+            content_type="application/x-ndjson",
+            HTTP_X_API_KEY=api_key,
+        )
+        self.assertEqual(ApiKeyUsage.objects.count(), 0)
+        b"".join(response.streaming_content)
+
+        self.assertEqual(ApiKeyUsage.objects.get().item_count, 3)
+
+    def test_unknown_keys_are_rejected_before_streaming(self):
+        """
+        Ensure a stream sent with an unknown API key is rejected.
+        """
+        response = self.client.post(
+            "/api/national-id/validate-stream",
+            data='"29501012101234"\n',
+            content_type="application/x-ndjson",
+            HTTP_X_API_KEY=generate_api_key(),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from core.helpers.lru_cache import DayScopedLRUCache
+from national_id.services.national_id_service import NationalIdService
+
+class DayScopedLRUCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        Ensure the cache stays within max_entries by evicting the oldest entry.
+        """
+        cache = DayScopedLRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_entries_are_dropped_when_the_day_changes(self):
+        """
+        Ensure entries do not outlive the day they were stored on.
+        """
+        today = [date(2024, 1, 1)]
+        cache = DayScopedLRUCache(max_entries=10, today=lambda: today[0])
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+        today[0] = date(2024, 1, 2)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["day_rollovers"], 1)
+
+class NationalIdServiceCacheTests(SimpleTestCase):
+    def test_extraction_result_is_cached_and_copied(self):
+        """
+        Ensure repeated extractions hit the cache and callers get their own dict.
+        """
+        NationalIdService.result_cache.clear()
+        hits = NationalIdService.result_cache.hits
+
+        first = NationalIdService.extract_data_from_national_id("29501012101234")
+        first["gender"] = "changed"
+        second = NationalIdService.extract_data_from_national_id("29501012101234")
+
+        self.assertEqual(second["gender"], "Male")
+        self.assertEqual(NationalIdService.result_cache.hits, hits + 1)
@@ -0,0 +1,82 @@
+import os
+import random
+import tempfile
+from datetime import date
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from national_id.helpers.revoked_registry import RevokedIdRegistry, national_ids_to_integers, write_registry
+from national_id.services.national_id_service import NationalIdService
+
+REVOKED_ID = "29501012101234"
+VALID_ID = "30106151204560"
+TODAY = date(2024, 6, 1)
+
+class RevokedIdRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "revoked.bin")
+
+    def test_lookups_match_the_written_set(self):
+        """
+        Ensure scalar and vectorized lookups report exactly the written IDs.
+        """
+        rng = random.Random(12)
+        revoked = [f"{rng.randrange(2 * 10 ** 13, 4 * 10 ** 13)}" for _ in range(5_000)]
+        others = [f"{rng.randrange(2 * 10 ** 13, 4 * 10 ** 13)}" for _ in range(5_000)]
+        others = [national_id for national_id in others if national_id not in set(revoked)]
+        write_registry(national_ids_to_integers(revoked), self.path)
+
+        registry = RevokedIdRegistry(self.path)
+
+        self.assertEqual(len(registry), len(set(revoked)))
+        self.assertTrue(registry.contains_many(revoked).all())
+        self.assertFalse(registry.contains_many(others).any())
+        self.assertTrue(all(registry.contains(national_id) for national_id in revoked[:100]))
+        self.assertFalse(any(registry.contains(national_id) for national_id in others[:100]))
+
+    def test_rewritten_file_is_reloaded(self):
+        """
+        Ensure a registry file replaced on disk is picked up without recreating the registry.
+        """
+        write_registry(np.zeros(0, dtype=np.uint64), self.path)
+        registry = RevokedIdRegistry(self.path, reload_interval=0)
+        self.assertFalse(registry.contains(REVOKED_ID))
+
+        write_registry(national_ids_to_integers([REVOKED_ID]), self.path)
+
+        self.assertTrue(registry.contains(REVOKED_ID))
+        self.assertEqual(registry.reloads, 2)
+
+    def test_registry_file_is_readable_by_other_users(self):
+        """
+        Ensure the written file is world readable, since workers may run as a different user than the command.
+        """
+        write_registry(national_ids_to_integers([REVOKED_ID]), self.path)
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+
+    def test_service_rejects_revoked_ids(self):
+        """
+        Ensure the single and batch service methods report revoked IDs as invalid, even when already cached.
+        """
+        NationalIdService.result_cache.clear()
+        self.assertEqual(NationalIdService.validate_national_id(REVOKED_ID), (True, "valid"))
+
+        write_registry(national_ids_to_integers([REVOKED_ID]), self.path)
+        registry = RevokedIdRegistry(self.path)
+        with mock.patch("national_id.services.national_id_service.get_revoked_registry", return_value=registry):
+            revoked = (False, "National ID is revoked")
+            self.assertEqual(NationalIdService.validate_national_id(REVOKED_ID), revoked)
+            self.assertEqual(NationalIdService.validate_many([REVOKED_ID, VALID_ID], TODAY), [revoked, (True, "valid")])
+            self.assertEqual(
+                NationalIdService.extract_data_from_national_id(REVOKED_ID),
+                {"is_valid_national_id": False, "reason": "National ID is revoked"},
+            )
+
+            columns = NationalIdService.extract_columns([REVOKED_ID, VALID_ID], TODAY)
+            self.assertEqual(columns.is_valid.tolist(), [False, True])
+            self.assertEqual(columns.age_years.tolist()[0], -1)
@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+
+from national_id.helpers.bulk_io import EXTRACT_MODE, VALIDATE_MODE
+from national_id.helpers.parallel import ShardedExecutor
+from national_id.services.national_id_service import NationalIdService
+
+NATIONAL_IDS = ["29501012101234", "29501012101235", "123", "30106151204560"] * 5
+
+class ShardedExecutorTests(SimpleTestCase):
+    def test_results_are_merged_in_input_order(self):
+        """
+        Ensure sharded results match the in-process service results.
+        """
+        with ShardedExecutor(workers=2, shard_size=3) as executor:
+            self.assertEqual(executor.map(VALIDATE_MODE, NATIONAL_IDS), NationalIdService.validate_many(NATIONAL_IDS))
+            self.assertEqual(executor.map(EXTRACT_MODE, NATIONAL_IDS), NationalIdService.extract_many(NATIONAL_IDS))
+
+    def test_failed_shard_does_not_affect_others(self):
+        """
+        Ensure a shard that keeps failing is reported as errors while other shards succeed.
+        """
+        shards = [(["29501012101234"], "ok"), ([None], "broken")]
+        with ShardedExecutor(workers=2, retries=0) as executor:
+            results = {tag: shard_results for _, tag, shard_results in executor.imap(EXTRACT_MODE, shards)}
+
+        self.assertEqual(results["ok"][0]["gender"], "Male")
+        self.assertEqual(results["broken"], [{"is_valid_national_id": False, "reason": "Unexpected error"}])
+        self.assertEqual(executor.failed_shards, 1)
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+class ValidateIdsCommandTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.input_path = os.path.join(self.directory.name, "ids.csv")
+        with open(self.input_path, "w") as input_file:
+            input_file.write("name,national_id\n")
+            input_file.write("a,29501012101234\n")
+            input_file.write("b,29501012101235\n")
+            input_file.write("c,123\n")
+
+    def test_results_are_written_in_input_order(self):
+        """
+        Ensure every input row gets a result line and the checkpoint is removed on completion.
+        """
+        output_path = os.path.join(self.directory.name, "results.jsonl")
+        call_command("validate_ids", self.input_path, output_path, chunk_size=2, stdout=StringIO())
+
+        with open(output_path) as output_file:
+            rows = [json.loads(line) for line in output_file]
+
+        self.assertEqual([row["national_id"] for row in rows], ["29501012101234", "29501012101235", "123"])
+        self.assertEqual([row["is_valid_national_id"] for row in rows], [True, False, False])
+        self.assertFalse(os.path.exists(f"{output_path}.checkpoint"))
+
+    def test_resume_continues_after_checkpoint(self):
+        """
+        Ensure a resumed run only processes rows after the checkpointed offset.
+        """
+        output_path = os.path.join(self.directory.name, "results.jsonl")
+        with open(self.input_path, "rb") as input_file:
+            input_file.readline()
+            first_row_end = len(input_file.readline()) + len(b"name,national_id\n")
+
+        first_result = json.dumps({"national_id": "29501012101234", "is_valid_national_id": True, "reason": None}) + "\n"
+        with open(output_path, "w") as output_file:
+            output_file.write(first_result + "partial line written before the interruption")
+        with open(f"{output_path}.checkpoint", "w") as checkpoint_file:
+            json.dump({
+                "input": os.path.abspath(self.input_path),
+                "mode": "validate",
+                "input_offset": first_row_end,
+                "output_offset": len(first_result),
+                "processed": 1,
+            }, checkpoint_file)
+
+        call_command("validate_ids", self.input_path, output_path, resume=True, stdout=StringIO())
+
+        with open(output_path) as output_file:
+            rows = [json.loads(line) for line in output_file]
+
+        self.assertEqual([row["national_id"] for row in rows], ["29501012101234", "29501012101235", "123"])
+
+    def test_rows_that_are_not_utf8_are_reported_invalid(self):
+        """
+        Ensure a row with undecodable bytes is reported invalid and the rows after it are still validated.
+        """
+        with open(self.input_path, "wb") as input_file:
+            input_file.write(b"name,national_id\na,2950101210\xff234\nb,29501012101234\n")
+        output_path = os.path.join(self.directory.name, "results.jsonl")
+        call_command("validate_ids", self.input_path, output_path, stdout=StringIO())
+
+        with open(output_path) as output_file:
+            rows = [json.loads(line) for line in output_file]
+
+        self.assertEqual([row["is_valid_national_id"] for row in rows], [False, True])
+        self.assertEqual(rows[1]["national_id"], "29501012101234")
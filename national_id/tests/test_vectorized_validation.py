@@ -0,0 +1,64 @@
+import os
+import random
+import tempfile
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from national_id.constants.constants import VALIDATION_REASONS
+from national_id.helpers.format import validate_national_id_format
+from national_id.helpers.vectorized import pack_validity_bitmap, validate_fixed_width_file, validate_national_ids
+from national_id.services.national_id_service import NationalIdService
+
+def scalar_verdict(national_id: str) -> tuple[bool, str]:
+    format_error = validate_national_id_format(national_id)
+    if format_error:
+        return False, format_error
+    return NationalIdService.validate_national_id(national_id)
+
+class VectorizedValidationTests(SimpleTestCase):
+    def test_matches_scalar_path(self):
+        """
+        Ensure the array engine agrees with the scalar path on random and malformed IDs.
+        """
+        rng = random.Random(1234)
+        national_ids = ["", "12345", "2950101210123x", "295010121012345", "٢٩٥٠١٠١٢١٠١٢٣٤"]
+        for _ in range(5000):
+            national_ids.append(
+                rng.choice("23")
+                + f"{rng.randrange(100):02d}"
+                + f"{rng.randrange(14):02d}"
+                + f"{rng.randrange(32):02d}"
+                + rng.choice(["01", "21", "35", "88", "40", "99"])
+                + f"{rng.randrange(100000):05d}"
+            )
+
+        is_valid, reasons = validate_national_ids(national_ids, today=date.today())
+
+        for national_id, valid, reason in zip(national_ids, is_valid.tolist(), reasons.tolist()):
+            self.assertEqual((valid, VALIDATION_REASONS[reason]), scalar_verdict(national_id), national_id)
+
+    def test_empty_input(self):
+        """
+        Ensure an empty input gives empty outputs.
+        """
+        is_valid, reasons = validate_national_ids([])
+
+        self.assertEqual(is_valid.shape, (0,))
+        self.assertEqual(reasons.shape, (0,))
+
+    def test_fixed_width_file(self):
+        """
+        Ensure memory mapped records get the same reason codes as the string engine.
+        """
+        national_ids = ["29501012101234", "29501012101235", "2950101210123x", "30106151204560"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ids.txt")
+            with open(path, "w") as ids_file:
+                ids_file.write("\n".join(national_ids))
+
+            reasons = validate_fixed_width_file(path, today=date.today(), chunk_records=3)
+
+        _, expected = validate_national_ids(national_ids, today=date.today())
+        self.assertEqual(reasons.tolist(), expected.tolist())
+        self.assertEqual(pack_validity_bitmap(reasons).tolist(), [0b10010000])
@@ -1,9 +1,14 @@
 from django.urls import path
 
+from national_id.views.national_id_batch_views import NationalIdBatchDataExtractionViews, NationalIdBatchValidationViews
 from national_id.views.national_id_data_extraction_views import NationalIdDataExtractionViews
+from national_id.views.national_id_stream_validation_views import NationalIdStreamValidationViews
 from national_id.views.national_id_validation_views import NationalIdValidationViews
 
 urlpatterns = [
     path("validate", NationalIdValidationViews.as_view(), name="validate_national_id"),
     path("extract-data", NationalIdDataExtractionViews.as_view(), name="extract_data_from_national_id"),
-]
\ No newline at end of file
+    path("validate-batch", NationalIdBatchValidationViews.as_view(), name="validate_national_id_batch"),
+    path("extract-data-batch", NationalIdBatchDataExtractionViews.as_view(), name="extract_data_from_national_id_batch"),
+    path("validate-stream", NationalIdStreamValidationViews.as_view(), name="validate_national_id_stream"),
+]
@@ -0,0 +1,57 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from api_keys.decorators.api_key_tracker import track_api_key_usage
+from core.decorators.rate_limiter import rate_limit_by_api_key
+from core.decorators.request_profiler import profile_request
+from core.helpers.metrics import time_stage
+from national_id.serializers.national_id_serializer import NationalIdBatchSerializer
+from national_id.services.national_id_service import NationalIdService
+
+def count_national_ids(request) -> int:
+    """Number of IDs in a batch request body, used as the usage item count."""
+    national_ids = request.data.get("national_ids") if hasattr(request.data, "get") else None
+    return len(national_ids) if isinstance(national_ids, list) else 1
+
+class NationalIdBatchValidationViews(APIView):
+    @profile_request("validate_national_id_batch")
+    @rate_limit_by_api_key(requests_per_minute=2)
+    @track_api_key_usage("validate_national_id_batch", item_count=count_national_ids)
+    def post(self, request):
+        serializer = NationalIdBatchSerializer(data=request.data)
+        with time_stage("serializer"):
+            serializer.is_valid(raise_exception=True)
+
+        national_ids = serializer.validated_data["national_ids"]
+        with time_stage("service"):
+            results = NationalIdService.validate_many(national_ids)
+
+        response = []
+        for national_id, (is_valid, reason) in zip(national_ids, results):
+            item = {"national_id": national_id, "is_valid_national_id": is_valid}
+            if not is_valid:
+                item["reason"] = reason
+            response.append(item)
+
+        return Response({"count": len(response), "results": response}, status=status.HTTP_200_OK)
+
+class NationalIdBatchDataExtractionViews(APIView):
+    @profile_request("extract_data_from_national_id_batch")
+    @rate_limit_by_api_key(requests_per_minute=2)
+    @track_api_key_usage("extract_data_from_national_id_batch", item_count=count_national_ids)
+    def post(self, request):
+        serializer = NationalIdBatchSerializer(data=request.data)
+        with time_stage("serializer"):
+            serializer.is_valid(raise_exception=True)
+
+        national_ids = serializer.validated_data["national_ids"]
+        with time_stage("service"):
+            results = NationalIdService.extract_many(national_ids)
+
+        response = [
+            {"national_id": national_id, **result}
+            for national_id, result in zip(national_ids, results)
+        ]
+
+        return Response({"count": len(response), "results": response}, status=status.HTTP_200_OK)
@@ -0,0 +1,80 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.views import APIView
+
+from api_keys.decorators.api_key_tracker import track_api_key_usage
+from core.decorators.rate_limiter import rate_limit_by_api_key
+from core.decorators.request_profiler import profile_request
+from national_id.constants.constants import MAX_STREAM_LINE_BYTES, STREAM_CHUNK_SIZE
+from national_id.helpers.bulk_io import national_id_from_json_line
+from national_id.helpers.dates import get_reference_date
+from national_id.services.national_id_service import NationalIdService
+
+def iter_body_lines(request):
+    """
+    Yields the lines of a request body as they arrive, without buffering the whole body.
+    Lines longer than MAX_STREAM_LINE_BYTES are skipped and yielded as None.
+
+    Django only reads up to CONTENT_LENGTH, which chunked requests do not send,
+    so those are read from the WSGI input stream the server has already de-chunked.
+    """
+    meta = request.META
+    if not meta.get("CONTENT_LENGTH") and meta.get("HTTP_TRANSFER_ENCODING", "").lower() == "chunked" and "wsgi.input" in meta:
+        stream = meta["wsgi.input"]
+    else:
+        stream = request
+
+    while line := stream.readline(MAX_STREAM_LINE_BYTES + 1):
+        if len(line) <= MAX_STREAM_LINE_BYTES:
+            yield line
+            continue
+        # Read past the rest of the line in bounded reads
+        while line and not line.endswith(b"\n"):
+            line = stream.readline(MAX_STREAM_LINE_BYTES + 1)
+        yield None
+
+def stream_validation_results(lines, today):
+    """
+    Validates NDJSON lines of national IDs in chunks, yielding one NDJSON result line per ID.
+
+    Each yielded chunk holds the results of up to STREAM_CHUNK_SIZE IDs, so the next
+    chunk of the request is only read once the previous results have been sent.
+    """
+    national_ids = []
+    for line in lines:
+        if line is None:
+            national_ids.append(None)
+        elif text := line.decode("utf-8", errors="replace").strip():
+            national_ids.append(national_id_from_json_line(text))
+
+        if len(national_ids) >= STREAM_CHUNK_SIZE:
+            yield _format_results(national_ids, today)
+            national_ids = []
+
+    if national_ids:
+        yield _format_results(national_ids, today)
+
+def _format_results(national_ids, today) -> bytes:
+    # None stands for a line too long to be read
+    results = iter(NationalIdService.validate_many([national_id for national_id in national_ids if national_id is not None], today))
+    lines = []
+    for national_id in national_ids:
+        if national_id is None:
+            is_valid, reason = False, f"Line is longer than {MAX_STREAM_LINE_BYTES} bytes."
+        else:
+            is_valid, reason = next(results)
+        item = {"national_id": national_id, "is_valid_national_id": is_valid}
+        if not is_valid:
+            item["reason"] = reason
+        lines.append(json.dumps(item))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+class NationalIdStreamValidationViews(APIView):
+    @profile_request("validate_national_id_stream")
+    @rate_limit_by_api_key(requests_per_minute=2)
+    @track_api_key_usage("validate_national_id_stream", streamed=True)
+    def post(self, request):
+        # The stream is validated against a single date even if it runs past midnight
+        results = stream_validation_results(iter_body_lines(request._request), get_reference_date())
+        return StreamingHttpResponse(results, content_type="application/x-ndjson")
@@ -4,19 +4,24 @@ from rest_framework import status
 
 from api_keys.decorators.api_key_tracker import track_api_key_usage
 from core.decorators.rate_limiter import rate_limit_by_api_key
+from core.decorators.request_profiler import profile_request
+from core.helpers.metrics import time_stage
 from national_id.serializers.national_id_serializer import NationalIdSerializer
 from national_id.services.national_id_service import NationalIdService
 
 class NationalIdValidationViews(APIView):
+    @profile_request("validate_national_id")
     @rate_limit_by_api_key(requests_per_minute=2)
     @track_api_key_usage("validate_national_id")
     def post(self, request):
         serializer = NationalIdSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        with time_stage("serializer"):
+            serializer.is_valid(raise_exception=True)
 
         national_id = serializer.validated_data["national_id"]
         try:
-            result = NationalIdService.validate_national_id(national_id)
+            with time_stage("service"):
+                result = NationalIdService.validate_national_id(national_id)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 